@@ -10,6 +10,10 @@ db = SQLAlchemy()
 def create_app(config_class='app.config.Config'):
     app = Flask(__name__)
     app.config.from_object(config_class)
+
+    # JSON序列化，按配置选择orjson或标准库
+    from app.util.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
     
     # 修改 Jinja2 的分隔符
     app.jinja_env.variable_start_string = "[|"
@@ -17,6 +21,10 @@ def create_app(config_class='app.config.Config'):
 
     # 初始化JWT
     jwt = JWTManager(app)
+
+    # 初始化已认证用户缓存
+    from app.util.principal_cache import principal_cache
+    principal_cache.init_app(app)
     
     # 注册JWT错误处理
     @jwt.expired_token_loader
@@ -50,17 +58,44 @@ def create_app(config_class='app.config.Config'):
     app.register_blueprint(scheduled_task_bp, url_prefix='/api/scheduled-task')
     from app.controllers.admin_controller import admin_bp
     app.register_blueprint(admin_bp)
+    from app.controllers.monitor_controller import monitor_bp
+    app.register_blueprint(monitor_bp, url_prefix='/api/monitor')
 
     # 注册中间件
     log_request(app)
     jwt_middleware(app)
+    compress_response(app)
     global_result_format(app)
     app_exception_handler(app)
 
-    # 初始化数据库
+    # 初始化数据库，按数据库类型配置连接池，SQLite额外应用调优后的连接参数
+    from app.util.db_engine import normalize_database_uri, engine_options
+    from app.util.sqlite_tuning import apply_sqlite_profile
+    app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_uri(app.config.get('SQLALCHEMY_DATABASE_URI'))
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
     db.init_app(app)
+    apply_sqlite_profile(app)
     with app.app_context():
         db.create_all()
+
+        # 为已存在的数据库补齐新增的列
+        try:
+            from app.util.db_migration import upgrade_schema
+            upgrade_schema()
+        except Exception as e:
+            print(f"升级数据库结构时出错: {str(e)}")
+
+        # 创建日志明细全文索引
+        from app.util.log_fts import ensure_fts_index
+        ensure_fts_index()
+
+        # 首次启用执行统计时根据已有执行日志回填
+        try:
+            from app.services.stats_service import ensure_execution_stats
+            ensure_execution_stats()
+        except Exception as e:
+            print(f"回填功能执行统计时出错: {str(e)}")
         
         # 检查并创建默认管理员账户
         try:
@@ -76,12 +111,48 @@ def create_app(config_class='app.config.Config'):
         except Exception as e:
             print(f"创建默认客户时出错: {str(e)}")
         
+        # 初始化功能进程池，需在启动其他后台线程之前创建工作进程
+        from app.util.feature_process_pool import feature_process_pool
+        feature_process_pool.init_app(app)
+        try:
+            feature_process_pool.start()
+        except Exception as e:
+            print(f"启动功能进程池时出错: {str(e)}")
+
+        # 初始化日志明细写入器
+        from app.util.log_sink import log_sink
+        log_sink.init_app(app)
+
+        # 初始化功能日志文件句柄池
+        from app.util.log_file_pool import log_file_pool
+        log_file_pool.init_app(app)
+
+        # 初始化WebSocket日志合并推送
+        from app.util.ws_log_buffer import ws_log_buffer
+        ws_log_buffer.init_app(app)
+
+        # 初始化功能执行线程池
+        from app.util.feature_executor import feature_executor
+        feature_executor.init_app(app)
+
+        # 初始化按优先级划分的功能执行调度
+        from app.util.feature_dispatcher import feature_dispatcher
+        feature_dispatcher.init_app(app)
+
         # 初始化和启动定时任务调度器
         try:
             from app.scheduler import task_scheduler
             task_scheduler.init_app(app)  # 初始化调度器的应用实例
             task_scheduler.start()
-            task_scheduler.load_scheduled_tasks()
+            if app.config.get('SCHEDULER_LEADER_ELECTION'):
+                # 多实例部署时只有持有数据库租约的实例调度定时任务
+                from app.util.leader_election import leader_election
+                leader_election.init_app(app)
+                leader_election.start(on_elected=task_scheduler.become_leader,
+                                      on_revoked=task_scheduler.step_down,
+                                      on_renewed=task_scheduler.wakeup)
+            else:
+                task_scheduler.become_leader()
             print("定时任务调度器已启动")
         except Exception as e:
             print(f"启动定时任务调度器时出错: {str(e)}")
@@ -90,4 +161,5 @@ def create_app(config_class='app.config.Config'):
 
 def run_with_socketio(app):
     socketio.init_app(app)
-    socketio.run(app, host="0.0.0.0", port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    import os
+    socketio.run(app, host="0.0.0.0", port=int(os.environ.get('PORT', 5000)), allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -2,12 +2,13 @@ from flask import Blueprint, jsonify, request, render_template
 from app.services import category_service
 from app.models.base_models import Category
 from app.util.result import Result
-from app.middlewares import require_role, require_customer_access
+from app.middlewares import require_role, require_customer_access, etag_cache
 
 category_bp = Blueprint('category', __name__)
 
 @category_bp.route('/get_categories', methods=['POST'])
 @require_role('admin')
+@etag_cache()
 def get_categories():
     """
     管理员用获取所有分类数据接口
@@ -21,6 +22,7 @@ def get_categories():
 @category_bp.route('/get_categories_by_customer_id', methods=['POST'])
 @require_role('operator')
 @require_customer_access()
+@etag_cache()
 def get_categories_by_customer_id():
     """
     操作员用数据获取接口，强制必须携带Query Params customer_id参数
@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify, request
 from app.services import config_service
 from app.models.base_models import Config
-from app.middlewares import require_role
+from app.middlewares import require_role, etag_cache
 from app.util.result import Result
 import logging
 
@@ -20,6 +20,7 @@ def validate_config_data(data):
 
 @config_bp.route('/get_configs', methods=['POST'])
 @require_role('admin')
+@etag_cache()
 def get_configs():
     """获取所有配置（管理员）"""
     try:
@@ -35,6 +36,7 @@ def get_configs():
 
 @config_bp.route('/get_configs_by_customer_id', methods=['POST'])
 @require_role('admin')
+@etag_cache()
 def get_configs_by_customer_id():
     """获取配置（操作员）- config模块是管理员专用，此接口仅用于保持API一致性"""
     try:
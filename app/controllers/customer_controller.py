@@ -1,12 +1,13 @@
 from flask import Blueprint, jsonify, request, render_template
 from app.services import customer_service
 from app.util.result import Result
-from app.middlewares import require_role, require_customer_access
+from app.middlewares import require_role, require_customer_access, etag_cache
 
 customer_bp = Blueprint('customer', __name__)
 
 @customer_bp.route('/get_customers', methods=['POST'])
 @require_role('operator')  # 需要登录，admin/operator都可访问
+@etag_cache()
 def get_customers():
     """
     获取当前用户可见的客户数据接口
@@ -1,12 +1,13 @@
 from flask import Blueprint, jsonify, request, render_template
 from app.services import feature_service
 from app.util.result import Result
-from app.middlewares import require_role, require_customer_access
+from app.middlewares import require_role, require_customer_access, etag_cache
 
 feature_bp = Blueprint('feature', __name__)
 
 @feature_bp.route('/get_features', methods=['POST'])
 @require_role('admin')
+@etag_cache()
 def get_features():
     """
     管理员用获取所有功能数据接口
@@ -20,6 +21,7 @@ def get_features():
 @feature_bp.route('/get_features_by_customer_id', methods=['POST'])
 @require_role('operator')
 @require_customer_access()
+@etag_cache()
 def get_features_by_customer_id():
     """
     操作员用数据获取接口，强制必须携带Query Params customer_id参数
@@ -43,6 +45,7 @@ def get_features_by_customer_id():
 
 @feature_bp.route('/get_feature_by_category_id', methods=['POST'])
 @require_role('operator')
+@etag_cache()
 def get_feature_by_category_id():
     """
     根据分类ID获取功能列表
@@ -121,11 +124,12 @@ def execute():
     client_id = request_data.get('client_id')
     if not client_id:
         return Result.bad_request("缺少参数 client_id")
-    status, msg, _ = feature_service.execute_feature(feature_id, client_id)
+    status, msg, data = feature_service.execute_feature(feature_id, client_id)
     if not status:
-        return Result.error(msg, 500)
+        # 执行队列已满时返回排队信息，便于前端提示
+        return Result.error(msg, 503 if data else 500, data)
     else:
-        return Result.success(None, "执行成功")
+        return Result.success(data, "执行成功")
 
 @feature_bp.route('/register', methods=['POST'])
 @require_role('admin')
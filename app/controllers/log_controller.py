@@ -1,7 +1,8 @@
-from flask import Blueprint, jsonify, request
-from app.services import log_service
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
+from app.services import log_service, log_retention_service, stats_service
 from app.util.result import Result
-from app.middlewares import require_role
+import json
+from app.middlewares import require_role, require_customer_access
 
 log_bp = Blueprint('log', __name__)
 
@@ -20,7 +21,10 @@ def get_logs():
         start_date=request_data.get('start_date') if request_data else None,
         end_date=request_data.get('end_date') if request_data else None,
         keyword=request_data.get('keyword') if request_data else None,
-        execution_type=request_data.get('execution_type') if request_data else None
+        execution_type=request_data.get('execution_type') if request_data else None,
+        cursor=request_data.get('cursor') if request_data else None,
+        page_size=request_data.get('page_size') if request_data else None,
+        total_mode=request_data.get('total_mode', 'none') if request_data else 'none'
     )
     
     if not status:
@@ -55,7 +59,10 @@ def get_logs_by_customer_id():
         start_date=request_data.get('start_date') if request_data else None,
         end_date=request_data.get('end_date') if request_data else None,
         keyword=request_data.get('keyword') if request_data else None,
-        execution_type=request_data.get('execution_type') if request_data else None
+        execution_type=request_data.get('execution_type') if request_data else None,
+        cursor=request_data.get('cursor') if request_data else None,
+        page_size=request_data.get('page_size') if request_data else None,
+        total_mode=request_data.get('total_mode', 'none') if request_data else 'none'
     )
     
     if not status:
@@ -83,6 +90,110 @@ def get_log_details():
     else:
         return Result.success(data)
 
+@log_bp.route('/stream_log_details', methods=['POST'])
+@require_role('operator')
+def stream_log_details():
+    """
+    以NDJSON流式返回日志明细，每行一条明细，最后一行为 {"type": "end", ...}
+    支持 after_id/limit 范围读取，follow 为true时持续推送执行中功能的新日志
+    """
+    request_data = request.get_json()
+    if not request_data:
+        return Result.bad_request("缺少请求参数")
+
+    log_id = request_data.get('id')
+    if not log_id:
+        return Result.bad_request("缺少参数 id")
+    try:
+        after_id = int(request_data.get('after_id') or 0)
+        limit = request_data.get('limit')
+        limit = int(limit) if limit is not None else None
+    except (TypeError, ValueError):
+        return Result.bad_request("参数 after_id/limit 必须为整数")
+    if limit is not None and limit < 0:
+        return Result.bad_request("参数 limit 不能为负数")
+
+    if log_service.get_log_status(log_id) is None:
+        return Result.error("未找到指定的日志记录", 404)
+
+    details = log_service.iter_log_details(
+        log_id,
+        after_id=after_id,
+        limit=limit,
+        follow=bool(request_data.get('follow')),
+        batch_size=current_app.config.get('LOG_STREAM_BATCH_SIZE', 500),
+        poll_interval=current_app.config.get('LOG_STREAM_POLL_INTERVAL', 1.0),
+        follow_timeout=current_app.config.get('LOG_STREAM_FOLLOW_TIMEOUT', 300)
+    )
+
+    def generate():
+        # 每批明细作为一个分块写出
+        for chunk in details:
+            records = chunk if isinstance(chunk, list) else [chunk]
+            yield "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    # 禁止反向代理缓冲，保证跟随模式下日志及时到达
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@log_bp.route('/search_log_details', methods=['POST'])
+@require_role('operator')
+@require_customer_access()
+def search_log_details():
+    """
+    在日志明细中全文搜索，操作员必须携带customer_id参数
+    """
+    request_data = request.get_json()
+    if not request_data:
+        return Result.bad_request("缺少请求参数")
+
+    keyword = request_data.get('keyword')
+    if not keyword or not str(keyword).strip():
+        return Result.bad_request("缺少参数 keyword")
+
+    customer_id = request_data.get('customer_id')
+    if not customer_id and request.user_role != 'admin':
+        return Result.bad_request("缺少参数 customer_id")
+
+    status, msg, data = log_service.search_log_details(
+        keyword=str(keyword),
+        customer_id=customer_id,
+        feature_id=request_data.get('feature_id'),
+        page=request_data.get('page', 1),
+        page_size=request_data.get('page_size')
+    )
+    if not status:
+        return Result.error(msg, 500)
+    else:
+        return Result.success(data)
+
+@log_bp.route('/stats', methods=['POST'])
+@require_role('operator')
+@require_customer_access()
+def get_stats():
+    """
+    查询预聚合的功能执行统计（执行次数、成功率、耗时分位数），操作员必须携带customer_id参数
+    """
+    request_data = request.get_json(silent=True) or {}
+
+    customer_id = request_data.get('customer_id')
+    if not customer_id and request.user_role != 'admin':
+        return Result.bad_request("缺少参数 customer_id")
+
+    status, msg, data = stats_service.query_stats(
+        feature_id=request_data.get('feature_id'),
+        customer_id=customer_id,
+        granularity=request_data.get('granularity', 'day'),
+        start_time=request_data.get('start_time'),
+        end_time=request_data.get('end_time'),
+        group_by=request_data.get('group_by', 'feature')
+    )
+    if not status:
+        return Result.bad_request(msg)
+    return Result.success(data)
+
 @log_bp.route('/add_log', methods=['POST'])
 @require_role('admin')
 def add_log():
@@ -140,4 +251,71 @@ def update_log():
     if not status:
         return Result.error(msg, 500)
     else:
-        return Result.success(data, "日志更新成功")
\ No newline at end of file
+        return Result.success(data, "日志更新成功")
+
+@log_bp.route('/run_retention', methods=['POST'])
+@require_role('admin')
+def run_retention():
+    """
+    管理员用立即执行日志保留清理接口，清理在后台执行
+    """
+    status, msg = log_retention_service.start_retention(current_app._get_current_object())
+    if not status:
+        return Result.business_error(msg, 409)
+    return Result.success(None, msg)
+
+@log_bp.route('/get_retention_status', methods=['POST'])
+@require_role('admin')
+def get_retention_status():
+    """
+    获取日志保留清理的配置和最近一次执行结果
+    """
+    status, msg, data = log_retention_service.get_retention_status()
+    if not status:
+        return Result.error(msg, 500)
+    return Result.success(data)
+
+@log_bp.route('/get_archives', methods=['POST'])
+@require_role('admin')
+def get_archives():
+    """
+    获取日志归档文件列表
+    """
+    status, msg, data = log_retention_service.list_archives()
+    if not status:
+        return Result.error(msg, 500)
+    return Result.success(data)
+
+@log_bp.route('/get_archived_logs', methods=['POST'])
+@require_role('admin')
+def get_archived_logs():
+    """
+    查询某天归档的执行记录
+    """
+    request_data = request.get_json()
+    if not request_data or not request_data.get('date'):
+        return Result.bad_request("缺少参数 date")
+
+    status, msg, data = log_retention_service.get_archived_logs(request_data.get('date'), request_data.get('feature_id'))
+    if not status:
+        return Result.error(msg, 500)
+    return Result.success(data)
+
+@log_bp.route('/get_archived_log_details', methods=['POST'])
+@require_role('admin')
+def get_archived_log_details():
+    """
+    查询归档执行记录的明细
+    """
+    request_data = request.get_json()
+    if not request_data:
+        return Result.bad_request("缺少请求参数")
+    if not request_data.get('date'):
+        return Result.bad_request("缺少参数 date")
+    if not request_data.get('id'):
+        return Result.bad_request("缺少参数 id")
+
+    status, msg, data = log_retention_service.get_archived_log_details(request_data.get('date'), request_data.get('id'))
+    if not status:
+        return Result.error(msg, 500)
+    return Result.success(data)
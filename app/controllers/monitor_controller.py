@@ -0,0 +1,18 @@
+from flask import Blueprint
+from app.services import monitor_service
+from app.util.result import Result
+from app.middlewares import require_role
+
+monitor_bp = Blueprint('monitor', __name__)
+
+@monitor_bp.route('/get_runtime_stats', methods=['POST'])
+@require_role('admin')
+def get_runtime_stats():
+    """
+    管理员用获取运行时指标接口（执行线程池等）
+    """
+    status, msg, data = monitor_service.get_runtime_stats()
+    if not status:
+        return Result.error(msg, 500)
+    else:
+        return Result.success(data)
@@ -5,6 +5,18 @@ from app.middlewares import require_role
 
 scheduled_task_bp = Blueprint('scheduled_task', __name__)
 
+
+def validate_run_policy(data):
+    """验证执行策略和错峰参数，参数为null时使用全局默认值"""
+    for field, minimum in (('misfire_grace_time', 1), ('max_instances', 1), ('stagger_seconds', 0),
+                           ('jitter_seconds', 0)):
+        value = data.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < minimum):
+            return False, f"{field} 必须是不小于{minimum}的整数"
+    if data.get('coalesce') is not None and not isinstance(data['coalesce'], bool):
+        return False, "coalesce 必须是布尔值"
+    return True, "验证通过"
+
 @scheduled_task_bp.route('/get_scheduled_tasks', methods=['POST'])
 @require_role('admin')
 def get_scheduled_tasks():
@@ -96,6 +108,10 @@ def add_scheduled_task():
         if field not in task_data or not task_data[field]:
             return Result.bad_request(f"缺少必要参数: {field}")
     
+    valid, msg = validate_run_policy(task_data)
+    if not valid:
+        return Result.bad_request(msg)
+    
     status, msg, data = scheduled_task_service.add_scheduled_task(task_data)
     if not status:
         return Result.error(msg, 500)
@@ -147,6 +163,10 @@ def update_scheduled_task():
             if 'daily_time' not in request_data:
                 return Result.bad_request("缺少必要参数: daily_time")
     
+    valid, msg = validate_run_policy(request_data)
+    if not valid:
+        return Result.bad_request(msg)
+    
     status, msg, data = scheduled_task_service.update_scheduled_task(task_id, request_data)
     if not status:
         return Result.error(msg, 500)
@@ -191,4 +211,21 @@ def disable_scheduled_task():
     if not status:
         return Result.error(msg, 500)
     else:
-        return Result.success(data, "定时任务已禁用")
\ No newline at end of file
+        return Result.success(data, "定时任务已禁用")
+
+@scheduled_task_bp.route('/get_dispatch_histogram', methods=['POST'])
+@require_role('admin')
+def get_dispatch_histogram():
+    """
+    定时任务派发分布：最近实际派发和按当前触发器推算的每分钟派发数，用于确认错峰效果
+    """
+    request_data = request.get_json(silent=True) or {}
+    minutes = request_data.get('minutes', 60)
+    if not isinstance(minutes, int) or isinstance(minutes, bool) or not 1 <= minutes <= 1440:
+        return Result.bad_request("minutes 必须是1~1440的整数")
+    
+    status, msg, data = scheduled_task_service.get_dispatch_histogram(minutes)
+    if not status:
+        return Result.error(msg, 500)
+    else:
+        return Result.success(data)
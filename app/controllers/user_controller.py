@@ -77,16 +77,16 @@ def refresh():
     
     if not user:
         return Result.not_found("用户不存在")
+    if not user.is_active:
+        return Result.unauthorized("用户已被禁用")
     
-    # 获取当前令牌的声明
+    # 获取当前令牌的声明，令牌版本落后说明用户权限已变更，需要重新登录
     claims = get_jwt()
+    if claims.get('ver', 0) != (user.token_version or 0):
+        return Result.unauthorized("令牌已失效，请重新登录")
     
-    # 生成新的访问令牌
-    from flask_jwt_extended import create_access_token
-    access_token = create_access_token(
-        identity=str(current_user_id),
-        additional_claims={'role': claims.get('role')}
-    )
+    # 按用户当前的角色和关联客户生成新的访问令牌
+    access_token = user_service.generate_access_token(user)
     
     return Result.success({
         'access_token': access_token
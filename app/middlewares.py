@@ -1,7 +1,14 @@
-from flask import request, jsonify, current_app, has_request_context
+from flask import request, current_app, has_request_context
 from flask_jwt_extended import verify_jwt_in_request, exceptions as jwt_exceptions, get_jwt_identity, get_jwt
 from fnmatch import fnmatch
 from app.util import log_utils
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # 未安装brotli时只使用gzip压缩
+    brotli = None
 
 def log_request(app):
     @app.before_request
@@ -30,30 +37,39 @@ def is_in_whitelist(path, method):
             return True
     return False
 
+def authenticate_request():
+    """
+    验证JWT并将当前用户写入请求上下文，用户信息按(用户ID, jti)缓存
+    :return: 认证失败时返回错误响应，成功返回None
+    """
+    from app.services.user_service import load_principal
+    from app.util.principal_cache import principal_cache
+
+    # 验证JWT令牌
+    verify_jwt_in_request()
+
+    # 获取用户ID和角色
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+    role = claims.get('role')
+
+    # 获取用户信息，缓存有效期内不查询数据库
+    user = principal_cache.get(int(user_id), claims.get('jti'), lambda uid: load_principal(uid, claims))
+    if not user or not user.is_active:
+        return '用户不存在或已被禁用', 401
+
+    # 将用户信息添加到请求上下文
+    request.current_user = user
+    request.user_role = role
+    return None
+
 def jwt_middleware(app):
     @app.before_request
     def check_jwt():
         if is_in_whitelist(request.path, request.method):
             return  # 跳过校验
         try:
-            # 验证JWT令牌
-            verify_jwt_in_request()
-            
-            # 获取用户ID和角色
-            user_id = get_jwt_identity()
-            claims = get_jwt()
-            role = claims.get('role')
-            
-            # 获取用户信息
-            from app.services.user_service import get_user_by_id
-            user = get_user_by_id(int(user_id))
-            if not user or not user.is_active:
-                return '用户不存在或已被禁用', 401
-            
-            # 将用户信息添加到请求上下文
-            request.current_user = user
-            request.user_role = role
-            
+            return authenticate_request()
         except jwt_exceptions.NoAuthorizationError:
             return '缺少或无效的JWT', 401
         except Exception as e:
@@ -66,8 +82,6 @@ def require_role(required_role):
     """
     from functools import wraps
     from flask import request
-    from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-    from app.services.user_service import get_user_by_id
     
     def decorator(f):
         @wraps(f)
@@ -76,21 +90,9 @@ def require_role(required_role):
             if not hasattr(request, 'current_user') or not hasattr(request, 'user_role'):
                 try:
                     # 主动执行JWT验证
-                    verify_jwt_in_request()
-                    
-                    # 获取用户ID和角色
-                    user_id = get_jwt_identity()
-                    claims = get_jwt()
-                    role = claims.get('role')
-                    
-                    # 获取用户信息
-                    user = get_user_by_id(int(user_id))
-                    if not user or not user.is_active:
-                        return '用户不存在或已被禁用', 401
-                    
-                    # 将用户信息添加到请求上下文
-                    request.current_user = user
-                    request.user_role = role
+                    error = authenticate_request()
+                    if error:
+                        return error
                 except Exception as e:
                     return f'认证失败: {str(e)}', 401
             
@@ -122,8 +124,6 @@ def require_customer_access():
     """
     from functools import wraps
     from flask import request
-    from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-    from app.services.user_service import get_user_by_id, is_user_associated_with_customer
     
     def decorator(f):
         @wraps(f)
@@ -132,21 +132,9 @@ def require_customer_access():
             if not hasattr(request, 'current_user') or not hasattr(request, 'user_role'):
                 try:
                     # 主动执行JWT验证
-                    verify_jwt_in_request()
-                    
-                    # 获取用户ID和角色
-                    user_id = get_jwt_identity()
-                    claims = get_jwt()
-                    role = claims.get('role')
-                    
-                    # 获取用户信息
-                    user = get_user_by_id(int(user_id))
-                    if not user or not user.is_active:
-                        return '用户不存在或已被禁用', 401
-                    
-                    # 将用户信息添加到请求上下文
-                    request.current_user = user
-                    request.user_role = role
+                    error = authenticate_request()
+                    if error:
+                        return error
                 except Exception as e:
                     return f'认证失败: {str(e)}', 401
             
@@ -159,8 +147,8 @@ def require_customer_access():
                 # 获取请求中的客户ID
                 customer_id = request.args.get('customer_id') or (request.json.get('customer_id') if request.json else None)
                 if customer_id:
-                    # 检查用户是否关联该客户
-                    if not is_user_associated_with_customer(request.current_user.id, customer_id):
+                    # 检查用户是否关联该客户，关联客户集合已随用户信息缓存
+                    if not request.current_user.can_access_customer(customer_id):
                         return '权限不足，无法访问该客户数据', 403
             
             return f(*args, **kwargs)
@@ -168,33 +156,89 @@ def require_customer_access():
     return decorator
         
 # 格式化所有返回值
+def etag_cache():
+    """
+    查询接口的条件请求装饰器
+    按响应内容生成ETag，请求头 If-None-Match 与之一致时返回304，不再传输响应体。
+    只处理 Result 包装的成功响应，装饰器需放在 require_role 等权限装饰器之后。
+    """
+    from functools import wraps
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response = current_app.make_response(f(*args, **kwargs))
+            if not getattr(response, "result_wrapped", False) or not getattr(response, "result_status", False):
+                return response
+            etag = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+            # 弱ETag，压缩前后的响应共用同一个ETag
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.result_wrapped = True
+            response.set_etag(etag, weak=True)
+            # 客户端每次都需要校验，数据只缓存在当前用户的浏览器中
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
 def global_result_format(app):
     @app.after_request
     def result_format(response):
-        # 只处理API的返回值
-        if request.path.startswith("/api"):
-            # 获取响应的原始数据
-            response_data = response.get_json()
-            
-            # 检查是否已经格式化过了（与Result对象格式一致）
-            if response_data and isinstance(response_data, dict) and \
-               "status" in response_data and "code" in response_data and "data" in response_data:
-                # 已经格式化过了，直接返回
-                return response
-            
-            # 对于未格式化的响应，创建标准格式
-            status = response.status_code < 400  # 4xx和5xx表示错误
-            wrapped_response = {
-                "status": status,
-                "code" : response.status_code,
-                "data": response_data if response_data else response.get_data().decode(),
-                "message": "请求成功" if status else "请求失败"
-            }
-            # 请求成功，只是业务出错。覆写状态码，避免前端直接抛出异常
-            response.status_code = 200
-            response.set_data(jsonify(wrapped_response).data)
+        # 只处理API的返回值，Result已包装的响应和流式响应直接返回，不读取响应体
+        if not request.path.startswith("/api") or response.is_streamed or \
+                getattr(response, "result_wrapped", False):
+            return response
+
+        # 对于未格式化的响应，创建标准格式，JSON响应体解析后作为data
+        status = response.status_code < 400  # 4xx和5xx表示错误
+        body = response.get_data()
+        if response.is_json and body.strip():
+            data = current_app.json.loads(body)
+        else:
+            data = body.decode(errors="replace")
+        wrapped_response = {
+            "status": status,
+            "code": response.status_code,
+            "data": data,
+            "message": "请求成功" if status else "请求失败"
+        }
+        # 请求成功，只是业务出错。覆写状态码，避免前端直接抛出异常
+        response.status_code = 200
+        response.set_data(current_app.json.dumps_bytes(wrapped_response))
+        response.mimetype = current_app.json.mimetype
         return response
-    
+
+def _compress(body, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(body, quality=config.get('COMPRESS_BR_QUALITY', 4))
+    return gzip.compress(body, compresslevel=config.get('COMPRESS_GZIP_LEVEL', 6))
+
+def compress_response(app):
+    """响应压缩，需在 global_result_format 之前注册，after_request按注册的逆序执行，保证压缩最后进行"""
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    @app.after_request
+    def compress(response):
+        config = current_app.config
+        if not config.get('COMPRESS_ENABLED', True):
+            return response
+        # 流式响应、文件响应和已编码的响应不压缩
+        if response.is_streamed or response.direct_passthrough or response.status_code != 200 or \
+                'Content-Encoding' in response.headers:
+            return response
+        if response.mimetype not in config.get('COMPRESS_MIMETYPES', ('application/json',)):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < config.get('COMPRESS_MIN_SIZE', 1024):
+            return response
+        encoding = request.accept_encodings.best_match(encodings)
+        if not encoding:
+            return response
+        response.set_data(_compress(response.get_data(), encoding, config))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
 # 异常处理
 def app_exception_handler(app):
     @app.errorhandler(Exception)
@@ -50,7 +50,17 @@ class Feature(Base_model):
     customer_id = db.Column(db.Integer, unique=False, nullable=False)
     category_id = db.Column(db.Integer, unique=False, nullable=False)
     feature_file_name = db.Column(db.String(256), unique=False, nullable=True)
+    # 执行策略，为空时使用全局默认值（FEATURE_DEFAULT_PRIORITY / FEATURE_CONCURRENCY_POLICY）
+    priority = db.Column(db.String(8), unique=False, nullable=True)  # 执行线程池 high/normal/low
+    max_concurrency = db.Column(db.Integer, unique=False, nullable=True)  # 最多同时执行的数量，为空不限制
+    concurrency_policy = db.Column(db.String(16), unique=False, nullable=True)  # 达到上限时 skip/queue/cancel_previous
     customer_name = ""
+    __table_args__ = (
+        # 按客户查询功能
+        db.Index('ix_base_feature_customer_id', 'customer_id'),
+        # 按分类（及客户）查询功能
+        db.Index('ix_base_feature_category_customer', 'category_id', 'customer_id'),
+    )
 
 
 class Category(Base_model):
@@ -93,6 +103,10 @@ class Config(Base_model):
     description = db.Column(db.String(256), unique=False, nullable=True)
     feature_id = db.Column(db.Integer, unique=False, nullable=False, default=0)
     feature_name = ""
+    __table_args__ = (
+        # 按功能读取配置（每次执行功能时）
+        db.Index('ix_base_config_feature_id', 'feature_id'),
+    )
 
 
 class FeatureExecutionLog(Base_model):
@@ -107,9 +121,23 @@ class FeatureExecutionLog(Base_model):
     status = db.Column(db.String(32), unique=False, nullable=True)  # 运行中/成功/失败
     client_id = db.Column(db.String(64), unique=False, nullable=True)
     execution_type = db.Column(db.String(16), unique=False, nullable=False, default="manual")  # manual/scheduled
+    # 各阶段耗时（毫秒），用于分析执行延迟
+    queue_wait_ms = db.Column(db.Integer, nullable=True)  # 排队及等待客户端就绪
+    load_ms = db.Column(db.Integer, nullable=True)  # 加载功能模块
+    config_ms = db.Column(db.Integer, nullable=True)  # 读取功能配置
+    run_ms = db.Column(db.Integer, nullable=True)  # 执行run()
+    finalize_ms = db.Column(db.Integer, nullable=True)  # 结束处理（更新状态、推送结果）
     
     # 关联功能名称，便于查询
     feature_name = ""
+    __table_args__ = (
+        # 日志列表按(start_time, id)倒序游标分页
+        db.Index('ix_feature_execution_log_start_time_id', 'start_time', 'id'),
+        # 按功能过滤后分页
+        db.Index('ix_feature_execution_log_feature_start', 'feature_id', 'start_time', 'id'),
+        # 按执行类型过滤后分页
+        db.Index('ix_feature_execution_log_type_start', 'execution_type', 'start_time', 'id'),
+    )
 
 class FeatureExecutionLogDetail(Base_model):
     __tablename__ = 'feature_execution_log_detail'
@@ -121,6 +149,12 @@ class FeatureExecutionLogDetail(Base_model):
     level = db.Column(db.String(16), unique=False, nullable=True)  # 日志级别 INFO/WARN/ERROR
     message = db.Column(db.Text, unique=False, nullable=True)
     request_id = db.Column(db.String(64), unique=False, nullable=False)
+    __table_args__ = (
+        # 按日志ID读取明细并按时间排序
+        db.Index('ix_feature_execution_log_detail_log_time', 'log_id', 'timestamp'),
+        # SQLite下id不复用：全文索引按已索引的最大id增量建立索引，日志流按id续读
+        {'sqlite_autoincrement': True},
+    )
  
 class ScheduledTask(Base_model):
     __tablename__ = 'scheduled_task'
@@ -134,9 +168,70 @@ class ScheduledTask(Base_model):
     is_active = db.Column(db.Boolean, unique=False, nullable=False, default=False)
     last_run_time = db.Column(db.DateTime, nullable=True)
     next_run_time = db.Column(db.DateTime, nullable=True)
+    # 执行策略，为空时使用全局默认值（SCHEDULER_MISFIRE_GRACE_TIME 等）
+    misfire_grace_time = db.Column(db.Integer, nullable=True)  # 错过执行时间后仍允许补执行的秒数
+    coalesce = db.Column(db.Boolean, nullable=True)  # 错过多次触发时是否只补执行一次
+    max_instances = db.Column(db.Integer, nullable=True)  # 同一任务最多同时执行的实例数
+    # 错峰设置，为空时使用全局默认值（SCHEDULER_STAGGER_SECONDS / SCHEDULER_JITTER_SECONDS）
+    stagger_seconds = db.Column(db.Integer, nullable=True)  # 错峰窗口秒数，按任务ID在窗口内固定偏移
+    jitter_seconds = db.Column(db.Integer, nullable=True)  # 每次触发随机延迟的最大秒数
     
     # 关联功能名称，便于查询
     feature_name = ""
+    __table_args__ = (
+        db.Index('ix_scheduled_task_feature_id', 'feature_id'),
+        # 启动时加载启用的定时任务
+        db.Index('ix_scheduled_task_is_active', 'is_active'),
+    )
+
+class FeatureExecutionStat(Base_model):
+    __tablename__ = 'feature_execution_stat'
+    __info__ = ''' 功能执行统计
+        按功能、客户和时间桶（小时/天）预聚合的执行次数与耗时分布，在执行结束时增量更新
+        hist_0 ~ hist_13: 耗时直方图，各桶上界见 stats_service.DURATION_BUCKETS_MS，最后一桶无上界
+    '''
+    feature_id = db.Column(db.Integer, unique=False, nullable=False)
+    customer_id = db.Column(db.Integer, unique=False, nullable=False, default=0)  # 0表示功能未关联客户
+    granularity = db.Column(db.String(8), unique=False, nullable=False)  # hour/day
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    run_count = db.Column(db.Integer, nullable=False, default=0)
+    success_count = db.Column(db.Integer, nullable=False, default=0)
+    failure_count = db.Column(db.Integer, nullable=False, default=0)
+    terminated_count = db.Column(db.Integer, nullable=False, default=0)
+    total_duration_ms = db.Column(db.BigInteger, nullable=False, default=0)
+    max_duration_ms = db.Column(db.Integer, nullable=False, default=0)
+    hist_0 = db.Column(db.Integer, nullable=False, default=0)
+    hist_1 = db.Column(db.Integer, nullable=False, default=0)
+    hist_2 = db.Column(db.Integer, nullable=False, default=0)
+    hist_3 = db.Column(db.Integer, nullable=False, default=0)
+    hist_4 = db.Column(db.Integer, nullable=False, default=0)
+    hist_5 = db.Column(db.Integer, nullable=False, default=0)
+    hist_6 = db.Column(db.Integer, nullable=False, default=0)
+    hist_7 = db.Column(db.Integer, nullable=False, default=0)
+    hist_8 = db.Column(db.Integer, nullable=False, default=0)
+    hist_9 = db.Column(db.Integer, nullable=False, default=0)
+    hist_10 = db.Column(db.Integer, nullable=False, default=0)
+    hist_11 = db.Column(db.Integer, nullable=False, default=0)
+    hist_12 = db.Column(db.Integer, nullable=False, default=0)
+    hist_13 = db.Column(db.Integer, nullable=False, default=0)
+    __table_args__ = (
+        # 每个统计桶一行，用于增量更新
+        db.UniqueConstraint('granularity', 'feature_id', 'customer_id', 'bucket_start',
+                            name='uq_feature_execution_stat_bucket'),
+        # 按时间范围查询统计
+        db.Index('ix_feature_execution_stat_range', 'granularity', 'bucket_start'),
+    )
+
+class SchedulerLease(Base_model):
+    __tablename__ = 'scheduler_lease'
+    __info__ = ''' 调度器租约
+        多实例部署时只有持有租约的实例（leader）调度定时任务，leader定期续约，
+        租约过期后其他实例接管。时间为UTC，各实例的系统时钟需要同步。
+    '''
+    name = db.Column(db.String(64), unique=True, nullable=False)
+    owner_id = db.Column(db.String(128), nullable=True)
+    acquired_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
 
 # 最后引入模型事件
 from . import models_events
\ No newline at end of file
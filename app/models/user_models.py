@@ -12,9 +12,12 @@ class User(Base_model):
     
     username = db.Column(db.String(64), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
-    role = db.Column(db.Enum('admin', 'operator'), nullable=False, default='operator')
+    # PostgreSQL的ENUM类型必须命名
+    role = db.Column(db.Enum('admin', 'operator', name='user_role'), nullable=False, default='operator')
     email = db.Column(db.String(128), unique=True, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
+    # 令牌版本，角色、关联客户、密码或启用状态变更时加1，使已签发的令牌失效
+    token_version = db.Column(db.Integer, nullable=False, default=0)
     
     # 和 UserCustomer 对应的反向关系
     customer_associations = db.relationship(
@@ -52,6 +55,12 @@ class UserCustomer(Base_model):
     
     user_id = db.Column(db.Integer, db.ForeignKey('base_user.id'), nullable=False)
     customer_id = db.Column(db.Integer, db.ForeignKey('base_customer.id'), nullable=False)
+
+    __table_args__ = (
+        # 校验用户与客户的关联、查询用户关联的客户
+        db.Index('ix_base_user_customer_user_customer', 'user_id', 'customer_id'),
+        db.Index('ix_base_user_customer_customer_id', 'customer_id'),
+    )
     
     # 关联关系
     user = db.relationship('User', back_populates='customer_associations')
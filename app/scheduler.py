@@ -1,83 +1,318 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from app.services.scheduled_task_service import get_active_scheduled_tasks
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.events import (EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED,
+                                EVENT_JOB_EXECUTED, EVENT_JOB_ERROR)
 from app.services.feature_service import execute_feature
+from app.util.staggered_trigger import StaggeredCronTrigger, stagger_offset
 import atexit
+import collections
+import threading
+import time
 from app.util.log_utils import logger
-from datetime import datetime
+from datetime import datetime, timedelta
+
+SCHEDULED_TASK_JOB_PREFIX = "scheduled_task_"
+# 统计合并的触发次数时最多向前推算的次数，避免停机很久后遍历过多的触发时间
+MAX_COALESCED_COUNT = 10000
+
+
+def run_scheduled_task(task_id, feature_id):
+    """定时任务的任务函数，使用模块级函数以便持久化到任务存储"""
+    task_scheduler.execute_scheduled_task(task_id, feature_id)
+
+
+def run_system_job(job_id):
+    """系统维护任务的任务函数，实际执行的函数在启动时由 load_system_jobs 注册"""
+    task_scheduler.execute_system_job(job_id)
+
+
+def _local_naive(moment):
+    """调度器的带时区时间转换为数据库使用的本地时间"""
+    return moment.astimezone().replace(tzinfo=None) if moment else None
+
+
 class TaskScheduler:
     def __init__(self):
         self.scheduler = BackgroundScheduler()
         self.job_mapping = {}  # 映射定时任务ID到APScheduler任务ID
         self.app = None  # Flask应用实例引用
+        self._system_jobs = {}  # 系统任务标识 -> 任务函数
+        self._triggers = {}  # APScheduler任务ID -> 触发器，用于统计合并的触发次数
+        self._expected_run_times = {}  # APScheduler任务ID -> 下一次应触发的时间
+        self._lock = threading.Lock()
+        self._jobstore_name = None
+        # 定时任务的执行时间视图：任务ID -> {next_run_time, last_run_time}，变更由后台线程批量写入数据库
+        self._run_times = {}
+        self._dirty_run_times = set()
+        self._flush_event = threading.Event()
+        self._flush_thread = None
+        # 定时任务的派发时间（time.time()），用于统计每分钟的派发分布
+        self._dispatch_times = collections.deque()
+        # 指标
+        self._counters = {"submitted": 0, "executed": 0, "errors": 0, "missed": 0, "coalesced": 0,
+                          "max_instances_skipped": 0}
+        self._job_counters = {}
         
     def init_app(self, app):
-        """初始化应用实例"""
+        """初始化应用实例，配置任务存储、执行线程池和默认的错过/合并策略"""
         self.app = app
+        config = app.config
+        if config.get('SCHEDULER_JOBSTORE', 'sqlalchemy') == 'sqlalchemy' and \
+                ':memory:' not in (config.get('SQLALCHEMY_DATABASE_URI') or ''):
+            # 任务存储在应用数据库中，重启后保留下次执行时间，停机期间错过的触发按策略补执行
+            from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+            from app import db
+            with app.app_context():
+                jobstore = SQLAlchemyJobStore(engine=db.engine,
+                                              tablename=config.get('SCHEDULER_JOBSTORE_TABLE', 'apscheduler_jobs'))
+        else:
+            jobstore = MemoryJobStore()
+        self._jobstore_name = type(jobstore).__name__
+        self.scheduler.configure(
+            jobstores={"default": jobstore},
+            executors={"default": ThreadPoolExecutor(config.get('SCHEDULER_MAX_WORKERS', 10))},
+            job_defaults=self._default_policy()
+        )
+        self.scheduler.add_listener(self._on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES |
+                                    EVENT_JOB_MISSED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
+    def _build_trigger(self, task):
+        """
+        根据任务的cron表达式和错峰设置创建触发器
+        错峰窗口按任务ID确定固定偏移，窗口不超过任务的执行周期；随机延迟由任务ID和触发时间确定
+        """
+        config = self.app.config if self.app else {}
+        window = task.get('stagger_seconds')
+        if window is None:
+            window = config.get('SCHEDULER_STAGGER_SECONDS', 0)
+        jitter = task.get('jitter_seconds')
+        if jitter is None:
+            jitter = config.get('SCHEDULER_JITTER_SECONDS', 0)
+        trigger = StaggeredCronTrigger.from_crontab(task['cron_expression'], seed=task['id'])
+        if window:
+            period = trigger.period_seconds(datetime.now().astimezone())
+            if period:
+                window = min(window, int(period))
+            trigger.offset = stagger_offset(task['id'], window)
+        trigger.jitter = jitter or None
+        return trigger
+
+    def _default_policy(self):
+        config = self.app.config if self.app else {}
+        return {
+            "misfire_grace_time": config.get('SCHEDULER_MISFIRE_GRACE_TIME', 300),
+            "coalesce": config.get('SCHEDULER_COALESCE', True),
+            "max_instances": config.get('SCHEDULER_MAX_INSTANCES', 1)
+        }
+
+    def _run_policy(self, task):
+        """定时任务的错过/合并/并发策略，未设置的项使用全局默认值"""
+        policy = self._default_policy()
+        for key in policy:
+            if task.get(key) is not None:
+                policy[key] = task[key]
+        return policy
         
     def start(self):
-        """启动调度器"""
+        """启动调度器，启动后处于暂停状态，加载任务后调用 resume 开始调度"""
         if not self.scheduler.running:
-            self.scheduler.start()
+            # 暂停状态下启动，避免任务存储中已删除或已禁用的任务在同步前被触发
+            self.scheduler.start(paused=True)
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="scheduler-run-times", daemon=True)
+            self._flush_thread.start()
             logger.info("定时任务调度器已启动")
             # 注册退出时停止调度器
             atexit.register(lambda: self.shutdown())
+
+    def resume(self):
+        """开始调度，任务存储中错过的触发按各任务的策略补执行或合并"""
+        self.scheduler.resume()
+
+    def become_leader(self):
+        """成为调度实例：与任务存储同步后开始调度"""
+        with self.app.app_context():
+            self.load_scheduled_tasks()
+        self.load_system_jobs()
+        self.resume()
+        logger.info("定时任务调度已开始")
+
+    def step_down(self):
+        """不再是调度实例：暂停调度，已开始的执行不受影响"""
+        if self.scheduler.running:
+            self.scheduler.pause()
+            logger.info("定时任务调度已暂停")
+
+    def wakeup(self):
+        """
+        立即检查到期任务。其他实例修改共享任务存储中的任务后，
+        调度实例在下一次续约时同步触发器并唤醒，以便按新的下次执行时间调度
+        """
+        if self.scheduler.running:
+            self.sync_jobs()
+            self.scheduler.wakeup()
+
+    def sync_jobs(self):
+        """
+        按共享任务存储同步本实例记录的触发器和下一次应触发的时间（用于合并次数统计和派发分布）
+        其他实例添加、修改或删除的任务只写入任务存储，不经过本实例的 add_job/remove_job
+        """
+        try:
+            jobs = {job.id: job for job in self.scheduler.get_jobs()}
+        except Exception as e:
+            logger.error(f"同步任务存储失败: {e}")
+            return
+        with self._lock:
+            for job_id in list(self._triggers):
+                if job_id not in jobs:
+                    self._triggers.pop(job_id, None)
+                    self._expected_run_times.pop(job_id, None)
+            for job_id, job in jobs.items():
+                trigger = self._triggers.get(job_id)
+                if trigger is None or str(trigger) != str(job.trigger):
+                    self._triggers[job_id] = job.trigger
+                    self._expected_run_times[job_id] = job.next_run_time
             
     def shutdown(self):
         """停止调度器"""
         if self.scheduler.running:
             self.scheduler.shutdown()
+            self._flush_event.set()
+            self.flush_run_times()
             logger.info("定时任务调度器已停止")
             
     def load_scheduled_tasks(self):
-        """从数据库加载所有启用的定时任务"""
+        """
+        从数据库加载所有启用的定时任务，与任务存储同步
+        触发时间未变化的任务保留存储中的下次执行时间，以便补执行停机期间错过的触发
+        """
+        # 延迟导入，scheduled_task_service 在模块加载时导入本模块
+        from app.services.scheduled_task_service import get_active_scheduled_tasks
         status, msg, tasks = get_active_scheduled_tasks()
         if not status:
             logger.error(f"加载定时任务失败: {msg}")
             return
-            
+
+        stored = {job.id: job for job in self.scheduler.get_jobs()
+                  if job.id.startswith(SCHEDULED_TASK_JOB_PREFIX)}
         for task in tasks:
-            self.add_job(task)
-            
+            self.add_job(task, stored.pop(f"{SCHEDULED_TASK_JOB_PREFIX}{task['id']}", None))
+
+        # 已删除或已禁用的任务
+        for job_id in stored:
+            self.scheduler.remove_job(job_id)
+            logger.info(f"已从任务存储中移除失效的定时任务: {job_id}")
+
+        # 所有任务的下次执行时间一次写入
+        self.flush_run_times()
         logger.info(f"已加载 {len(tasks)} 个定时任务")
         
-    def add_job(self, task):
-        """添加定时任务到调度器"""
+    def load_system_jobs(self):
+        """加载系统维护任务（日志保留清理等）"""
+        from app.services.log_retention_service import ensure_retention_configs, get_retention_settings, run_retention
+        with self.app.app_context():
+            ensure_retention_configs()
+            settings = get_retention_settings()
+        self.add_system_job("log_retention", run_retention, settings["cron"], "执行日志保留清理")
+
+        # 任务存储中已不再注册的系统任务
+        for job in self.scheduler.get_jobs():
+            if job.id.startswith("system_") and job.id[len("system_"):] not in self._system_jobs:
+                self.scheduler.remove_job(job.id)
+
+    def add_system_job(self, job_id, func, cron_expression, name=None):
+        """
+        添加系统维护任务，任务在Flask应用上下文中执行
+        :param job_id: 任务标识
+        :param func: 任务函数，无参数
+        :param cron_expression: cron表达式
+        :param name: 任务名称
+        """
+        try:
+            self._system_jobs[job_id] = func
+            trigger = CronTrigger.from_crontab(cron_expression)
+            existing = self.scheduler.get_job(f"system_{job_id}")
+            if existing and str(existing.trigger) == str(trigger):
+                # 触发时间未变化，保留存储中的下次执行时间
+                job = existing.modify(name=name or job_id, coalesce=True, max_instances=1)
+            else:
+                job = self.scheduler.add_job(
+                    func=run_system_job,
+                    trigger=trigger,
+                    id=f"system_{job_id}",
+                    args=[job_id],
+                    name=name or job_id,
+                    replace_existing=True,
+                    coalesce=True,
+                    max_instances=1
+                )
+            self._track_job(job, trigger)
+            logger.info(f"已添加系统任务: {name or job_id} ({cron_expression})")
+        except Exception as e:
+            logger.error(f"添加系统任务失败: {job_id}, {e}")
+
+    def execute_system_job(self, job_id):
+        """执行系统维护任务"""
+        if not self.app:
+            logger.error(f"执行系统任务失败，未设置Flask应用上下文: {job_id}")
+            return
+        func = self._system_jobs.get(job_id)
+        if func is None:
+            logger.error(f"执行系统任务失败，任务未注册: {job_id}")
+            return
+        with self.app.app_context():
+            try:
+                func()
+            except Exception as e:
+                logger.error(f"执行系统任务时发生异常: {job_id}, {e}")
+
+    def add_job(self, task, existing=None):
+        """
+        添加定时任务到调度器
+        :param task: 定时任务数据
+        :param existing: 任务存储中已有的同一任务，触发时间未变化时保留其下次执行时间
+        """
         # 确保在Flask应用上下文中执行
         if self.app:
             with self.app.app_context():
-                self._add_job_internal(task)
+                self._add_job_internal(task, existing)
         else:
             # 如果没有设置app实例，直接执行
-            self._add_job_internal(task)
+            self._add_job_internal(task, existing)
             
-    def _add_job_internal(self, task):
+    def _add_job_internal(self, task, existing=None):
         """内部方法：添加定时任务到调度器"""
         try:
             # 创建cron触发器
-            trigger = CronTrigger.from_crontab(task['cron_expression'])
-            
-            # 计算下次执行时间
-            next_run_time = trigger.get_next_fire_time(None, datetime.now())
-            if next_run_time:
-                # 更新任务的下次执行时间
-                from app.models.base_models import ScheduledTask
-                from app import db
-                scheduled_task = ScheduledTask.query.get(task['id'])
-                if scheduled_task:
-                    scheduled_task.next_run_time = next_run_time
-                    db.session.commit()
-                    # 更新task字典中的next_run_time
-                    task['next_run_time'] = next_run_time
-            
-            # 添加任务到调度器
-            job = self.scheduler.add_job(
-                func=self.execute_scheduled_task,
-                trigger=trigger,
-                id=f"scheduled_task_{task['id']}",
-                args=[task['id'], task['feature_id']],
-                name=task['name']
-            )
+            trigger = self._build_trigger(task)
+            job_id = f"{SCHEDULED_TASK_JOB_PREFIX}{task['id']}"
+            policy = self._run_policy(task)
+
+            args = (task['id'], task['feature_id'])
+            if existing and str(existing.trigger) == str(trigger):
+                # 触发时间未变化，保留存储中的下次执行时间；其他属性也未变化时不写任务存储
+                if existing.name != task['name'] or tuple(existing.args) != args or \
+                        any(getattr(existing, key) != value for key, value in policy.items()):
+                    existing.modify(name=task['name'], args=list(args), **policy)
+                job = existing
+            else:
+                job = self.scheduler.add_job(
+                    func=run_scheduled_task,
+                    trigger=trigger,
+                    id=job_id,
+                    args=[task['id'], task['feature_id']],
+                    name=task['name'],
+                    replace_existing=True,
+                    **policy
+                )
+            self._track_job(job, trigger)
+
+            # 下次执行时间，调度器未启动时按当前时间计算，由后台线程批量写入数据库
+            next_run_time = _local_naive(getattr(job, 'next_run_time', None)) or \
+                trigger.get_next_fire_time(None, datetime.now())
+            self._set_run_times(task['id'], next_run_time=next_run_time)
+            task['next_run_time'] = next_run_time
             
             # 记录映射关系
             self.job_mapping[task['id']] = job.id
@@ -99,10 +334,11 @@ class TaskScheduler:
     def _remove_job_internal(self, task_id):
         """内部方法：从调度器中移除定时任务"""
         try:
-            if task_id in self.job_mapping:
-                job_id = self.job_mapping[task_id]
+            # 多实例共用任务存储时，任务可能由其他实例添加，不在本实例的映射中
+            job_id = self.job_mapping.pop(task_id, f"{SCHEDULED_TASK_JOB_PREFIX}{task_id}")
+            self._untrack_job(job_id)
+            if self.scheduler.get_job(job_id):
                 self.scheduler.remove_job(job_id)
-                del self.job_mapping[task_id]
                 logger.info(f"已移除定时任务 ID: {task_id}")
         except Exception as e:
             logger.error(f"移除定时任务失败: {e}")
@@ -126,12 +362,7 @@ class TaskScheduler:
             self.add_job(task)
         else:
             # 如果任务被禁用，更新其下次执行时间为None
-            from app.models.base_models import ScheduledTask
-            from app import db
-            scheduled_task = ScheduledTask.query.get(task['id'])
-            if scheduled_task:
-                scheduled_task.next_run_time = None
-                db.session.commit()
+            self._set_run_times(task['id'], next_run_time=None)
         
     def execute_scheduled_task(self, task_id, feature_id):
         """执行定时任务"""
@@ -147,26 +378,15 @@ class TaskScheduler:
         try:
             logger.info(f"开始执行定时任务 ID: {task_id}, 功能 ID: {feature_id}")
             
-            # 更新任务的上次执行时间和下次执行时间
-            from app.models.base_models import ScheduledTask
-            from app import db
-            scheduled_task = ScheduledTask.query.get(task_id)
-            if scheduled_task:
-                # 更新上次执行时间
-                last_run_time = datetime.now()
-                scheduled_task.last_run_time = last_run_time
-                
-                # 重新计算下次执行时间
-                trigger = CronTrigger.from_crontab(scheduled_task.cron_expression)
-                next_run_time = trigger.get_next_fire_time(last_run_time, last_run_time)
-                scheduled_task.next_run_time = next_run_time
-                
-                db.session.commit()
+            # 更新任务的上次执行时间，由后台线程批量写入数据库；下次执行时间在触发事件中按任务存储更新
+            self._set_run_times(task_id, last_run_time=datetime.now())
             
             # 使用特殊客户端ID标识定时任务执行
             client_id = f"scheduled_task_{task_id}"
             # 执行功能
-            status, msg, _ = execute_feature(feature_id, client_id, execution_type="scheduled")
+            # 等待执行结束，调度器的 max_instances 限制覆盖功能的实际执行时间
+            status, msg, _ = execute_feature(feature_id, client_id, execution_type="scheduled", wait=True,
+                                             timeout=self.app.config.get('SCHEDULER_RUN_TIMEOUT'))
                     
             if status:
                 logger.info(f"定时任务执行成功: {msg}")
@@ -175,5 +395,200 @@ class TaskScheduler:
         except Exception as e:
             logger.error(f"执行定时任务时发生异常: {e}")
 
+    def _set_run_times(self, task_id, **times):
+        """更新执行时间视图，标记为待写入数据库"""
+        with self._lock:
+            self._run_times.setdefault(task_id, {}).update(times)
+            self._dirty_run_times.add(task_id)
+
+    def get_run_times(self):
+        """
+        获取执行时间视图
+        :return: dict 任务ID -> {next_run_time, last_run_time}，只包含本实例调度过的任务
+        """
+        with self._lock:
+            return {task_id: dict(times) for task_id, times in self._run_times.items()}
+
+    def _flush_loop(self):
+        interval = self.app.config.get('SCHEDULER_RUN_TIMES_FLUSH_INTERVAL', 2) if self.app else 2
+        while not self._flush_event.wait(interval):
+            self.flush_run_times()
+
+    def flush_run_times(self):
+        """将变更的执行时间批量写入数据库，每个批次最多两条UPDATE语句"""
+        with self._lock:
+            if not self._dirty_run_times:
+                return
+            dirty = {task_id: dict(self._run_times.get(task_id, {})) for task_id in self._dirty_run_times}
+            self._dirty_run_times.clear()
+        # 按更新的列分组，同一组使用executemany
+        groups = {}
+        for task_id, times in dirty.items():
+            groups.setdefault(tuple(sorted(times)), []).append(
+                {"task_id": task_id, **{f"new_{column}": value for column, value in times.items()}})
+        try:
+            from sqlalchemy import bindparam, update
+            from app.models.base_models import ScheduledTask
+            from app import db
+            table = ScheduledTask.__table__
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    for columns, rows in groups.items():
+                        conn.execute(
+                            update(table).where(table.c.id == bindparam("task_id"))
+                            .values({column: bindparam(f"new_{column}") for column in columns}),
+                            rows
+                        )
+        except Exception as e:
+            logger.error(f"写入定时任务执行时间失败: {e}")
+            # 下次重试
+            with self._lock:
+                self._dirty_run_times.update(dirty)
+
+    def _track_job(self, job, trigger):
+        """记录任务的触发器和下一次应触发的时间，用于统计合并的触发次数"""
+        with self._lock:
+            self._triggers[job.id] = trigger
+            self._expected_run_times[job.id] = getattr(job, 'next_run_time', None)
+
+    def _untrack_job(self, job_id):
+        with self._lock:
+            self._triggers.pop(job_id, None)
+            self._expected_run_times.pop(job_id, None)
+
+    def _count(self, job_id, name, n=1):
+        self._counters[name] += n
+        counters = self._job_counters.get(job_id)
+        if counters is None:
+            counters = self._job_counters[job_id] = dict.fromkeys(self._counters, 0)
+        counters[name] += n
+
+    def _fired_job(self, event):
+        """
+        触发的定时任务在任务存储中的当前状态
+        触发事件在调度器更新任务存储之后派发，此时任务的下次执行时间已是本次触发之后的时间；
+        任务可能由其他实例添加或修改，本实例记录的触发器不一定是最新的
+        """
+        if event.code not in (EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES) or \
+                not event.job_id.startswith(SCHEDULED_TASK_JOB_PREFIX):
+            return None
+        try:
+            return self.scheduler.get_job(event.job_id)
+        except Exception as e:
+            logger.error(f"读取定时任务 {event.job_id} 失败: {e}")
+            return None
+
+    def _on_job_event(self, event):
+        """调度器事件监听，统计错过、合并和因并发上限跳过的触发，更新定时任务的下次执行时间"""
+        job = self._fired_job(event)
+        with self._lock:
+            if event.code in (EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES):
+                run_times = event.scheduled_run_times
+                coalesced = self._skipped_run_times(event.job_id, run_times[0]) if run_times else 0
+                if coalesced:
+                    self._count(event.job_id, "coalesced", coalesced)
+                    logger.warning(f"定时任务 {event.job_id} 错过的 {coalesced} 次触发已合并执行")
+                trigger = self._triggers.get(event.job_id)
+                if job is not None:
+                    self._triggers[event.job_id] = job.trigger
+                    self._expected_run_times[event.job_id] = job.next_run_time
+                elif trigger is not None and run_times:
+                    self._expected_run_times[event.job_id] = trigger.get_next_fire_time(run_times[-1], run_times[-1])
+                if event.code == EVENT_JOB_SUBMITTED:
+                    self._count(event.job_id, "submitted")
+                    if event.job_id.startswith(SCHEDULED_TASK_JOB_PREFIX):
+                        self._record_dispatch()
+                else:
+                    self._count(event.job_id, "max_instances_skipped")
+                    logger.warning(f"定时任务 {event.job_id} 仍在执行，已达到最大并发数，本次触发跳过")
+            elif event.code == EVENT_JOB_MISSED:
+                self._count(event.job_id, "missed")
+                logger.warning(f"定时任务 {event.job_id} 错过执行时间 {event.scheduled_run_time}，超过容忍时间未执行")
+            elif event.code == EVENT_JOB_ERROR:
+                self._count(event.job_id, "errors")
+            else:
+                self._count(event.job_id, "executed")
+        # 任务已没有下次触发时间时由调度器移除，启用中的任务不写入空的下次执行时间
+        if job is not None and job.next_run_time is not None:
+            task_id = int(event.job_id[len(SCHEDULED_TASK_JOB_PREFIX):])
+            self._set_run_times(task_id, next_run_time=_local_naive(job.next_run_time))
+
+    def _skipped_run_times(self, job_id, first_run_time):
+        """应触发时间到本次执行时间之间未执行的触发次数，即因合并而丢弃的触发"""
+        trigger = self._triggers.get(job_id)
+        expected = self._expected_run_times.get(job_id)
+        count = 0
+        while trigger is not None and expected is not None and expected < first_run_time \
+                and count < MAX_COALESCED_COUNT:
+            count += 1
+            expected = trigger.get_next_fire_time(expected, expected)
+        return count
+
+    def _record_dispatch(self):
+        """记录一次定时任务派发，只保留统计窗口内的记录，需持有锁"""
+        now = time.time()
+        self._dispatch_times.append(now)
+        horizon = now - self.app.config.get('SCHEDULER_DISPATCH_HISTORY_MINUTES', 60) * 60
+        while self._dispatch_times and self._dispatch_times[0] < horizon:
+            self._dispatch_times.popleft()
+
+    def dispatch_histogram(self, minutes=60):
+        """
+        定时任务派发分布，用于确认错峰后负载是否平滑
+        :param minutes: 统计最近/未来的分钟数
+        :return: dict dispatched 最近实际派发的分布，planned 按当前触发器推算的未来派发分布，
+                 各自包含每分钟的派发数（by_minute）和按分钟内秒数汇总的派发数（by_second）
+        """
+        now = time.time()
+        with self._lock:
+            dispatched = [t for t in self._dispatch_times if t >= now - minutes * 60]
+            triggers = [(job_id, trigger) for job_id, trigger in self._triggers.items()
+                        if job_id.startswith(SCHEDULED_TASK_JOB_PREFIX)]
+
+        # 按触发器推算未来的触发时间
+        planned = []
+        start = datetime.now().astimezone()
+        end = start + timedelta(minutes=minutes)
+        for _, trigger in triggers:
+            fire_time = trigger.get_next_fire_time(None, start)
+            count = 0
+            while fire_time and fire_time < end and count < MAX_COALESCED_COUNT:
+                planned.append(fire_time.timestamp())
+                fire_time = trigger.get_next_fire_time(fire_time, fire_time)
+                count += 1
+        return {
+            "minutes": minutes,
+            "dispatched": self._histogram(dispatched),
+            "planned": self._histogram(planned)
+        }
+
+    @staticmethod
+    def _histogram(timestamps):
+        by_minute = collections.Counter()
+        by_second = [0] * 60
+        for ts in timestamps:
+            moment = datetime.fromtimestamp(ts)
+            by_minute[moment.strftime('%Y-%m-%d %H:%M')] += 1
+            by_second[moment.second] += 1
+        return {
+            "total": len(timestamps),
+            "peak_per_minute": max(by_minute.values()) if by_minute else 0,
+            "peak_per_second": max(by_second),
+            "by_minute": [{"minute": minute, "count": count} for minute, count in sorted(by_minute.items())],
+            "by_second": by_second
+        }
+
+    def stats(self):
+        """获取调度器指标"""
+        with self._lock:
+            return {
+                "running": self.scheduler.running,
+                "jobstore": self._jobstore_name,
+                "job_count": len(self._triggers),
+                "defaults": self._default_policy(),
+                **self._counters,
+                "jobs": {job_id: dict(counters) for job_id, counters in self._job_counters.items()}
+            }
+
 # 创建全局调度器实例
 task_scheduler = TaskScheduler()
\ No newline at end of file
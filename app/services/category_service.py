@@ -1,7 +1,7 @@
 from app import db
 from sqlalchemy import text
 from app.models.base_models import Category
-from app.util.serviceUtil import model_to_dict
+from app.util.serviceUtil import rows_to_dicts
 
 def get_category_by_customer_id(customer_id = None):
     condition = ""
@@ -10,10 +10,10 @@ def get_category_by_customer_id(customer_id = None):
     sql = text(f'''
                 select cg.* from base_category cg
                 {condition}
-                group by cg.id
+                order by cg.id
                ''')
     result = db.session.execute(sql, {'customer_id': customer_id}).fetchall()
-    categorys = model_to_dict(result, Category)
+    categorys = rows_to_dicts(result, Category)
     # 将数据转换为字典格式，便于查找
     data_dict = {item['id']: item for item in categorys}
     # 构建父子关系
@@ -112,4 +112,4 @@ def get_category_by_name(category_name = None):
         select * from base_category where name = :category_name
     ''')
     result = db.session.execute(sql, {'category_name': category_name}).fetchall()
-    return True, "成功", model_to_dict(result, Category)
\ No newline at end of file
+    return True, "成功", rows_to_dicts(result, Category)
\ No newline at end of file
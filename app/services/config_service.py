@@ -1,7 +1,7 @@
 from app import db
 from sqlalchemy import text
 from app.models.base_models import Config, Feature
-from app.util.serviceUtil import model_to_dict
+from app.util.serviceUtil import rows_to_dicts
 import logging
 
 def get_all_config():
@@ -12,7 +12,7 @@ def get_all_config():
             LEFT JOIN base_feature f ON c.feature_id = f.id
         ''')
         result = db.session.execute(sql).fetchall()
-        return True, "成功", model_to_dict(result, Config)
+        return True, "成功", rows_to_dicts(result, Config)
     except Exception as e:
         logging.error(f"获取配置列表失败: {str(e)}")
         return False, f"获取配置列表失败: {str(e)}", []
@@ -37,20 +37,20 @@ def get_filtered_config(feature_id=None, feature_name=None, config_name=None, co
                 params['feature_id'] = feature_id
                 
         if feature_name:
-            sql += ' AND f.name LIKE :feature_name'
+            sql += ' AND LOWER(f.name) LIKE LOWER(:feature_name)'
             params['feature_name'] = f'%{feature_name}%'
             
         if config_name:
-            sql += ' AND c.name LIKE :config_name'
+            sql += ' AND LOWER(c.name) LIKE LOWER(:config_name)'
             params['config_name'] = f'%{config_name}%'
             
         if config_description:
-            sql += ' AND c.description LIKE :config_description'
+            sql += ' AND LOWER(c.description) LIKE LOWER(:config_description)'
             params['config_description'] = f'%{config_description}%'
         
         # 执行查询
         result = db.session.execute(text(sql), params).fetchall()
-        return True, "成功", model_to_dict(result, Config)
+        return True, "成功", rows_to_dicts(result, Config)
     except Exception as e:
         logging.error(f"获取筛选配置列表失败: {str(e)}")
         return False, f"获取筛选配置列表失败: {str(e)}", []
@@ -66,7 +66,7 @@ def get_config_by_id(config_id):
             WHERE c.id = :config_id
         ''')
         result = db.session.execute(sql, {'config_id': config_id}).fetchall()
-        return True, "成功", model_to_dict(result, Config)
+        return True, "成功", rows_to_dicts(result, Config)
     except Exception as e:
         logging.error(f"获取配置失败: {str(e)}")
         return False, f"获取配置失败: {str(e)}", []
@@ -82,7 +82,7 @@ def get_config_by_feature_id(feature_id):
             WHERE c.feature_id = :feature_id
         ''')
         result = db.session.execute(sql, {'feature_id': feature_id}).fetchall()
-        return True, "成功", model_to_dict(result, Config)
+        return True, "成功", rows_to_dicts(result, Config)
     except Exception as e:
         logging.error(f"获取配置失败: {str(e)}")
         return False, f"获取配置失败: {str(e)}", []
@@ -1,8 +1,9 @@
 from app import db
 from sqlalchemy import text
 from app.models.base_models import Customer
-from app.models.user_models import UserCustomer
+from app.models.user_models import User, UserCustomer
 from app.util.serviceUtil import model_to_dict
+from app.util.principal_cache import principal_cache
 
 def get_all_customer(user_id, role):
     """
@@ -63,8 +64,15 @@ def del_customer(customer_id):
         if not customer:
             return False, f"未找到ID为[{customer_id}]的客户"
         
+        # 关联该客户的用户的令牌中可能携带该客户（无状态鉴权），使这些令牌失效
+        user_ids = db.session.query(UserCustomer.user_id).filter_by(customer_id=customer_id)
+        User.query.filter(User.id.in_(user_ids)) \
+            .update({User.token_version: User.token_version + 1}, synchronize_session=False)
+        UserCustomer.query.filter_by(customer_id=customer_id).delete(synchronize_session=False)
         db.session.delete(customer)
         db.session.commit()
+        # 用户的关联客户集合中可能包含该客户
+        principal_cache.clear()
         return True, "删除成功"
     except Exception as e:
         db.session.rollback()
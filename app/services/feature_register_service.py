@@ -1,68 +1,44 @@
 import os, sys
 import subprocess
-import importlib.util
 from app.services import feature_service, customer_service, config_service
 from app import db
 from app.models.base_models import Feature, Config
 from app.util.log_utils import logger
+from app.util.feature_module_cache import feature_module_cache
 
 FEATURE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../features"))
 UPLOADED_FEATURE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../uploaded_features"))
 SCAN_INTERVAL = 60  # 每60秒全量扫描一次
 
 def load_feature_meta(script_path):
-    module_name = None
     try:
         logger.info(f"当前 Python 可执行文件: {sys.executable}")
         logger.info(f"当前 Python 版本: {sys.version}")
 
-        if os.path.isfile(script_path) and script_path.endswith('.py'):
-            module_name = f"feature_module_{hash(script_path) & 0x7FFFFFFF}"
-            spec = importlib.util.spec_from_file_location(module_name, script_path)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-            try:
-                spec.loader.exec_module(module)
-            except ModuleNotFoundError as e:
-                missing_module = e.name
-                logger.warning(f"检测到缺失依赖: {missing_module}, 正在尝试自动安装...")
-                _auto_install_dependency(missing_module)
-                # 再次尝试加载模块
-                spec.loader.exec_module(module)
+        is_script = os.path.isfile(script_path) and script_path.endswith('.py')
+        is_package = os.path.isdir(script_path) and os.path.exists(os.path.join(script_path, "__init__.py"))
+        if not is_script and not is_package:
+            return None
 
-            meta = getattr(module, "__meta__", None)
-            sys.modules.pop(module_name, None)
+        # 解析源码读取__meta__，不导入模块；进程模式的功能及其依赖不会加载到Web进程中
+        meta = feature_module_cache.read_meta(script_path)
+        if meta is not None:
             return meta
 
-        elif os.path.isdir(script_path):
-            init_file = os.path.join(script_path, "__init__.py")
-            if os.path.exists(init_file):
-                module_name = f"feature_module_{hash(script_path) & 0x7FFFFFFF}"
-                spec = importlib.util.spec_from_file_location(module_name, init_file)
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = module
-                try:
-                    spec.loader.exec_module(module)
-                except ModuleNotFoundError as e:
-                    missing_module = e.name
-                    logger.warning(f"检测到缺失依赖: {missing_module}, 正在尝试自动安装...")
-                    _auto_install_dependency(missing_module)
-                    spec.loader.exec_module(module)
-
-                meta = getattr(module, "__meta__", None)
-                module_keys_to_remove = [key for key in list(sys.modules.keys()) if key.startswith(module_name)]
-                for key in module_keys_to_remove:
-                    sys.modules.pop(key, None)
-                return meta
+        # __meta__不是字面量时通过模块缓存加载，与执行功能共用已加载的模块，文件未变化时不会重复执行模块代码
+        try:
+            module = feature_module_cache.load(script_path)
+        except ModuleNotFoundError as e:
+            missing_module = e.name
+            logger.warning(f"检测到缺失依赖: {missing_module}, 正在尝试自动安装...")
+            _auto_install_dependency(missing_module)
+            # 再次尝试加载模块
+            module = feature_module_cache.load(script_path)
 
-        return None
+        return getattr(module, "__meta__", None)
 
     except Exception as e:
         logger.warning(f"加载功能脚本失败: {script_path}, 错误: {e}")
-        if module_name:
-            module_keys_to_remove = [key for key in list(sys.modules.keys()) if key.startswith(module_name)]
-            for key in module_keys_to_remove:
-                sys.modules.pop(key, None)
         return None
 
 
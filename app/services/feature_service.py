@@ -1,14 +1,16 @@
 from app import db
 from sqlalchemy import text
 from app.models.base_models import Feature
-from app.util.serviceUtil import model_to_dict
-import importlib.util
+from app.util.serviceUtil import rows_to_dicts
 import os
 from app.services import feature_service, config_service
 from app.util.log_utils import logger
 from app.util.feature_execution_context import FeatureExecutionContext
+from app.ws_server import wait_for_client
+from app.util.feature_dispatcher import feature_dispatcher, FeatureCancelled, PRIORITIES, CONCURRENCY_POLICIES
+from app.util.feature_process_pool import feature_process_pool
+from app.util.feature_module_cache import feature_module_cache
 from flask import current_app
-import threading
 import time
 import zipfile
 import shutil
@@ -16,12 +18,13 @@ import shutil
 def get_all_feature():
     sql = text('''
                select ft.id, ft.name, ft.description, ft.customer_id,
+                    ft.priority, ft.max_concurrency, ft.concurrency_policy,
                     ct.name customer_name from base_feature ft
                 left join base_customer ct on ft.customer_id = ct.id
-                group by ft.id, ct.id
+                order by ft.id
                ''')
     result = db.session.execute(sql).fetchall()
-    return True, "成功", model_to_dict(result, Feature)
+    return True, "成功", rows_to_dicts(result, Feature)
 
 def get_feature_by_customer_id(customer_id):
     if customer_id is None:
@@ -31,10 +34,10 @@ def get_feature_by_customer_id(customer_id):
                     ct.name customer_name from base_feature ft
                 left join base_customer ct on ft.customer_id = ct.id
                 where ct.id = :customer_id
-                group by ft.id, ct.id
+                order by ft.id
                ''')
     result = db.session.execute(sql, {'customer_id': customer_id}).fetchall()
-    return True, "成功", model_to_dict(result, Feature)
+    return True, "成功", rows_to_dicts(result, Feature)
 
 def get_feature_by_category_id(category_id, customer_id=None):
     if category_id is None:
@@ -54,11 +57,11 @@ def get_feature_by_category_id(category_id, customer_id=None):
         sql_str += ' and ft.customer_id = :customer_id'
         params['customer_id'] = customer_id
     
-    sql_str += ' group by ft.id, ct.id'
+    sql_str += ' order by ft.id'
     
     sql = text(sql_str)
     result = db.session.execute(sql, params).fetchall()
-    return True, "成功", model_to_dict(result, Feature)
+    return True, "成功", rows_to_dicts(result, Feature)
 
 def add_feature(feature):
     """
@@ -70,7 +73,7 @@ def add_feature(feature):
     db.session.commit()
     return True, "添加成功", feature.to_dict()
 
-def update_feature(feature_id, name=None, description=None, customer_id=None, category_id=None):
+def update_feature(feature_id, name=None, description=None, customer_id=None, category_id=None, **execution):
     """
     更新指定feature_id的功能信息
     :param feature_id: 功能ID
@@ -78,11 +81,22 @@ def update_feature(feature_id, name=None, description=None, customer_id=None, ca
     :param description: 功能描述
     :param customer_id: 客户ID
     :param category_id: 分类ID
+    :param execution: 执行策略 priority/max_concurrency/concurrency_policy，传入None表示恢复默认值
     :return: (bool, str, dict) 是否成功，提示信息，更新后的数据
     """
     feature = Feature.query.get(feature_id)
     if not feature:
         return False, f"未找到ID为[{feature_id}]的功能", None
+    if execution.get('priority') not in (None, *PRIORITIES):
+        return False, f"priority 只能为 {'/'.join(PRIORITIES)}", None
+    if execution.get('concurrency_policy') not in (None, *CONCURRENCY_POLICIES):
+        return False, f"concurrency_policy 只能为 {'/'.join(CONCURRENCY_POLICIES)}", None
+    max_concurrency = execution.get('max_concurrency')
+    if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+        return False, "max_concurrency 必须是正整数", None
+    for key in ('priority', 'max_concurrency', 'concurrency_policy'):
+        if key in execution:
+            setattr(feature, key, execution[key])
     if name is not None:
         feature.name = name
     if description is not None:
@@ -107,7 +121,9 @@ def update_feature_service(feature_id, feature_data):
             name=feature_data.get('name'),
             description=feature_data.get('description'),
             customer_id=feature_data.get('customer_id'),
-            category_id=feature_data.get('category_id')
+            category_id=feature_data.get('category_id'),
+            **{key: feature_data[key] for key in ('priority', 'max_concurrency', 'concurrency_policy')
+               if key in feature_data}
         )
     except Exception as e:
         return False, f"更新失败: {str(e)}", None
@@ -133,6 +149,8 @@ def delete_feature(feature_id):
             base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
             # 拼接文件路径
             file_path = os.path.join(base_dir, feature.feature_file_name)
+            # 卸载已缓存的功能模块
+            feature_module_cache.invalidate(file_path)
             # 如果文件或目录存在则删除
             if os.path.exists(file_path):
                 # 检查是否为目录
@@ -180,7 +198,16 @@ def get_feature_by_id(feature_id):
         return False, f"未找到ID为[{feature_id}]的功能", None
     return True, "成功", feature.to_dict()
 
-def execute_feature(feature_id, client_id, execution_type="manual"):
+def execute_feature(feature_id, client_id, execution_type="manual", wait=False, timeout=None):
+    """
+    执行功能，按功能的优先级分配执行线程池，按并发策略限制同一功能同时执行的数量
+    :param feature_id: 功能ID
+    :param client_id: 客户端ID
+    :param execution_type: 执行类型 manual/scheduled
+    :param wait: 是否等待执行结束，定时任务等待执行结束以便调度器的并发限制覆盖实际执行时间
+    :param timeout: 等待执行结束的最长秒数，为空时一直等待
+    :return: (bool, str, dict) 是否成功，提示信息，排队信息
+    """
     # 1. 查询功能信息
     ok, msg, feature = feature_service.get_feature_by_id(feature_id)
     if not ok:
@@ -208,27 +235,36 @@ def execute_feature(feature_id, client_id, execution_type="manual"):
 
     # 5. 动态加载并异步执行 run()
     app = current_app._get_current_object()
-    def run_feature_script():
+    submitted_at = time.perf_counter()
+    def run_feature_script(run):
         with app.app_context():
-            ctx = FeatureExecutionContext(client_id, feature.get("name"), feature_id, execution_type=execution_type)
-            # 使用脚本路径生成唯一的模块名
-            module_name = f"feature_module_{hash(script_path) & 0x7FFFFFFF}"
+            # 手动执行需要等待客户端完成WebSocket注册，否则实时日志会丢失；定时任务无需等待
+            if execution_type == "manual":
+                if not wait_for_client(client_id, app.config.get('FEATURE_CLIENT_READY_TIMEOUT', 5)):
+                    logger.warning(f"客户端 {client_id} 未在超时时间内完成注册，继续执行")
+            ctx = FeatureExecutionContext(client_id, feature.get("name"), feature_id, execution_type=execution_type,
+                                          customer_id=feature.get("customer_id"), cancel_event=run.cancel_event)
+            ctx.record_phase("queue_wait", submitted_at)
             module = None
             try:
-                import sys
-                # 检查模块是否已经加载过
-                if module_name in sys.modules:
-                    module = sys.modules[module_name]
-                else:
-                    spec = importlib.util.spec_from_file_location(module_name, script_path)
-                    module = importlib.util.module_from_spec(spec)
-                    # 将模块添加到sys.modules中，以支持相对导入
-                    sys.modules[module_name] = module
-                    spec.loader.exec_module(module)
-                if not hasattr(module, "run"):
+                # 功能可通过__meta__选择在进程池中执行，避免CPU密集型任务占用GIL；
+                # __meta__通过解析源码读取，进程模式的功能模块只在工作进程中导入
+                phase_start = time.perf_counter()
+                meta = feature_module_cache.read_meta(script_path)
+                if meta is None:
+                    # __meta__不是字面量时导入模块读取
+                    module = feature_module_cache.load(script_path)
+                    meta = getattr(module, "__meta__", None) or {}
+                process_mode = meta.get("execution_mode") == "process"
+                if not process_mode and module is None:
+                    # 从模块缓存加载，脚本文件变化时自动重新加载
+                    module = feature_module_cache.load(script_path)
+                ctx.record_phase("load", phase_start)
+                if not process_mode and not hasattr(module, "run"):
                     ctx.log(f"{feature.get('name', '未知功能')} 功能脚本缺少 run() 方法，不符合规范", "error", False)
                     ctx.error(f"{feature.get('name', '未知功能')} 功能脚本缺少 run() 方法，不符合规范")
                     return
+                phase_start = time.perf_counter()
                 config = config_service.get_config_by_feature_id(feature_id)
                 config_dict = {
                         c['name']: c['value'] if c.get('value') not in [None, ''] else c.get('default_value')
@@ -236,29 +272,56 @@ def execute_feature(feature_id, client_id, execution_type="manual"):
                     } if config[0] else {}
                 if not config_dict:
                     config_dict = {}
+                ctx.record_phase("config", phase_start)
                 # 如果配置中存在为空的值，也没有默认值，则认为是无效配置，指出没有值的配置，报错并结束
                 if not all(v is not None for v in config_dict.values()):
                     missing_configs = [k for k, v in config_dict.items() if v is None]
                     ctx.log(f"{feature.get('name', '未知功能')} 功能脚本配置无效，缺少值的配置: {missing_configs}", "error", False)
                     ctx.fail(f"{feature.get('name', '未知功能')} 功能脚本配置无效，缺少值的配置: {missing_configs}")
                     return
-                # 等待一秒后执行
-                time.sleep(1)
-                status, msg, data = module.run(config_dict, ctx)
+                phase_start = time.perf_counter()
+                if process_mode:
+                    status, msg, data = feature_process_pool.run(script_path, config_dict, ctx)
+                else:
+                    status, msg, data = module.run(config_dict, ctx)
+                ctx.record_phase("run", phase_start)
                 if status:
                     ctx.log("功能执行成功")
                     ctx.done(msg, data)
                 else:
                     ctx.log(f"功能执行失败: {msg}", "error", False)
                     ctx.fail(msg, data)
+            except FeatureCancelled:
+                ctx.log("执行已被取消")
+                ctx.terminate("执行已被取消")
             except Exception as e:
                 ctx.log(f"执行异常：{e}", "error", False)
                 ctx.fail(str(e))
+            finally:
+                # 确保任何退出路径都释放日志通道
+                ctx.close()
 
-    t = threading.Thread(target=run_feature_script)
-    t.start()
-    msg = "功能已启动，日志和结果将通过WebSocket实时推送" if execution_type=="manual" else "定时任务已启动，执行结果将展示在日志中"
-    return True, msg, None
+    # 6. 按优先级提交到有界执行线程池，队列已满或按并发策略跳过时拒绝执行
+    accepted, admission_msg, admission = feature_dispatcher.submit(
+        feature_id, run_feature_script,
+        priority=feature.get('priority'),
+        max_concurrency=feature.get('max_concurrency'),
+        policy=feature.get('concurrency_policy')
+    )
+    if not accepted:
+        return False, admission_msg, admission
+    run = admission.pop("run")
+    if run.state == "waiting":
+        msg = admission_msg
+    else:
+        msg = "功能已启动，日志和结果将通过WebSocket实时推送" if execution_type=="manual" else "定时任务已启动，执行结果将展示在日志中"
+    if wait:
+        # 等待期间不占用数据库连接
+        db.session.close()
+        if not run.wait(timeout):
+            return True, f"等待执行结束超时（{timeout}秒），执行仍在进行", {**admission, "state": run.state}
+        msg = "执行已被取消" if run.state == "cancelled" else "执行已结束"
+    return True, msg, {**admission, "state": run.state}
 
 def register_feature(file, name, description, customer_id, category_id):
     """
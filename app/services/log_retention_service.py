@@ -0,0 +1,389 @@
+"""
+执行日志保留策略
+按系统配置（feature_id=0）将超过保留天数的执行记录归档为按天分文件的压缩JSONL，
+然后分批删除并回收数据库空间。归档文件可以通过日志接口继续查询。
+"""
+
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.base_models import Config, Feature, FeatureExecutionLog, FeatureExecutionLogDetail
+from app.util.log_fts import delete_details_index, rebuild_index, optimize_index
+from app.util.log_utils import logger
+
+try:
+    import zstandard
+except ImportError:  # 未安装zstandard时使用gzip归档
+    zstandard = None
+
+# 系统配置项: (名称, 默认值, 描述)
+RETENTION_CONFIGS = (
+    ("log_retention_days", "30", "执行日志保留天数，超过的日志归档后删除，0表示不清理"),
+    ("log_archive_enabled", "true", "删除前是否将执行日志归档为压缩文件 true/false"),
+    ("log_archive_compression", "zstd", "归档压缩格式 zstd/gzip，未安装zstandard时使用gzip"),
+    ("log_retention_batch_size", "200", "每个删除事务处理的执行记录数"),
+    ("log_retention_cron", "30 3 * * *", "日志清理任务的cron表达式，修改后重启生效"),
+    ("log_vacuum_mode", "incremental", "清理后的空间回收方式 incremental/full/none"),
+    ("log_vacuum_pages", "10000", "incremental模式下每次最多回收的页数"),
+)
+
+ARCHIVE_PREFIX = "feature_logs_"
+ARCHIVE_EXTENSIONS = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+DATE_FORMAT = '%Y-%m-%d'
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_lock = threading.Lock()
+_state = {"running": False, "last_result": None}
+
+
+def ensure_retention_configs():
+    """创建缺失的日志保留系统配置"""
+    existing = {c.name for c in Config.query.filter_by(feature_id=0).all()}
+    created = False
+    for name, default_value, description in RETENTION_CONFIGS:
+        if name in existing:
+            continue
+        db.session.add(Config(name=name, value=default_value, default_value=default_value,
+                              description=description, feature_id=0))
+        created = True
+    if created:
+        db.session.commit()
+
+
+def get_retention_settings():
+    """读取日志保留系统配置"""
+    values = {name: default for name, default, _ in RETENTION_CONFIGS}
+    names = list(values.keys())
+    for config in Config.query.filter(Config.feature_id == 0, Config.name.in_(names)).all():
+        value = config.value if config.value not in (None, "") else config.default_value
+        if value not in (None, ""):
+            values[config.name] = value
+    compression = values["log_archive_compression"].lower()
+    if compression not in ARCHIVE_EXTENSIONS or (compression == "zstd" and zstandard is None):
+        compression = "gzip"
+    return {
+        "retention_days": int(values["log_retention_days"]),
+        "archive_enabled": values["log_archive_enabled"].lower() in ("true", "1", "yes"),
+        "compression": compression,
+        "batch_size": max(int(values["log_retention_batch_size"]), 1),
+        "cron": values["log_retention_cron"],
+        "vacuum_mode": values["log_vacuum_mode"].lower(),
+        "vacuum_pages": max(int(values["log_vacuum_pages"]), 1)
+    }
+
+
+def _archive_dir():
+    return current_app.config.get('LOG_ARCHIVE_DIR', os.path.join('logs', 'archive'))
+
+
+def _archive_path(day, compression):
+    return os.path.join(_archive_dir(), f"{ARCHIVE_PREFIX}{day}{ARCHIVE_EXTENSIONS[compression]}")
+
+
+def _format_time(value):
+    return value.strftime(TIME_FORMAT) if value else None
+
+
+def _collect_runs(logs):
+    """读取一批执行记录及其明细，转换为归档记录"""
+    log_ids = [log.id for log in logs]
+    details = {}
+    rows = db.session.query(
+        FeatureExecutionLogDetail.id,
+        FeatureExecutionLogDetail.log_id,
+        FeatureExecutionLogDetail.timestamp,
+        FeatureExecutionLogDetail.level,
+        FeatureExecutionLogDetail.message,
+        FeatureExecutionLogDetail.request_id
+    ).filter(FeatureExecutionLogDetail.log_id.in_(log_ids)).order_by(FeatureExecutionLogDetail.id).all()
+    for row in rows:
+        details.setdefault(row.log_id, []).append({
+            "id": row.id,
+            "timestamp": _format_time(row.timestamp),
+            "level": row.level,
+            "message": row.message,
+            "request_id": row.request_id
+        })
+    runs = {}
+    for log in logs:
+        day = (log.start_time or log.created_date or datetime.now()).strftime(DATE_FORMAT)
+        runs.setdefault(day, []).append({
+            "log": {
+                "id": log.id,
+                "feature_id": log.feature_id,
+                "feature_name": log.feature_name,
+                "request_id": log.request_id,
+                "start_time": _format_time(log.start_time),
+                "end_time": _format_time(log.end_time),
+                "status": log.status,
+                "client_id": log.client_id,
+                "execution_type": log.execution_type,
+                "queue_wait_ms": log.queue_wait_ms,
+                "load_ms": log.load_ms,
+                "config_ms": log.config_ms,
+                "run_ms": log.run_ms,
+                "finalize_ms": log.finalize_ms
+            },
+            "details": details.get(log.id, [])
+        })
+    return runs
+
+
+def _append_archive(day, records, compression):
+    """
+    以追加方式写入当天的归档文件，每次追加为一个独立的压缩帧/成员
+    写入完成并落盘后才允许删除数据库中的记录
+    """
+    path = _archive_path(day, compression)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    with open(path, "ab") as f:
+        if compression == "zstd":
+            f.write(zstandard.ZstdCompressor().compress(payload))
+        else:
+            with gzip.GzipFile(fileobj=f, mode="ab") as gz:
+                gz.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _delete_runs(log_ids):
+    """在一个事务中删除一批执行记录及其明细"""
+    try:
+        indexed = delete_details_index(db.session, log_ids)
+        FeatureExecutionLogDetail.query.filter(FeatureExecutionLogDetail.log_id.in_(log_ids)) \
+            .delete(synchronize_session=False)
+        if not indexed:
+            # 全文索引异常时重建，不影响清理
+            rebuild_index(db.session)
+        FeatureExecutionLog.query.filter(FeatureExecutionLog.id.in_(log_ids)) \
+            .delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _vacuum(mode, pages):
+    """回收删除后的数据库空间，目前只支持SQLite"""
+    engine = db.engine
+    if mode == "none" or engine.dialect.name != "sqlite":
+        return None
+    # VACUUM不能在事务中执行
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if mode == "full":
+            conn.exec_driver_sql("VACUUM")
+            return "full"
+        auto_vacuum = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        if auto_vacuum != 2:
+            # 切换为增量回收模式需要执行一次完整的VACUUM
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+            return "full"
+        # 逐页执行，需要读取全部结果才会回收完成
+        conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        return "incremental"
+
+
+def run_retention():
+    """
+    执行一次日志保留清理：归档并删除超过保留天数的执行记录，然后回收空间
+    :return: (bool, str, dict) 是否成功，提示信息，清理结果
+    """
+    if not _lock.acquire(blocking=False):
+        return False, "日志清理正在执行中", None
+    _state["running"] = True
+    started = time.perf_counter()
+    result = {"started_at": datetime.now().strftime(TIME_FORMAT), "deleted_runs": 0,
+              "archived_runs": 0, "archive_files": [], "vacuum": None}
+    try:
+        ensure_retention_configs()
+        settings = get_retention_settings()
+        result["retention_days"] = settings["retention_days"]
+        if settings["retention_days"] <= 0:
+            return True, "未启用日志清理", result
+        cutoff = datetime.combine(datetime.now().date() - timedelta(days=settings["retention_days"]),
+                                  datetime.min.time())
+        result["cutoff"] = cutoff.strftime(TIME_FORMAT)
+        archive_files = set()
+
+        while True:
+            logs = db.session.query(
+                FeatureExecutionLog.id,
+                FeatureExecutionLog.feature_id,
+                FeatureExecutionLog.request_id,
+                FeatureExecutionLog.start_time,
+                FeatureExecutionLog.end_time,
+                FeatureExecutionLog.status,
+                FeatureExecutionLog.client_id,
+                FeatureExecutionLog.execution_type,
+                FeatureExecutionLog.queue_wait_ms,
+                FeatureExecutionLog.load_ms,
+                FeatureExecutionLog.config_ms,
+                FeatureExecutionLog.run_ms,
+                FeatureExecutionLog.finalize_ms,
+                FeatureExecutionLog.created_date,
+                Feature.name.label('feature_name')
+            ).outerjoin(Feature, FeatureExecutionLog.feature_id == Feature.id) \
+                .filter(FeatureExecutionLog.start_time < cutoff) \
+                .order_by(FeatureExecutionLog.start_time, FeatureExecutionLog.id) \
+                .limit(settings["batch_size"]).all()
+            if not logs:
+                break
+            if settings["archive_enabled"]:
+                for day, records in _collect_runs(logs).items():
+                    _append_archive(day, records, settings["compression"])
+                    archive_files.add(os.path.basename(_archive_path(day, settings["compression"])))
+                    result["archived_runs"] += len(records)
+            _delete_runs([log.id for log in logs])
+            result["deleted_runs"] += len(logs)
+
+        result["archive_files"] = sorted(archive_files)
+        if result["deleted_runs"]:
+            optimize_index()
+            result["vacuum"] = _vacuum(settings["vacuum_mode"], settings["vacuum_pages"])
+        result["duration_ms"] = int((time.perf_counter() - started) * 1000)
+        logger.info(f"日志清理完成，删除执行记录 {result['deleted_runs']} 条，归档 {result['archived_runs']} 条")
+        return True, "日志清理完成", result
+    except Exception as e:
+        db.session.rollback()
+        result["error"] = str(e)
+        logger.error(f"日志清理失败: {e}")
+        return False, f"日志清理失败: {str(e)}", result
+    finally:
+        _state["last_result"] = result
+        _state["running"] = False
+        _lock.release()
+
+
+def start_retention(app):
+    """
+    在后台线程中执行一次日志清理
+    :return: (bool, str) 是否已开始，提示信息
+    """
+    if _state["running"]:
+        return False, "日志清理正在执行中"
+
+    def _run():
+        with app.app_context():
+            run_retention()
+
+    threading.Thread(target=_run, name="log-retention", daemon=True).start()
+    return True, "日志清理已开始"
+
+
+def get_retention_status():
+    """
+    获取日志清理状态
+    :return: (bool, str, dict) 是否成功，提示信息，{running, last_result, settings}
+    """
+    try:
+        return True, "成功", {
+            "running": _state["running"],
+            "last_result": _state["last_result"],
+            "settings": get_retention_settings()
+        }
+    except Exception as e:
+        return False, f"获取日志清理状态失败: {str(e)}", None
+
+
+def _open_archive(path):
+    """以文本方式打开归档文件，支持多帧/多成员的压缩文件"""
+    if path.endswith(ARCHIVE_EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raise RuntimeError("读取zstd归档需要安装zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True,
+                                                            closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def _day_archive_paths(day):
+    datetime.strptime(day, DATE_FORMAT)  # 校验日期格式，避免路径穿越
+    paths = [os.path.join(_archive_dir(), f"{ARCHIVE_PREFIX}{day}{ext}") for ext in ARCHIVE_EXTENSIONS.values()]
+    return [p for p in paths if os.path.isfile(p)]
+
+
+def _iter_archived_runs(day):
+    """逐行读取某天的归档记录，同一执行记录可能因重试而重复归档"""
+    for path in _day_archive_paths(day):
+        with _open_archive(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def list_archives():
+    """
+    列出所有归档文件
+    :return: (bool, str, list) 是否成功，提示信息，[{date, file, compression, size_bytes}]
+    """
+    try:
+        archive_dir = _archive_dir()
+        result = []
+        if os.path.isdir(archive_dir):
+            for name in os.listdir(archive_dir):
+                for compression, ext in ARCHIVE_EXTENSIONS.items():
+                    if name.startswith(ARCHIVE_PREFIX) and name.endswith(ext):
+                        result.append({
+                            "date": name[len(ARCHIVE_PREFIX):-len(ext)],
+                            "file": name,
+                            "compression": compression,
+                            "size_bytes": os.path.getsize(os.path.join(archive_dir, name))
+                        })
+        result.sort(key=lambda a: a["date"], reverse=True)
+        return True, "查询成功", result
+    except Exception as e:
+        return False, f"查询归档失败: {str(e)}", None
+
+
+def get_archived_logs(day, feature_id=None):
+    """
+    查询某天归档的执行记录（不含明细）
+    :param day: 日期 YYYY-MM-DD
+    :param feature_id: 功能ID
+    :return: (bool, str, list) 是否成功，提示信息，执行记录列表
+    """
+    try:
+        runs = {}
+        for record in _iter_archived_runs(day):
+            log = record["log"]
+            if feature_id and log["feature_id"] != int(feature_id):
+                continue
+            # 重复归档时以最后一次为准
+            runs[log["id"]] = {**log, "detail_count": len(record["details"])}
+        result = list(runs.values())
+        result.sort(key=lambda l: (l["start_time"] or "", l["id"]), reverse=True)
+        return True, "查询成功", result
+    except ValueError:
+        return False, "日期格式应为YYYY-MM-DD", None
+    except Exception as e:
+        return False, f"查询归档失败: {str(e)}", None
+
+
+def get_archived_log_details(day, log_id):
+    """
+    查询归档执行记录的明细
+    :param day: 日期 YYYY-MM-DD
+    :param log_id: 日志ID
+    :return: (bool, str, list) 是否成功，提示信息，日志明细列表
+    """
+    try:
+        log_id = int(log_id)
+        record = None
+        for item in _iter_archived_runs(day):
+            if item["log"]["id"] == log_id:
+                record = item
+        if not record:
+            return False, "未找到指定的归档日志", None
+        return True, "查询成功", [{**d, "log_id": record["log"]["id"]} for d in record["details"]]
+    except ValueError:
+        return False, "日期格式应为YYYY-MM-DD", None
+    except Exception as e:
+        return False, f"查询归档失败: {str(e)}", None
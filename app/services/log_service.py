@@ -1,77 +1,161 @@
 from app import db
 from app.models.base_models import FeatureExecutionLog, Feature, FeatureExecutionLogDetail
-from sqlalchemy import and_, or_, desc
+from app.util.log_fts import FTS_TABLE, DETAIL_TABLE, fts_supports, build_match_query, delete_details_index, \
+    rebuild_index
+from sqlalchemy import and_, or_, desc, func, text
 from datetime import datetime
+import base64
+import html
 import json
+import time
 
-def query_logs(feature_id=None, start_date=None, end_date=None, keyword=None, execution_type=None):
+# 日志列表分页参数
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# 估算总数时最多统计的行数
+ESTIMATE_COUNT_CAP = 10000
+# 日志明细搜索分页参数
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+# 摘要中命中词前后保留的字符数
+SNIPPET_CONTEXT = 40
+# 摘要中标记命中词的占位符，HTML转义后替换为<mark>
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+
+def _encode_cursor(start_time, log_id):
+    """将(start_time, id)编码为游标字符串"""
+    raw = json.dumps([start_time.strftime('%Y-%m-%d %H:%M:%S.%f') if start_time else None, log_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    """解析游标字符串为(start_time, id)"""
+    start_time, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    if start_time:
+        start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S.%f')
+    return start_time, int(log_id)
+
+
+def _build_log_query(customer_id=None, feature_id=None, start_date=None, end_date=None, keyword=None, execution_type=None):
+    """
+    构建日志列表查询
+    :return: (query, filters) 查询对象和过滤条件列表
+    """
+    query = db.session.query(
+        FeatureExecutionLog.id,
+        FeatureExecutionLog.feature_id,
+        FeatureExecutionLog.request_id,
+        FeatureExecutionLog.start_time,
+        FeatureExecutionLog.end_time,
+        FeatureExecutionLog.status,
+        FeatureExecutionLog.client_id,
+        FeatureExecutionLog.execution_type,
+        FeatureExecutionLog.queue_wait_ms,
+        FeatureExecutionLog.load_ms,
+        FeatureExecutionLog.config_ms,
+        FeatureExecutionLog.run_ms,
+        FeatureExecutionLog.finalize_ms,
+        Feature.name.label('feature_name')
+    ).join(Feature, FeatureExecutionLog.feature_id == Feature.id)
+
+    # 添加过滤条件
+    filters = []
+
+    # 按客户ID过滤（通过功能表关联）
+    if customer_id:
+        filters.append(Feature.customer_id == customer_id)
+
+    # 按功能ID过滤
+    if feature_id:
+        filters.append(FeatureExecutionLog.feature_id == feature_id)
+
+    # 按日期范围过滤
+    if start_date:
+        start_datetime = datetime.strptime(start_date, '%Y-%m-%d')
+        filters.append(FeatureExecutionLog.start_time >= start_datetime)
+
+    if end_date:
+        end_datetime = datetime.strptime(end_date, '%Y-%m-%d')
+        # 将结束日期设置为当天的23:59:59
+        end_datetime = end_datetime.replace(hour=23, minute=59, second=59)
+        filters.append(FeatureExecutionLog.start_time <= end_datetime)
+
+    # 按关键字过滤
+    if keyword:
+        filters.append(or_(
+            FeatureExecutionLog.request_id.ilike(f'%{keyword}%'),
+            FeatureExecutionLog.status.ilike(f'%{keyword}%'),
+            Feature.name.ilike(f'%{keyword}%')
+        ))
+
+    # 按执行类型过滤
+    if execution_type:
+        filters.append(FeatureExecutionLog.execution_type == execution_type)
+
+    # 应用过滤条件
+    if filters:
+        query = query.filter(and_(*filters))
+    return query, filters
+
+
+def _count_logs(query, filters, total_mode):
+    """
+    统计日志总数
+    :param total_mode: none 不统计 / exact 精确统计 / estimate 估算
+    :return: (total, estimated)
+    """
+    if total_mode == 'exact':
+        return query.order_by(None).count(), False
+    if total_mode == 'estimate':
+        if not filters:
+            # 无过滤条件时使用主键最大值估算，只需读取索引
+            return db.session.query(func.max(FeatureExecutionLog.id)).scalar() or 0, True
+        # 有过滤条件时最多统计ESTIMATE_COUNT_CAP行
+        capped = query.order_by(None).limit(ESTIMATE_COUNT_CAP).subquery()
+        total = db.session.query(func.count()).select_from(capped).scalar()
+        return total, total >= ESTIMATE_COUNT_CAP
+    return None, False
+
+
+def query_logs(feature_id=None, start_date=None, end_date=None, keyword=None, execution_type=None,
+               customer_id=None, cursor=None, page_size=None, total_mode='none'):
     """
-    查询日志
+    分页查询日志，按(start_time, id)倒序使用游标翻页
     :param feature_id: 功能ID
     :param start_date: 开始日期
     :param end_date: 结束日期
     :param keyword: 关键字
     :param execution_type: 执行类型 (manual/scheduled)
-    :return: (bool, str, list) 是否成功，提示信息，日志列表
+    :param customer_id: 客户ID，为空时不按客户过滤
+    :param cursor: 上一页返回的next_cursor，为空时查询第一页
+    :param page_size: 每页条数，最大MAX_PAGE_SIZE
+    :param total_mode: 总数统计方式 none/exact/estimate
+    :return: (bool, str, dict) 是否成功，提示信息，{items, next_cursor, has_more, page_size, total, total_estimated}
     """
     try:
-        # 构建查询条件
-        query = db.session.query(
-            FeatureExecutionLog.id,
-            FeatureExecutionLog.feature_id,
-            FeatureExecutionLog.request_id,
-            FeatureExecutionLog.start_time,
-            FeatureExecutionLog.end_time,
-            FeatureExecutionLog.status,
-            FeatureExecutionLog.client_id,
-            FeatureExecutionLog.execution_type,
-            Feature.name.label('feature_name')
-        ).join(Feature, FeatureExecutionLog.feature_id == Feature.id)
-        
-        # 添加过滤条件
-        filters = []
-        
-        # 按功能ID过滤
-        if feature_id:
-            filters.append(FeatureExecutionLog.feature_id == feature_id)
-            
-        # 按日期范围过滤
-        if start_date:
-            start_datetime = datetime.strptime(start_date, '%Y-%m-%d')
-            filters.append(FeatureExecutionLog.start_time >= start_datetime)
-            
-        if end_date:
-            end_datetime = datetime.strptime(end_date, '%Y-%m-%d')
-            # 将结束日期设置为当天的23:59:59
-            end_datetime = end_datetime.replace(hour=23, minute=59, second=59)
-            filters.append(FeatureExecutionLog.start_time <= end_datetime)
-            
-        # 按关键字过滤
-        if keyword:
-            filters.append(or_(
-                FeatureExecutionLog.request_id.like(f'%{keyword}%'),
-                FeatureExecutionLog.status.like(f'%{keyword}%'),
-                Feature.name.like(f'%{keyword}%')
+        page_size = min(max(int(page_size or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+        query, filters = _build_log_query(customer_id, feature_id, start_date, end_date, keyword, execution_type)
+        total, total_estimated = _count_logs(query, filters, total_mode)
+
+        # 游标之后的数据
+        if cursor:
+            cursor_time, cursor_id = _decode_cursor(cursor)
+            query = query.filter(or_(
+                FeatureExecutionLog.start_time < cursor_time,
+                and_(FeatureExecutionLog.start_time == cursor_time, FeatureExecutionLog.id < cursor_id)
             ))
-            
-        # 按执行类型过滤
-        if execution_type:
-            filters.append(FeatureExecutionLog.execution_type == execution_type)
-            
-        # 应用过滤条件
-        if filters:
-            query = query.filter(and_(*filters))
-            
-        # 按开始时间倒序排列
-        query = query.order_by(desc(FeatureExecutionLog.start_time))
-        
-        # 执行查询
-        logs = query.all()
-        
+
+        # 按开始时间倒序排列，多取一条用于判断是否还有下一页
+        logs = query.order_by(desc(FeatureExecutionLog.start_time), desc(FeatureExecutionLog.id)).limit(page_size + 1).all()
+        has_more = len(logs) > page_size
+        logs = logs[:page_size]
+
         # 转换为字典列表
-        result = []
+        items = []
         for log in logs:
-            result.append({
+            items.append({
                 'id': log.id,
                 'feature_id': log.feature_id,
                 'request_id': log.request_id,
@@ -80,99 +164,33 @@ def query_logs(feature_id=None, start_date=None, end_date=None, keyword=None, ex
                 'status': log.status,
                 'client_id': log.client_id,
                 'execution_type': log.execution_type,
-                'feature_name': log.feature_name
+                'feature_name': log.feature_name,
+                'queue_wait_ms': log.queue_wait_ms,
+                'load_ms': log.load_ms,
+                'config_ms': log.config_ms,
+                'run_ms': log.run_ms,
+                'finalize_ms': log.finalize_ms
             })
-            
-        return True, "查询成功", result
+
+        return True, "查询成功", {
+            'items': items,
+            'next_cursor': _encode_cursor(logs[-1].start_time, logs[-1].id) if has_more else None,
+            'has_more': has_more,
+            'page_size': page_size,
+            'total': total,
+            'total_estimated': total_estimated
+        }
     except Exception as e:
-        return False, f"查询失败: {str(e)}", []
+        return False, f"查询失败: {str(e)}", None
 
-def query_logs_by_customer_id(customer_id, feature_id=None, start_date=None, end_date=None, keyword=None, execution_type=None):
+def query_logs_by_customer_id(customer_id, feature_id=None, start_date=None, end_date=None, keyword=None, execution_type=None,
+                              cursor=None, page_size=None, total_mode='none'):
     """
-    根据客户ID查询日志
+    根据客户ID分页查询日志，参数和返回值同query_logs
     :param customer_id: 客户ID
-    :param feature_id: 功能ID
-    :param start_date: 开始日期
-    :param end_date: 结束日期
-    :param keyword: 关键字
-    :param execution_type: 执行类型 (manual/scheduled)
-    :return: (bool, str, list) 是否成功，提示信息，日志列表
     """
-    try:
-        # 构建查询条件
-        query = db.session.query(
-            FeatureExecutionLog.id,
-            FeatureExecutionLog.feature_id,
-            FeatureExecutionLog.request_id,
-            FeatureExecutionLog.start_time,
-            FeatureExecutionLog.end_time,
-            FeatureExecutionLog.status,
-            FeatureExecutionLog.client_id,
-            FeatureExecutionLog.execution_type,
-            Feature.name.label('feature_name')
-        ).join(Feature, FeatureExecutionLog.feature_id == Feature.id)
-        
-        # 添加过滤条件
-        filters = []
-        
-        # 按客户ID过滤（通过功能表关联）
-        filters.append(Feature.customer_id == customer_id)
-        
-        # 按功能ID过滤
-        if feature_id:
-            filters.append(FeatureExecutionLog.feature_id == feature_id)
-            
-        # 按日期范围过滤
-        if start_date:
-            start_datetime = datetime.strptime(start_date, '%Y-%m-%d')
-            filters.append(FeatureExecutionLog.start_time >= start_datetime)
-            
-        if end_date:
-            end_datetime = datetime.strptime(end_date, '%Y-%m-%d')
-            # 将结束日期设置为当天的23:59:59
-            end_datetime = end_datetime.replace(hour=23, minute=59, second=59)
-            filters.append(FeatureExecutionLog.start_time <= end_datetime)
-            
-        # 按关键字过滤
-        if keyword:
-            filters.append(or_(
-                FeatureExecutionLog.request_id.like(f'%{keyword}%'),
-                FeatureExecutionLog.status.like(f'%{keyword}%'),
-                Feature.name.like(f'%{keyword}%')
-            ))
-            
-        # 按执行类型过滤
-        if execution_type:
-            filters.append(FeatureExecutionLog.execution_type == execution_type)
-            
-        # 应用过滤条件
-        if filters:
-            query = query.filter(and_(*filters))
-            
-        # 按开始时间倒序排列
-        query = query.order_by(desc(FeatureExecutionLog.start_time))
-        
-        # 执行查询
-        logs = query.all()
-        
-        # 转换为字典列表
-        result = []
-        for log in logs:
-            result.append({
-                'id': log.id,
-                'feature_id': log.feature_id,
-                'request_id': log.request_id,
-                'start_time': log.start_time.strftime('%Y-%m-%d %H:%M:%S') if log.start_time else None,
-                'end_time': log.end_time.strftime('%Y-%m-%d %H:%M:%S') if log.end_time else None,
-                'status': log.status,
-                'client_id': log.client_id,
-                'execution_type': log.execution_type,
-                'feature_name': log.feature_name
-            })
-            
-        return True, "查询成功", result
-    except Exception as e:
-        return False, f"查询失败: {str(e)}", []
+    return query_logs(feature_id, start_date, end_date, keyword, execution_type,
+                      customer_id=customer_id, cursor=cursor, page_size=page_size, total_mode=total_mode)
 
 def get_log_details(log_id):
     """
@@ -190,21 +208,249 @@ def get_log_details(log_id):
         log_details = FeatureExecutionLogDetail.query.filter_by(log_id=log_id).order_by(FeatureExecutionLogDetail.timestamp).all()
         
         # 转换为字典列表
-        result = []
-        for detail in log_details:
-            result.append({
-                'id': detail.id,
-                'log_id': detail.log_id,
-                'timestamp': detail.timestamp.strftime('%Y-%m-%d %H:%M:%S') if detail.timestamp else None,
-                'level': detail.level,
-                'message': detail.message,
-                'request_id': detail.request_id
-            })
-            
+        result = [_detail_to_dict(detail) for detail in log_details]
+
         return True, "查询成功", result
     except Exception as e:
         return False, f"查询失败: {str(e)}", None
 
+def _detail_to_dict(detail):
+    return {
+        'id': detail.id,
+        'log_id': detail.log_id,
+        'timestamp': detail.timestamp.strftime('%Y-%m-%d %H:%M:%S') if detail.timestamp else None,
+        'level': detail.level,
+        'message': detail.message,
+        'request_id': detail.request_id
+    }
+
+def get_log_status(log_id):
+    """
+    获取日志的执行状态
+    :param log_id: 日志ID
+    :return: (status, end_time)，日志不存在时返回None
+    """
+    return db.session.query(FeatureExecutionLog.status, FeatureExecutionLog.end_time) \
+        .filter(FeatureExecutionLog.id == log_id).first()
+
+def iter_log_details(log_id, after_id=0, limit=None, follow=False, batch_size=500,
+                     poll_interval=1.0, follow_timeout=300):
+    """
+    按ID顺序分批读取日志明细，任何时刻只持有一批数据
+    :param log_id: 日志ID
+    :param after_id: 只读取ID大于该值的明细
+    :param limit: 最多读取的条数，为空时不限制
+    :param follow: 读完后是否继续等待执行中功能的新日志
+    :param batch_size: 每批读取的行数
+    :param poll_interval: 跟随模式下的轮询间隔（秒）
+    :param follow_timeout: 跟随模式下无新日志时最长等待秒数
+    :return: 生成器，逐批产出明细字典列表，最后产出 {type: 'end', last_id, has_more, finished}
+    """
+    columns = (
+        FeatureExecutionLogDetail.id,
+        FeatureExecutionLogDetail.log_id,
+        FeatureExecutionLogDetail.timestamp,
+        FeatureExecutionLogDetail.level,
+        FeatureExecutionLogDetail.message,
+        FeatureExecutionLogDetail.request_id
+    )
+    last_id = after_id or 0
+    remaining = limit
+    idle_since = time.monotonic()
+    finished = False
+    while True:
+        # 先读取执行状态再读取明细：状态为已结束时，结束前写入的明细一定已经提交
+        log_state = get_log_status(log_id)
+        finished = log_state is None or log_state.end_time is not None
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            # 只查询列，不经过ORM身份映射，读过的行不会驻留在会话中
+            rows = db.session.query(*columns) \
+                .filter(FeatureExecutionLogDetail.log_id == log_id, FeatureExecutionLogDetail.id > last_id) \
+                .order_by(FeatureExecutionLogDetail.id).limit(size).all()
+            if not rows:
+                break
+            batch = [_detail_to_dict(row) for row in rows]
+            last_id = batch[-1]['id']
+            if remaining is not None:
+                remaining -= len(batch)
+            idle_since = time.monotonic()
+            yield batch
+            if len(rows) < size:
+                break
+
+        if remaining is not None and remaining <= 0:
+            has_more = db.session.query(FeatureExecutionLogDetail.id) \
+                .filter(FeatureExecutionLogDetail.log_id == log_id, FeatureExecutionLogDetail.id > last_id) \
+                .first() is not None
+            yield {'type': 'end', 'last_id': last_id, 'has_more': has_more, 'finished': finished}
+            return
+        if not follow or finished or time.monotonic() - idle_since >= follow_timeout:
+            yield {'type': 'end', 'last_id': last_id, 'has_more': False, 'finished': finished}
+            return
+        # 结束读事务，下一轮能看到批量写入器新提交的日志
+        db.session.rollback()
+        time.sleep(poll_interval)
+
+def _render_snippet(snippet):
+    """转义摘要中的HTML，并将命中标记替换为<mark>"""
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def _like_snippet(message, terms):
+    """LIKE匹配时在Python中截取第一个命中词附近的摘要"""
+    lowered = message.lower()
+    positions = [(lowered.find(t.lower()), t) for t in terms]
+    positions = [(pos, t) for pos, t in positions if pos >= 0]
+    if not positions:
+        return message[:SNIPPET_CONTEXT * 2]
+    pos, term = min(positions)
+    start = max(pos - SNIPPET_CONTEXT, 0)
+    end = min(pos + len(term) + SNIPPET_CONTEXT, len(message))
+    snippet = message[start:pos] + MARK_START + message[pos:pos + len(term)] + MARK_END + message[pos + len(term):end]
+    return ("..." if start > 0 else "") + snippet + ("..." if end < len(message) else "")
+
+
+def _search_filters(customer_id, feature_id, params):
+    """构建搜索结果的客户/功能过滤条件"""
+    conditions = []
+    if customer_id:
+        conditions.append("f.customer_id = :customer_id")
+        params["customer_id"] = customer_id
+    if feature_id:
+        conditions.append("l.feature_id = :feature_id")
+        params["feature_id"] = feature_id
+    return "".join(f" AND {c}" for c in conditions)
+
+
+def _search_fts(keyword, customer_id, feature_id, limit, offset):
+    """
+    使用全文索引搜索：按相关度排序，每次执行只保留相关度最高的一条明细
+    摘要只为当前页选中的明细生成
+    """
+    params = {"query": build_match_query(keyword), "limit": limit, "offset": offset}
+    where = _search_filters(customer_id, feature_id, params)
+    rows = db.session.execute(text(
+        f"WITH ranked AS ("
+        f"  SELECT d.log_id AS log_id, {FTS_TABLE}.rowid AS detail_id, {FTS_TABLE}.rank AS score,"
+        f"         COUNT(*) OVER (PARTITION BY d.log_id) AS hits,"
+        f"         ROW_NUMBER() OVER (PARTITION BY d.log_id ORDER BY {FTS_TABLE}.rank) AS rn"
+        f"  FROM {FTS_TABLE} JOIN {DETAIL_TABLE} d ON d.id = {FTS_TABLE}.rowid"
+        f"  WHERE {FTS_TABLE} MATCH :query"
+        f") "
+        f"SELECT r.log_id, r.detail_id, r.hits, l.request_id, l.feature_id, l.start_time, l.status,"
+        f"       l.execution_type, f.name AS feature_name "
+        f"FROM ranked r "
+        f"JOIN feature_execution_log l ON l.id = r.log_id "
+        f"JOIN base_feature f ON f.id = l.feature_id "
+        f"WHERE r.rn = 1{where} "
+        f"ORDER BY r.score, r.log_id DESC "
+        f"LIMIT :limit OFFSET :offset"
+    ), params).all()
+
+    snippets = {}
+    detail_ids = [row.detail_id for row in rows]
+    if detail_ids:
+        id_params = {f"id{i}": detail_id for i, detail_id in enumerate(detail_ids)}
+        placeholders = ", ".join(f":{k}" for k in id_params)
+        snippet_rows = db.session.execute(text(
+            f"SELECT rowid, snippet({FTS_TABLE}, 0, char(2), char(3), '...', 24) AS snippet "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query AND rowid IN ({placeholders})"
+        ), {"query": params["query"], **id_params}).all()
+        snippets = {row.rowid: row.snippet for row in snippet_rows}
+    return rows, snippets
+
+
+def _search_like(keyword, customer_id, feature_id, limit, offset):
+    """数据库不支持全文索引或关键字过短时使用LIKE匹配，按执行倒序排列"""
+    terms = keyword.split()
+    params = {"limit": limit, "offset": offset}
+    like_conditions = []
+    for i, term in enumerate(terms):
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params[f"term{i}"] = f"%{escaped}%"
+        like_conditions.append(f"LOWER(message) LIKE LOWER(:term{i}) ESCAPE '\\'")
+    where = _search_filters(customer_id, feature_id, params)
+    rows = db.session.execute(text(
+        f"SELECT m.log_id, m.detail_id, m.hits, l.request_id, l.feature_id, l.start_time, l.status,"
+        f"       l.execution_type, f.name AS feature_name "
+        f"FROM ("
+        f"  SELECT log_id, MIN(id) AS detail_id, COUNT(*) AS hits FROM {DETAIL_TABLE}"
+        f"  WHERE {' AND '.join(like_conditions)} GROUP BY log_id"
+        f") m "
+        f"JOIN feature_execution_log l ON l.id = m.log_id "
+        f"JOIN base_feature f ON f.id = l.feature_id "
+        f"WHERE 1 = 1{where} "
+        f"ORDER BY m.log_id DESC "
+        f"LIMIT :limit OFFSET :offset"
+    ), params).all()
+
+    snippets = {}
+    detail_ids = [row.detail_id for row in rows]
+    if detail_ids:
+        details = db.session.query(FeatureExecutionLogDetail.id, FeatureExecutionLogDetail.message) \
+            .filter(FeatureExecutionLogDetail.id.in_(detail_ids)).all()
+        snippets = {d.id: _like_snippet(d.message or "", terms) for d in details}
+    return rows, snippets
+
+
+def search_log_details(keyword, customer_id=None, feature_id=None, page=1, page_size=None):
+    """
+    在日志明细中全文搜索，结果按执行记录聚合
+    :param keyword: 搜索关键字，多个词以空格分隔，需全部命中
+    :param customer_id: 客户ID，为空时不按客户过滤
+    :param feature_id: 功能ID
+    :param page: 页码，从1开始
+    :param page_size: 每页条数，最大MAX_SEARCH_PAGE_SIZE
+    :return: (bool, str, dict) 是否成功，提示信息，{items, page, page_size, has_more, mode}
+    """
+    try:
+        keyword = (keyword or "").strip()
+        if not keyword:
+            return False, "搜索关键字不能为空", None
+        page = max(int(page or 1), 1)
+        page_size = min(max(int(page_size or SEARCH_PAGE_SIZE), 1), MAX_SEARCH_PAGE_SIZE)
+        offset = (page - 1) * page_size
+
+        # 多取一条用于判断是否还有下一页
+        if fts_supports(keyword):
+            mode = "fts"
+            rows, snippets = _search_fts(keyword, customer_id, feature_id, page_size + 1, offset)
+        else:
+            mode = "like"
+            rows, snippets = _search_like(keyword, customer_id, feature_id, page_size + 1, offset)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        items = []
+        for row in rows:
+            start_time = row.start_time
+            if isinstance(start_time, datetime):
+                start_time = start_time.strftime('%Y-%m-%d %H:%M:%S')
+            elif start_time:
+                start_time = str(start_time)[:19]
+            items.append({
+                'log_id': row.log_id,
+                'request_id': row.request_id,
+                'feature_id': row.feature_id,
+                'feature_name': row.feature_name,
+                'start_time': start_time,
+                'status': row.status,
+                'execution_type': row.execution_type,
+                'hits': row.hits,
+                'detail_id': row.detail_id,
+                'snippet': _render_snippet(snippets.get(row.detail_id, ""))
+            })
+        return True, "查询成功", {
+            'items': items,
+            'page': page,
+            'page_size': page_size,
+            'has_more': has_more,
+            'mode': mode
+        }
+    except Exception as e:
+        return False, f"搜索失败: {str(e)}", None
+
 def add_log(log_data):
     """
     添加新日志
@@ -239,8 +485,11 @@ def del_log(log_id):
         if not log:
             return False, f"未找到ID为[{log_id}]的日志"
         
-        # 同时删除关联的日志明细
+        # 同时删除关联的日志明细，全文索引需要在明细删除前清理
+        indexed = delete_details_index(db.session, [log_id])
         FeatureExecutionLogDetail.query.filter_by(log_id=log_id).delete()
+        if not indexed:
+            rebuild_index(db.session)
         
         db.session.delete(log)
         db.session.commit()
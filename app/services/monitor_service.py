@@ -0,0 +1,34 @@
+from app.util.feature_executor import feature_executor
+from app.util.feature_dispatcher import feature_dispatcher
+from app.util.feature_process_pool import feature_process_pool
+from app.util.feature_module_cache import feature_module_cache
+from app.util.log_sink import log_sink
+from app.util.ws_log_buffer import ws_log_buffer
+from app.util.log_file_pool import log_file_pool
+from app.util import sqlite_tuning
+from app.util.principal_cache import principal_cache
+from app.scheduler import task_scheduler
+from app.util.leader_election import leader_election
+
+
+def get_runtime_stats():
+    """
+    获取运行时指标
+    :return: (bool, str, dict) 是否成功，提示信息，各组件指标
+    """
+    try:
+        return True, "成功", {
+            "executor": feature_executor.stats(),
+            "dispatcher": feature_dispatcher.stats(),
+            "process_pool": feature_process_pool.stats(),
+            "module_cache": feature_module_cache.stats(),
+            "log_sink": log_sink.stats(),
+            "ws_log_buffer": ws_log_buffer.stats(),
+            "log_file_pool": log_file_pool.stats(),
+            "database": sqlite_tuning.stats(),
+            "principal_cache": principal_cache.stats(),
+            "scheduler": task_scheduler.stats(),
+            "scheduler_leader": leader_election.stats()
+        }
+    except Exception as e:
+        return False, f"获取运行时指标失败: {str(e)}", None
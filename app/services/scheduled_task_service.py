@@ -1,6 +1,6 @@
 from app import db
 from app.models.base_models import ScheduledTask, Feature
-from sqlalchemy import text
+from sqlalchemy import text, true
 from app.util.serviceUtil import model_to_dict
 from datetime import datetime
 from apscheduler.triggers.cron import CronTrigger
@@ -35,19 +35,34 @@ def convert_schedule_to_cron(schedule_type, interval_value=None, interval_unit=N
         return None
     return None
 
+def _query_tasks():
+    """定时任务及其功能名称的查询"""
+    return db.session.query(ScheduledTask, Feature.name).outerjoin(Feature, ScheduledTask.feature_id == Feature.id)
+
+
+def _to_task_dicts(rows):
+    """
+    将(定时任务, 功能名称)转换为字典列表
+    上次/下次执行时间优先使用调度器内存中的最新值，数据库中的值由调度器批量写入，可能稍有滞后
+    """
+    run_times = task_scheduler.get_run_times() if task_scheduler else {}
+    result = []
+    for task, feature_name in rows:
+        data = task.to_dict()
+        data['feature_name'] = feature_name or ""
+        for key, value in run_times.get(task.id, {}).items():
+            data[key] = value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+        result.append(data)
+    return result
+
+
 def get_all_scheduled_tasks():
     """
     获取所有定时任务
     :return: (bool, str, list) 是否成功，提示信息，定时任务列表
     """
     try:
-        tasks = ScheduledTask.query.all()
-        # 关联功能名称
-        for task in tasks:
-            feature = Feature.query.get(task.feature_id)
-            if feature:
-                task.feature_name = feature.name
-        return True, "成功", [task.to_dict() for task in tasks]
+        return True, "成功", _to_task_dicts(_query_tasks().order_by(ScheduledTask.id).all())
     except Exception as e:
         return False, f"查询失败: {str(e)}", []
 
@@ -59,13 +74,8 @@ def get_scheduled_tasks_by_customer_id(customer_id):
     """
     try:
         # 通过功能表关联客户ID来过滤定时任务
-        tasks = db.session.query(ScheduledTask).join(Feature, ScheduledTask.feature_id == Feature.id).filter(Feature.customer_id == customer_id).all()
-        # 关联功能名称
-        for task in tasks:
-            feature = Feature.query.get(task.feature_id)
-            if feature:
-                task.feature_name = feature.name
-        return True, "成功", [task.to_dict() for task in tasks]
+        rows = _query_tasks().filter(Feature.customer_id == customer_id).order_by(ScheduledTask.id).all()
+        return True, "成功", _to_task_dicts(rows)
     except Exception as e:
         return False, f"查询失败: {str(e)}", []
 
@@ -76,14 +86,10 @@ def get_scheduled_task_by_id(task_id):
     :return: (bool, str, dict) 是否成功，提示信息，定时任务数据
     """
     try:
-        task = ScheduledTask.query.get(task_id)
-        if not task:
+        row = _query_tasks().filter(ScheduledTask.id == task_id).first()
+        if not row:
             return False, f"未找到ID为[{task_id}]的定时任务", None
-        # 关联功能名称
-        feature = Feature.query.get(task.feature_id)
-        if feature:
-            task.feature_name = feature.name
-        return True, "成功", task.to_dict()
+        return True, "成功", _to_task_dicts([row])[0]
     except Exception as e:
         return False, f"查询失败: {str(e)}", None
 
@@ -110,7 +116,12 @@ def add_scheduled_task(task_data):
             name=task_data.get('name'),
             description=task_data.get('description'),
             cron_expression=cron_expression,
-            is_active=task_data.get('is_active', False)
+            is_active=task_data.get('is_active', False),
+            misfire_grace_time=task_data.get('misfire_grace_time'),
+            coalesce=task_data.get('coalesce'),
+            max_instances=task_data.get('max_instances'),
+            stagger_seconds=task_data.get('stagger_seconds'),
+            jitter_seconds=task_data.get('jitter_seconds')
         )
                 # 计算下一次执行时间
         if cron_expression:
@@ -175,6 +186,10 @@ def update_scheduled_task(task_id, task_data):
             task.description = task_data['description']
         if 'is_active' in task_data:
             task.is_active = task_data['is_active']
+        # 执行策略和错峰设置，传入null表示恢复使用全局默认值
+        for key in ('misfire_grace_time', 'coalesce', 'max_instances', 'stagger_seconds', 'jitter_seconds'):
+            if key in task_data:
+                setattr(task, key, task_data[key])
             
         task.updated_date = datetime.now()
         db.session.commit()
@@ -238,12 +253,20 @@ def get_active_scheduled_tasks():
     :return: (bool, str, list) 是否成功，提示信息，定时任务列表
     """
     try:
-        tasks = ScheduledTask.query.filter_by(is_active=True).all()
-        # 关联功能名称
-        for task in tasks:
-            feature = Feature.query.get(task.feature_id)
-            if feature:
-                task.feature_name = feature.name
-        return True, "成功", [task.to_dict() for task in tasks]
+        rows = _query_tasks().filter(ScheduledTask.is_active == true()).all()
+        return True, "成功", _to_task_dicts(rows)
     except Exception as e:
-        return False, f"查询失败: {str(e)}", []
\ No newline at end of file
+        return False, f"查询失败: {str(e)}", []
+
+def get_dispatch_histogram(minutes=60):
+    """
+    获取定时任务的派发分布
+    :param minutes: 统计的分钟数
+    :return: (bool, str, dict) 是否成功，提示信息，{minutes, dispatched, planned}
+    """
+    if not task_scheduler:
+        return False, "调度器未初始化", None
+    try:
+        return True, "成功", task_scheduler.dispatch_histogram(minutes)
+    except Exception as e:
+        return False, f"查询失败: {str(e)}", None
@@ -0,0 +1,267 @@
+"""
+功能执行统计
+执行结束时按小时和天两个粒度增量更新 feature_execution_stat，
+统计查询只读取预聚合的桶，不扫描执行日志表。
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, update
+from app import db
+from app.models.base_models import Feature, FeatureExecutionLog, FeatureExecutionStat
+from app.util.log_utils import logger
+
+GRANULARITIES = ("hour", "day")
+# 耗时直方图各桶的上界（毫秒），超过最后一个上界的计入最后一桶
+DURATION_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000, 600000, 1800000)
+HIST_COLUMNS = tuple(f"hist_{i}" for i in range(len(DURATION_BUCKETS_MS) + 1))
+COUNTER_COLUMNS = ("run_count", "success_count", "failure_count", "terminated_count", "total_duration_ms") + HIST_COLUMNS
+# 单次查询最多返回的时间桶数量（按小时查询约31天）
+MAX_BUCKETS = 744
+# 执行状态与计数列的对应关系
+STATUS_COLUMNS = {"成功": "success_count", "失败": "failure_count", "终止": "terminated_count"}
+REBUILD_BATCH_SIZE = 1000
+
+
+def _bucket_start(moment, granularity):
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _hist_column(duration_ms):
+    for i, upper in enumerate(DURATION_BUCKETS_MS):
+        if duration_ms < upper:
+            return HIST_COLUMNS[i]
+    return HIST_COLUMNS[-1]
+
+
+def _increments(status, duration_ms):
+    """一次执行对统计桶各列的增量"""
+    increments = {"run_count": 1, "total_duration_ms": duration_ms, _hist_column(duration_ms): 1}
+    status_column = STATUS_COLUMNS.get(status)
+    if status_column:
+        increments[status_column] = 1
+    return increments
+
+
+def _insert_for_dialect(dialect_name):
+    """支持 ON CONFLICT DO UPDATE 的方言返回其insert构造器"""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
+
+
+def _apply(feature_id, customer_id, granularity, bucket_start, increments, max_duration_ms):
+    """原子地累加一个统计桶，桶不存在时插入"""
+    table = FeatureExecutionStat.__table__
+    dialect_name = db.engine.dialect.name
+    now = datetime.now()
+    values = {name: table.c[name] + value for name, value in increments.items()}
+    values["max_duration_ms"] = func.max(table.c.max_duration_ms, max_duration_ms) \
+        if dialect_name == "sqlite" else func.greatest(table.c.max_duration_ms, max_duration_ms)
+    values["updated_date"] = now
+
+    insert = _insert_for_dialect(dialect_name)
+    if insert is not None:
+        row = dict.fromkeys(COUNTER_COLUMNS, 0)
+        row.update(increments)
+        row.update(feature_id=feature_id, customer_id=customer_id, granularity=granularity,
+                   bucket_start=bucket_start, max_duration_ms=max_duration_ms, created_date=now, updated_date=now)
+        db.session.execute(insert(table).values(**row).on_conflict_do_update(
+            index_elements=["granularity", "feature_id", "customer_id", "bucket_start"], set_=values))
+        return
+
+    key = and_(
+        table.c.granularity == granularity,
+        table.c.feature_id == feature_id,
+        table.c.customer_id == customer_id,
+        table.c.bucket_start == bucket_start
+    )
+    if not db.session.execute(update(table).where(key).values(**values)).rowcount:
+        row = dict.fromkeys(COUNTER_COLUMNS, 0)
+        row.update(increments)
+        db.session.add(FeatureExecutionStat(feature_id=feature_id, customer_id=customer_id, granularity=granularity,
+                                            bucket_start=bucket_start, max_duration_ms=max_duration_ms, **row))
+
+
+def record_execution(feature_id, customer_id, status, start_time, end_time):
+    """
+    执行结束时累加小时和天两个粒度的统计桶，与执行日志在同一事务中提交
+    统计在保存点中更新，失败时只回滚统计，不影响执行日志的提交
+    :param feature_id: 功能ID
+    :param customer_id: 客户ID
+    :param status: 执行状态 成功/失败/终止
+    :param start_time: 开始时间
+    :param end_time: 结束时间
+    """
+    if feature_id is None or start_time is None or end_time is None:
+        return
+    try:
+        duration_ms = max(int((end_time - start_time).total_seconds() * 1000), 0)
+        increments = _increments(status, duration_ms)
+        with db.session.begin_nested():
+            for granularity in GRANULARITIES:
+                _apply(feature_id, customer_id or 0, granularity, _bucket_start(start_time, granularity),
+                       increments, duration_ms)
+    except Exception as e:
+        logger.error(f"更新功能执行统计失败: {e}")
+
+
+def rebuild_execution_stats():
+    """
+    根据执行日志重建全部统计，用于首次启用统计时回填历史数据
+    :return: (bool, str, int) 是否成功，提示信息，统计的执行次数
+    """
+    try:
+        buckets = {}
+        runs = 0
+        query = db.session.query(
+            FeatureExecutionLog.feature_id,
+            FeatureExecutionLog.status,
+            FeatureExecutionLog.start_time,
+            FeatureExecutionLog.end_time,
+            Feature.customer_id
+        ).outerjoin(Feature, FeatureExecutionLog.feature_id == Feature.id) \
+            .filter(FeatureExecutionLog.start_time.isnot(None), FeatureExecutionLog.end_time.isnot(None))
+        for row in query.yield_per(REBUILD_BATCH_SIZE):
+            duration_ms = max(int((row.end_time - row.start_time).total_seconds() * 1000), 0)
+            increments = _increments(row.status, duration_ms)
+            for granularity in GRANULARITIES:
+                key = (granularity, row.feature_id, row.customer_id or 0, _bucket_start(row.start_time, granularity))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = dict.fromkeys(COUNTER_COLUMNS + ("max_duration_ms",), 0)
+                for name, value in increments.items():
+                    bucket[name] += value
+                bucket["max_duration_ms"] = max(bucket["max_duration_ms"], duration_ms)
+            runs += 1
+
+        now = datetime.now()
+        rows = [{
+            "granularity": granularity, "feature_id": feature_id, "customer_id": customer_id,
+            "bucket_start": bucket_start, "created_date": now, "updated_date": now, **bucket
+        } for (granularity, feature_id, customer_id, bucket_start), bucket in buckets.items()]
+        FeatureExecutionStat.query.delete()
+        if rows:
+            db.session.execute(FeatureExecutionStat.__table__.insert(), rows)
+        db.session.commit()
+        return True, "重建成功", runs
+    except Exception as e:
+        db.session.rollback()
+        return False, f"重建功能执行统计失败: {str(e)}", 0
+
+
+def ensure_execution_stats():
+    """统计表为空而已有执行日志时回填历史统计"""
+    if db.session.query(FeatureExecutionStat.id).first() is not None:
+        return
+    if db.session.query(FeatureExecutionLog.id).first() is None:
+        return
+    status, msg, runs = rebuild_execution_stats()
+    if status:
+        logger.info(f"已根据 {runs} 条执行日志回填功能执行统计")
+    else:
+        logger.error(msg)
+
+
+def _percentile(hist, total, q):
+    """根据直方图估算分位数，在命中的桶内线性插值"""
+    if not total:
+        return None
+    target = q * total
+    cumulative = 0
+    for i, count in enumerate(hist):
+        if count and cumulative + count >= target:
+            lower = DURATION_BUCKETS_MS[i - 1] if i > 0 else 0
+            if i >= len(DURATION_BUCKETS_MS):
+                return lower
+            upper = DURATION_BUCKETS_MS[i]
+            return int(lower + (upper - lower) * (target - cumulative) / count)
+        cumulative += count
+    return None
+
+
+def query_stats(feature_id=None, customer_id=None, granularity="day", start_time=None, end_time=None,
+                group_by="feature"):
+    """
+    查询功能执行统计
+    :param feature_id: 功能ID
+    :param customer_id: 客户ID，为空时不按客户过滤
+    :param granularity: 时间粒度 hour/day
+    :param start_time: 开始时间 YYYY-MM-DD 或 YYYY-MM-DD HH:MM:SS，默认按粒度取最近24小时/30天
+    :param end_time: 结束时间，默认当前时间
+    :param group_by: feature 按功能汇总 / bucket 按功能和时间桶返回趋势
+    :return: (bool, str, dict) 是否成功，提示信息，{granularity, start_time, end_time, items}
+    """
+    try:
+        if granularity not in GRANULARITIES:
+            return False, "granularity 只能为 hour 或 day", None
+        if group_by not in ("feature", "bucket"):
+            return False, "group_by 只能为 feature 或 bucket", None
+        end = _parse_time(end_time) if end_time else datetime.now()
+        start = _parse_time(start_time) if start_time else \
+            end - (timedelta(hours=24) if granularity == "hour" else timedelta(days=30))
+        step = timedelta(hours=1) if granularity == "hour" else timedelta(days=1)
+        start = _bucket_start(start, granularity)
+        if (end - start) / step > MAX_BUCKETS:
+            return False, f"查询范围过大，最多 {MAX_BUCKETS} 个{'小时' if granularity == 'hour' else '天'}", None
+
+        stat = FeatureExecutionStat
+        group_columns = [stat.feature_id]
+        if group_by == "bucket":
+            group_columns.append(stat.bucket_start)
+        sums = [func.sum(getattr(stat, name)).label(name) for name in COUNTER_COLUMNS]
+        query = db.session.query(*group_columns, *sums, func.max(stat.max_duration_ms).label("max_duration_ms")) \
+            .filter(stat.granularity == granularity, stat.bucket_start >= start, stat.bucket_start <= end)
+        if feature_id:
+            query = query.filter(stat.feature_id == feature_id)
+        if customer_id:
+            query = query.filter(stat.customer_id == customer_id)
+        rows = query.group_by(*group_columns).order_by(*group_columns).all()
+
+        feature_ids = {row.feature_id for row in rows}
+        names = dict(db.session.query(Feature.id, Feature.name).filter(Feature.id.in_(feature_ids)).all()) \
+            if feature_ids else {}
+        items = []
+        for row in rows:
+            run_count = row.run_count or 0
+            hist = [getattr(row, name) or 0 for name in HIST_COLUMNS]
+            item = {
+                "feature_id": row.feature_id,
+                "feature_name": names.get(row.feature_id),
+                "run_count": run_count,
+                "success_count": row.success_count or 0,
+                "failure_count": row.failure_count or 0,
+                "terminated_count": row.terminated_count or 0,
+                "success_rate": round((row.success_count or 0) / run_count, 4) if run_count else None,
+                "avg_duration_ms": int((row.total_duration_ms or 0) / run_count) if run_count else None,
+                "p50_duration_ms": _percentile(hist, run_count, 0.5),
+                "p95_duration_ms": _percentile(hist, run_count, 0.95),
+                "max_duration_ms": row.max_duration_ms
+            }
+            if group_by == "bucket":
+                item["bucket_start"] = row.bucket_start.strftime('%Y-%m-%d %H:%M:%S')
+            items.append(item)
+        return True, "查询成功", {
+            "granularity": granularity,
+            "start_time": start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_time": end.strftime('%Y-%m-%d %H:%M:%S'),
+            "items": items
+        }
+    except ValueError as e:
+        return False, f"时间格式错误: {str(e)}", None
+    except Exception as e:
+        return False, f"查询功能执行统计失败: {str(e)}", None
+
+
+def _parse_time(value):
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(value)
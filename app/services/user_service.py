@@ -2,7 +2,12 @@ from app.models.user_models import User, UserCustomer
 from app.models.base_models import Customer
 from app import db
 from flask_bcrypt import generate_password_hash, check_password_hash
+from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token
+from app.util.principal_cache import Principal, principal_cache
+
+# update_user 允许直接修改的字段，密码和关联客户单独处理，令牌版本等字段只能由服务层维护
+EDITABLE_USER_FIELDS = ('username', 'email', 'role', 'is_active')
 
 
 def get_user_by_id(user_id):
@@ -14,6 +19,29 @@ def get_user_by_id(user_id):
     return User.query.get(user_id)
 
 
+def load_principal(user_id, claims=None):
+    """
+    加载鉴权所需的用户信息
+    :param user_id: 用户ID
+    :param claims: 访问令牌的声明，无状态鉴权模式下关联客户取自声明
+    :return: Principal或None，令牌版本与用户当前版本不一致时返回None
+    """
+    claims = claims or {}
+    user = db.session.query(User.id, User.username, User.role, User.is_active, User.token_version) \
+        .filter(User.id == user_id).first()
+    if not user:
+        return None
+    # 令牌签发后用户的权限已变更
+    if claims.get('ver', 0) != (user.token_version or 0):
+        return None
+    if current_app.config.get('JWT_STATELESS_AUTHZ') and 'customers' in claims:
+        customer_ids = claims['customers']
+    else:
+        customer_ids = [row.customer_id for row in
+                        db.session.query(UserCustomer.customer_id).filter_by(user_id=user_id).all()]
+    return Principal(user.id, user.username, user.role, bool(user.is_active), customer_ids)
+
+
 def authenticate_user(username, password):
     """
     验证用户凭据
@@ -37,19 +65,37 @@ def authenticate_user(username, password):
     return True, "认证成功", user
 
 
+def _token_claims(user):
+    """令牌附加声明：角色、令牌版本，无状态鉴权模式下还包含关联客户ID"""
+    claims = {'role': user.role, 'ver': user.token_version or 0}
+    if current_app.config.get('JWT_STATELESS_AUTHZ'):
+        claims['customers'] = sorted(assoc.customer_id for assoc in user.customer_associations)
+    return claims
+
+
+def generate_access_token(user):
+    """
+    为用户生成访问令牌
+    :param user: User对象
+    :return: access_token
+    """
+    return create_access_token(identity=str(user.id), additional_claims=_token_claims(user))
+
+
 def generate_tokens(user):
     """
     为用户生成访问令牌和刷新令牌
     :param user: User对象
     :return: (access_token, refresh_token)
     """
+    claims = _token_claims(user)
     access_token = create_access_token(
         identity=str(user.id),
-        additional_claims={'role': user.role}
+        additional_claims=claims
     )
     refresh_token = create_refresh_token(
         identity=str(user.id),
-        additional_claims={'role': user.role}
+        additional_claims=claims
     )
     return access_token, refresh_token
 
@@ -161,7 +207,7 @@ def get_users(page=1, per_page=10, username=None, role=None):
     
     # 添加筛选条件
     if username:
-        query = query.filter(User.username.like(f'%{username}%'))
+        query = query.filter(User.username.ilike(f'%{username}%'))
     if role:
         query = query.filter(User.role == role)
     
@@ -193,6 +239,9 @@ def update_user(user_id, **kwargs):
         if existing_user:
             return False, "用户名已存在", None
     
+    # 记录权限相关字段，变更后使已签发的令牌失效
+    before = (user.role, bool(user.is_active), {assoc.customer_id for assoc in user.customer_associations})
+
     # 更新用户信息
     role = kwargs.get('role', user.role)
     
@@ -200,9 +249,8 @@ def update_user(user_id, **kwargs):
     for key, value in kwargs.items():
         if key == 'password' and value:
             user.set_password(value)
-        elif key not in ['password', 'associated_customers', 'id']:
-            if hasattr(user, key):
-                setattr(user, key, value)
+        elif key in EDITABLE_USER_FIELDS:
+            setattr(user, key, value)
 
     # 根据角色处理客户关联
     if role == 'admin':
@@ -222,7 +270,13 @@ def update_user(user_id, **kwargs):
 
     # 保存到数据库
     try:
+        db.session.flush()
+        after = (user.role, bool(user.is_active), {assoc.customer_id for assoc in user.customer_associations})
+        if before != after or kwargs.get('password'):
+            user.token_version = (user.token_version or 0) + 1
         db.session.commit()
+        # 启用状态、角色或关联客户可能已变更
+        principal_cache.invalidate_user(user.id)
         user_data = user.to_dict()
         return True, "更新成功", user_data
     except Exception as e:
@@ -251,8 +305,10 @@ def delete_user(user_id):
         UserCustomer.query.filter_by(user_id=user_id).delete()
         
         # 删除用户
+        principal_id = user.id
         db.session.delete(user)
         db.session.commit()
+        principal_cache.invalidate_user(principal_id)
         return True, "删除成功"
     except Exception as e:
         db.session.rollback()
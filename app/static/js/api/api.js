@@ -6,8 +6,14 @@ import { useNotifications } from '../composables/useNotifications.js';
 const apiClient = axios.create({
     baseURL: '/api',
     timeout: 10000,
+    // 304表示数据未变化，由响应拦截器返回缓存的数据
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
+// 条件请求缓存：返回ETag的查询接口，下次请求携带If-None-Match，数据未变化时服务端返回304
+const etagCache = new Map();
+const etagCacheKey = (config) => `${config.method}:${config.url}:${JSON.stringify(config.data ?? null)}`;
+
 const { addNotification } = useNotifications();
 
 // 请求拦截器
@@ -18,6 +24,11 @@ apiClient.interceptors.request.use(
         if (token) {
             config.headers.Authorization = `Bearer ${token}`;
         }
+        config._etagKey = etagCacheKey(config);
+        const cached = etagCache.get(config._etagKey);
+        if (cached) {
+            config.headers['If-None-Match'] = cached.etag;
+        }
         return config;
     },
     (error) => {
@@ -28,6 +39,17 @@ apiClient.interceptors.request.use(
 // 响应拦截器
 apiClient.interceptors.response.use(
     (response) => {
+        const key = response.config._etagKey;
+        if (response.status === 304) {
+            const cached = etagCache.get(key);
+            if (cached) {
+                return { ...response, status: 200, data: cached.data };
+            }
+        }
+        const etag = response.headers?.etag;
+        if (etag && response.status === 200) {
+            etagCache.set(key, { etag, data: response.data });
+        }
         return response;
     },
     async (error) => {
@@ -1,4 +1,5 @@
 import api from './api.js';
+import authService from '../services/authService.js';
 
 const log_api = {
     /**
@@ -9,7 +10,10 @@ const log_api = {
      * @param {string} params.end_date - 结束日期
      * @param {string} params.keyword - 关键字
      * @param {string} params.execution_type - 执行类型 (manual/scheduled)
-     * @returns {Promise}
+     * @param {string} params.cursor - 上一页返回的next_cursor，为空时查询第一页
+     * @param {number} params.page_size - 每页条数（最大200）
+     * @param {string} params.total_mode - 总数统计方式 none/exact/estimate
+     * @returns {Promise} data: {items, next_cursor, has_more, page_size, total, total_estimated}
      */
     get_logs(params) {
         return api.client.post('/log/get_logs', params);
@@ -24,7 +28,10 @@ const log_api = {
      * @param {string} params.end_date - 结束日期
      * @param {string} params.keyword - 关键字
      * @param {string} params.execution_type - 执行类型 (manual/scheduled)
-     * @returns {Promise}
+     * @param {string} params.cursor - 上一页返回的next_cursor，为空时查询第一页
+     * @param {number} params.page_size - 每页条数（最大200）
+     * @param {string} params.total_mode - 总数统计方式 none/exact/estimate
+     * @returns {Promise} data: {items, next_cursor, has_more, page_size, total, total_estimated}
      */
     get_logs_by_customer_id(params) {
         return api.client.post('/log/get_logs_by_customer_id', params);
@@ -39,6 +46,94 @@ const log_api = {
         return api.client.post('/log/get_log_details', { id: id });
     },
     
+    /**
+     * 流式读取日志明细（NDJSON），每收到一批明细调用一次onRecords
+     * @param {Object} params - 查询参数
+     * @param {number} params.id - 日志ID
+     * @param {number} params.after_id - 只读取ID大于该值的明细
+     * @param {number} params.limit - 最多读取的条数
+     * @param {boolean} params.follow - 是否持续推送执行中功能的新日志
+     * @param {Function} onRecords - 回调，参数为明细数组
+     * @param {AbortSignal} signal - 用于取消读取
+     * @returns {Promise} 结束记录 {type: 'end', last_id, has_more, finished}
+     */
+    async stream_log_details(params, onRecords, signal) {
+        const token = authService.getAccessToken();
+        const response = await fetch('/api/log/stream_log_details', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                ...(token ? { Authorization: `Bearer ${token}` } : {})
+            },
+            body: JSON.stringify(params),
+            signal
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        // 参数错误等情况返回普通的JSON结果
+        if (!(response.headers.get('Content-Type') || '').includes('application/x-ndjson')) {
+            const result = await response.json();
+            throw new Error(result.message || '读取日志明细失败');
+        }
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let end = null;
+        const handleLines = (lines) => {
+            const records = [];
+            for (const line of lines) {
+                if (!line) continue;
+                const record = JSON.parse(line);
+                if (record.type === 'end') {
+                    end = record;
+                } else {
+                    records.push(record);
+                }
+            }
+            if (records.length) onRecords(records);
+        };
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            handleLines(lines);
+        }
+        handleLines([buffer + decoder.decode()]);
+        return end;
+    },
+
+    /**
+     * 在日志明细中全文搜索，结果按执行记录聚合
+     * @param {Object} params - 搜索参数
+     * @param {string} params.keyword - 搜索关键字，多个词以空格分隔
+     * @param {number} params.customer_id - 客户ID（操作员必填）
+     * @param {number} params.feature_id - 功能ID
+     * @param {number} params.page - 页码，从1开始
+     * @param {number} params.page_size - 每页条数（最大100）
+     * @returns {Promise} data: {items, page, page_size, has_more, mode}，items中的snippet为已转义的HTML，命中词以<mark>标记
+     */
+    search_log_details(params) {
+        return api.client.post('/log/search_log_details', params);
+    },
+
+    /**
+     * 查询预聚合的功能执行统计
+     * @param {Object} params - 查询参数
+     * @param {number} params.customer_id - 客户ID（操作员必填）
+     * @param {number} params.feature_id - 功能ID
+     * @param {string} params.granularity - 时间粒度 hour/day
+     * @param {string} params.start_time - 开始时间，默认最近24小时/30天
+     * @param {string} params.end_time - 结束时间，默认当前时间
+     * @param {string} params.group_by - feature 按功能汇总 / bucket 按时间桶返回趋势
+     * @returns {Promise} data: {granularity, start_time, end_time, items}，items包含run_count、success_rate、p50_duration_ms、p95_duration_ms等
+     */
+    get_stats(params) {
+        return api.client.post('/log/stats', params);
+    },
+
     /**
      * 新增日志（管理员）
      * @param {Object} log - 日志数据
@@ -64,6 +159,50 @@ const log_api = {
      */
     update_log(log) {
         return api.client.post('/log/update_log', log);
+    },
+
+    /**
+     * 立即执行日志保留清理（管理员），清理在后台执行
+     * @returns {Promise}
+     */
+    run_retention() {
+        return api.client.post('/log/run_retention');
+    },
+
+    /**
+     * 获取日志保留清理的配置和最近一次执行结果（管理员）
+     * @returns {Promise} data: {running, last_result, settings}
+     */
+    get_retention_status() {
+        return api.client.post('/log/get_retention_status');
+    },
+
+    /**
+     * 获取日志归档文件列表（管理员）
+     * @returns {Promise} data: [{date, file, compression, size_bytes}]
+     */
+    get_archives() {
+        return api.client.post('/log/get_archives');
+    },
+
+    /**
+     * 查询某天归档的执行记录（管理员）
+     * @param {string} date - 日期 YYYY-MM-DD
+     * @param {number} feature_id - 功能ID
+     * @returns {Promise}
+     */
+    get_archived_logs(date, feature_id) {
+        return api.client.post('/log/get_archived_logs', { date: date, feature_id: feature_id });
+    },
+
+    /**
+     * 查询归档执行记录的明细（管理员）
+     * @param {string} date - 日期 YYYY-MM-DD
+     * @param {number} id - 日志ID
+     * @returns {Promise}
+     */
+    get_archived_log_details(date, id) {
+        return api.client.post('/log/get_archived_log_details', { date: date, id: id });
     }
 };
 
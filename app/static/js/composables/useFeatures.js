@@ -117,7 +117,7 @@ export function useFeatures(currentCustomer, currentUser, addNotification, api)
                 if (data.status) {
                     addConsoleLog(`功能 ${activeFeature.value.name} 执行中`, 'info');
                 } else {
-                    addConsoleLog(`功能 ${activeFeature.value.name} 执行失败: ${data.data}`, 'error');
+                    addConsoleLog(`功能 ${activeFeature.value.name} 执行失败: ${data.message}`, 'error');
                     addNotification(data.message || `功能 ${activeFeature.value.name} 执行失败`);
                     featureRunning.value = false;
                     socket.disconnect();
@@ -130,8 +130,12 @@ export function useFeatures(currentCustomer, currentUser, addNotification, api)
             });
         });
 
-        socket.on('log', (data) => {
-            addConsoleLog(data.message, 'info');
+        // 服务端按时间间隔/行数合并推送日志，dropped为客户端处理不过来时被丢弃的条数
+        socket.on('log_batch', (data) => {
+            if (data.dropped > 0) {
+                addConsoleLog(`日志过多，已省略 ${data.dropped} 条`, 'warn');
+            }
+            (data.messages || []).forEach(message => addConsoleLog(message, 'info'));
         });
 
         socket.on('disconnect', () => {
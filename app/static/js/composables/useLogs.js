@@ -6,6 +6,9 @@ export function useLogs(addNotification) {
     const logs = ref([]);
     const logDetailList = ref([]);
     const loading = ref(false);
+    // 游标分页状态
+    const nextCursor = ref(null);
+    const hasMoreLogs = ref(false);
     
     // 查询条件
     const queryConditions = ref({
@@ -16,13 +19,19 @@ export function useLogs(addNotification) {
         execution_type: null
     });
     
-    // 加载日志列表
-    const loadLogs = async () => {
+    // 加载日志列表，append为true时基于游标加载下一页
+    const loadLogs = async (append = false) => {
+        append = append === true;
         loading.value = true;
         try {
-            const response = await api.log.get_logs(queryConditions.value);
+            const params = { ...queryConditions.value, cursor: append ? nextCursor.value : null };
+            const response = await api.log.get_logs(params);
             if (response.data.status) {
-                logs.value = response.data.data || [];
+                const page = response.data.data || {};
+                const items = page.items || [];
+                logs.value = append ? logs.value.concat(items) : items;
+                nextCursor.value = page.next_cursor || null;
+                hasMoreLogs.value = !!page.has_more;
             } else {
                 addNotification(response.data.message || '加载日志列表失败');
             }
@@ -32,17 +41,18 @@ export function useLogs(addNotification) {
             loading.value = false;
         }
     };
+
+    // 加载下一页日志
+    const loadMoreLogs = () => loadLogs(true);
     
     
-    // 获取日志明细内容
+    // 流式获取日志明细内容，边接收边显示
     const loadLogDetailList = async (logId) => {
+        logDetailList.value = [];
         try {
-            const response = await api.log.getLogDetails(logId);
-            if (response.data.status) {
-                logDetailList.value = response.data.data || [];
-            } else {
-                addNotification(response.data.message || '加载日志明细失败');
-            }
+            await api.log.stream_log_details({ id: logId }, (records) => {
+                logDetailList.value.push(...records);
+            });
             if( logDetailList.value.length === 0) {
                 addNotification('没有找到相关日志明细');
             }
@@ -72,10 +82,12 @@ export function useLogs(addNotification) {
         logs,
         logDetailList,
         loading,
+        hasMoreLogs,
         queryConditions,
         
         // 方法
         loadLogs,
+        loadMoreLogs,
         loadLogDetailList,
         setQueryConditions,
         resetQueryConditions
@@ -118,8 +118,10 @@ createApp({
             logs: logList,
             logDetailList,
             loading: logsLoading,
+            hasMoreLogs,
             queryConditions,
             loadLogs,
+            loadMoreLogs,
             loadLogDetailList,
             setQueryConditions,
             resetQueryConditions
@@ -366,8 +368,10 @@ createApp({
             logDetailFilter,
             filteredLogDetails,
             logsLoading,
+            hasMoreLogs,
             queryConditions,
             loadLogs,
+            loadMoreLogs,
             loadLogDetailList,
             filterLogDetails,
             clearLogDetailFilter,
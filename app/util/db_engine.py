@@ -0,0 +1,32 @@
+"""
+数据库引擎配置
+根据 SQLALCHEMY_DATABASE_URI 生成连接池参数：SQLite使用 sqlite_tuning 中的配置，
+PostgreSQL等服务端数据库使用 DB_POOL_* 配置的连接池。
+"""
+
+from app.util.sqlite_tuning import is_sqlite_uri, sqlite_engine_options
+
+
+def normalize_database_uri(uri):
+    """兼容部分平台提供的 postgres:// 形式的连接串，SQLAlchemy 1.4起只识别 postgresql://"""
+    if uri and uri.startswith("postgres://"):
+        return "postgresql://" + uri[len("postgres://"):]
+    return uri
+
+
+def engine_options(config):
+    """
+    生成 SQLALCHEMY_ENGINE_OPTIONS
+    :param config: 应用配置
+    :return: dict 引擎参数
+    """
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if is_sqlite_uri(uri):
+        return sqlite_engine_options(config)
+    return {
+        "pool_size": config.get('DB_POOL_SIZE', 10),
+        "max_overflow": config.get('DB_POOL_MAX_OVERFLOW', 20),
+        "pool_timeout": config.get('DB_POOL_TIMEOUT', 30),
+        "pool_recycle": config.get('DB_POOL_RECYCLE', 1800),
+        "pool_pre_ping": config.get('DB_POOL_PRE_PING', True)
+    }
@@ -0,0 +1,104 @@
+"""
+数据库结构升级
+db.create_all() 只会创建缺失的表，不会修改已存在的表。
+这里为已存在的 app.db 补齐模型中新增的列和索引，可重复执行。
+"""
+
+from sqlalchemy import inspect, literal, text
+from app import db
+from app.util.log_utils import logger
+
+
+def _column_default_sql(column, dialect):
+    """生成新增列的默认值子句，仅支持标量默认值"""
+    default = column.default
+    if default is None or not getattr(default, "is_scalar", False):
+        return ""
+    value = literal(default.arg, type_=column.type).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    return f" DEFAULT {value}"
+
+
+def upgrade_schema():
+    """
+    为已存在的表补齐缺失的列和索引
+    :return: list 新增的列（表名.列名）
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                default_sql = _column_default_sql(column, engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}{default_sql}"))
+                added.append(f"{table.name}.{column.name}")
+    if added:
+        logger.info(f"数据库结构已升级，新增列: {added}")
+    upgrade_autoincrement()
+    create_missing_indexes()
+    return added
+
+
+def create_missing_indexes():
+    """
+    为已存在的表创建模型中定义但数据库中缺失的索引
+    :return: list 新建的索引名称
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    created = []
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                index.create(bind=conn, checkfirst=True)
+                created.append(index.name)
+    if created:
+        logger.info(f"数据库索引已创建: {created}")
+    return created
+
+
+def upgrade_autoincrement():
+    """
+    SQLite下将声明了 sqlite_autoincrement 的已有表重建为 AUTOINCREMENT 主键，可重复执行
+    普通的 INTEGER PRIMARY KEY 在删除最新的行后会复用其id
+    :return: list 重建的表名
+    """
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return []
+    rebuilt = []
+    for table in db.metadata.sorted_tables:
+        if not table.dialect_options["sqlite"].get("autoincrement"):
+            continue
+        with engine.begin() as conn:
+            row = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+            ).first()
+            if row is None or "AUTOINCREMENT" in (row[0] or "").upper():
+                continue
+            old_name = f"{table.name}__old"
+            conn.execute(text(f'ALTER TABLE "{table.name}" RENAME TO "{old_name}"'))
+            # 索引随旧表改名但名称不变，先删除，由新表重新创建
+            for index in inspect(conn).get_indexes(old_name):
+                conn.execute(text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+            table.create(bind=conn)
+            existing = {c["name"] for c in inspect(conn).get_columns(old_name)}
+            columns = ", ".join(f'"{c.name}"' for c in table.columns if c.name in existing)
+            # 保留原有id，全文索引的rowid与明细id一一对应
+            conn.execute(text(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{old_name}"'))
+            conn.execute(text(f'DROP TABLE "{old_name}"'))
+        rebuilt.append(table.name)
+    if rebuilt:
+        logger.info(f"数据库表已重建为自增主键: {rebuilt}")
+    return rebuilt
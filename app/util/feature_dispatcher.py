@@ -0,0 +1,223 @@
+"""
+功能执行调度
+按优先级把功能执行分配到独立的执行线程池，并按功能限制同时执行的数量。
+功能正在执行的数量达到上限时按并发策略处理：
+    skip            跳过本次执行
+    queue           排队，前一次执行结束后再提交到线程池；每个功能排队的数量不超过所在线程池的队列容量
+    cancel_previous 请求取消正在执行和排队的执行，本次执行排在最前
+取消是协作式的：尚未开始的执行直接丢弃，已开始的执行由功能脚本通过 ctx.cancelled / ctx.check_cancelled() 响应。
+"""
+
+import collections
+import threading
+import time
+from app.util.feature_executor import FeatureExecutor, feature_executor
+from app.util.log_utils import logger
+
+PRIORITIES = ("high", "normal", "low")
+CONCURRENCY_POLICIES = ("skip", "queue", "cancel_previous")
+
+
+class FeatureCancelled(Exception):
+    """功能执行已被取消，由 ctx.check_cancelled() 抛出"""
+    pass
+
+
+class FeatureRun:
+    """一次功能执行的句柄，用于取消执行和等待执行结束"""
+
+    __slots__ = ("feature_id", "priority", "state", "cancel_event", "done_event", "created_at", "_func")
+
+    def __init__(self, feature_id, priority, func):
+        self.feature_id = feature_id
+        self.priority = priority
+        # waiting 等待并发名额 / submitted 已提交到线程池 / running 执行中 / finished 已结束 / cancelled 未开始即被取消
+        self.state = "waiting"
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self.created_at = time.time()
+        self._func = func
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def wait(self, timeout=None):
+        """等待执行结束，返回是否已结束"""
+        return self.done_event.wait(timeout)
+
+    def info(self):
+        return {"feature_id": self.feature_id, "priority": self.priority, "state": self.state}
+
+
+class FeatureDispatcher:
+    """按优先级分池、按功能限制并发的执行调度器"""
+
+    def __init__(self):
+        # normal 优先级使用原有的全局功能执行线程池
+        self.pools = {
+            "high": FeatureExecutor("feature-high", max_workers=2, queue_size=16),
+            "normal": feature_executor,
+            "low": FeatureExecutor("feature-low", max_workers=2, queue_size=64),
+        }
+        self.default_priority = "normal"
+        self.default_policy = "queue"
+        self._lock = threading.Lock()
+        self._active = {}  # 功能ID -> 已提交到线程池（排队或执行中）的FeatureRun列表
+        self._waiting = {}  # 功能ID -> 等待并发名额的FeatureRun队列
+        # 指标
+        self._skipped = 0
+        self._queued = 0
+        self._rejected = 0
+        self._cancelled = 0
+
+    def init_app(self, app):
+        """从应用配置中读取各优先级线程池参数和默认策略"""
+        for priority, options in (app.config.get('FEATURE_EXECUTOR_POOLS') or {}).items():
+            pool = self.pools.get(priority)
+            if pool is None or pool is feature_executor:
+                continue
+            pool.max_workers = options.get('max_workers', pool.max_workers)
+            pool.queue_size = options.get('queue_size', pool.queue_size)
+        self.default_priority = app.config.get('FEATURE_DEFAULT_PRIORITY', self.default_priority)
+        self.default_policy = app.config.get('FEATURE_CONCURRENCY_POLICY', self.default_policy)
+
+    def submit(self, feature_id, func, priority=None, max_concurrency=None, policy=None):
+        """
+        提交功能执行
+        :param feature_id: 功能ID
+        :param func: 执行函数，参数为FeatureRun
+        :param priority: 优先级 high/normal/low，为空时使用默认优先级
+        :param max_concurrency: 该功能最多同时执行的数量，为空表示不限制
+        :param policy: 达到并发上限时的策略 skip/queue/cancel_previous，为空时使用默认策略
+        :return: (bool, str, dict) 是否被接收，提示信息，{run: FeatureRun, 排队信息}
+        """
+        priority = priority if priority in self.pools else self.default_priority
+        policy = policy if policy in CONCURRENCY_POLICIES else self.default_policy
+        run = FeatureRun(feature_id, priority, func)
+        with self._lock:
+            active = self._active.setdefault(feature_id, [])
+            waiting = self._waiting.setdefault(feature_id, collections.deque())
+            if max_concurrency and len(active) + len(waiting) >= max_concurrency:
+                if policy == "skip":
+                    self._skipped += 1
+                    return False, "功能正在执行，已达到并发上限，本次执行已跳过", None
+                if policy == "cancel_previous":
+                    self._cancel_locked(feature_id)
+                    waiting.appendleft(run)
+                else:
+                    pool = self.pools[priority]
+                    if len(waiting) >= pool.queue_size:
+                        self._rejected += 1
+                        logger.warning(f"功能 {feature_id} 排队的执行已达到上限（{pool.queue_size}），拒绝执行")
+                        return False, f"执行队列已满（{pool.queue_size}），请稍后重试", {
+                            "pool": pool.name, "waiting": len(waiting), "queue_size": pool.queue_size}
+                    waiting.append(run)
+                self._queued += 1
+                return True, "功能正在执行，本次执行已排队", {"run": run, "waiting": len(waiting)}
+            accepted, msg, admission = self._submit_locked(run)
+        if not accepted:
+            return False, msg, admission
+        return True, msg, {"run": run, **admission}
+
+    def _submit_locked(self, run):
+        """将执行提交到对应优先级的线程池，需持有锁"""
+        accepted, msg, admission = self.pools[run.priority].submit(self._run, run)
+        if accepted:
+            run.state = "submitted"
+            self._active[run.feature_id].append(run)
+        return accepted, msg, admission
+
+    def _run(self, run):
+        try:
+            if run.cancelled:
+                run.state = "cancelled"
+                logger.info(f"功能 {run.feature_id} 的执行在开始前已被取消")
+                return
+            run.state = "running"
+            run._func(run)
+        finally:
+            if run.state == "running":
+                run.state = "finished"
+            self._release(run)
+
+    def _release(self, run):
+        """执行结束，释放并发名额并提交等待中的下一次执行，提交在锁外进行"""
+        with self._lock:
+            active = self._active.get(run.feature_id, [])
+            if run in active:
+                active.remove(run)
+            next_run = self._pop_waiting_locked(run.feature_id)
+        run.done_event.set()
+        while next_run is not None:
+            accepted, msg, _ = self.pools[next_run.priority].submit(self._run, next_run)
+            if accepted:
+                return
+            logger.warning(f"功能 {run.feature_id} 排队的执行提交失败: {msg}")
+            with self._lock:
+                active = self._active.get(run.feature_id, [])
+                if next_run in active:
+                    active.remove(next_run)
+                next_run.state = "cancelled"
+                next_run.done_event.set()
+                next_run = self._pop_waiting_locked(run.feature_id)
+
+    def _pop_waiting_locked(self, feature_id):
+        """
+        取出功能等待中的下一次执行，并在提交前占用并发名额，需持有锁
+        :return: FeatureRun，没有等待的执行时返回None
+        """
+        active = self._active.setdefault(feature_id, [])
+        waiting = self._waiting.get(feature_id)
+        if waiting:
+            next_run = waiting.popleft()
+            next_run.state = "submitted"
+            active.append(next_run)
+            return next_run
+        if not active:
+            self._active.pop(feature_id, None)
+            self._waiting.pop(feature_id, None)
+        return None
+
+    def _cancel_locked(self, feature_id):
+        """请求取消功能正在执行和等待的执行，需持有锁"""
+        for run in self._active.get(feature_id, []):
+            if not run.cancelled:
+                run.cancel_event.set()
+                self._cancelled += 1
+        waiting = self._waiting.get(feature_id)
+        while waiting:
+            run = waiting.popleft()
+            run.cancel_event.set()
+            run.state = "cancelled"
+            run.done_event.set()
+            self._cancelled += 1
+
+    def cancel(self, feature_id):
+        """
+        请求取消功能的所有执行
+        :return: int 被请求取消的执行数量
+        """
+        with self._lock:
+            before = self._cancelled
+            self._cancel_locked(feature_id)
+            return self._cancelled - before
+
+    def stats(self):
+        """获取各优先级线程池和并发控制指标"""
+        with self._lock:
+            return {
+                "pools": {priority: pool.stats() for priority, pool in self.pools.items()},
+                "default_priority": self.default_priority,
+                "default_policy": self.default_policy,
+                "running_features": {feature_id: len(runs) for feature_id, runs in self._active.items() if runs},
+                "waiting": sum(len(runs) for runs in self._waiting.values()),
+                "skipped": self._skipped,
+                "queued": self._queued,
+                "rejected": self._rejected,
+                "cancelled": self._cancelled
+            }
+
+
+# 全局功能执行调度器
+feature_dispatcher = FeatureDispatcher()
@@ -1,22 +1,30 @@
 from flask_socketio import emit
-from app.ws_server import socketio, client_sid_map
+from app.ws_server import client_sid_map
+from app.util.ws_log_buffer import ws_log_buffer
+from app.util.log_file_pool import log_file_pool
 import logging
 from datetime import datetime
 from app import db
 from app.models.base_models import FeatureExecutionLog
-from app.models.base_models import FeatureExecutionLog, FeatureExecutionLogDetail
+from app.util.log_sink import log_sink
+from app.services.stats_service import record_execution
+from app.util.feature_dispatcher import FeatureCancelled
 import os
 import time, random
 LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../logs"))
 os.makedirs(LOG_DIR, exist_ok=True)
 
 class FeatureExecutionContext:
-    def __init__(self, client_id, feature_name=None, feature_id=None, namespace="/feature", execution_type="manual"):
+    def __init__(self, client_id, feature_name=None, feature_id=None, namespace="/feature", execution_type="manual",
+                 customer_id=None, cancel_event=None):
         self.client_id = client_id
         self.namespace = namespace
         self.feature_name = feature_name or "未知功能"
         self.feature_id = feature_id
+        self.customer_id = customer_id
         self.execution_type = execution_type
+        # 取消信号，由功能调度器在取消执行时设置
+        self._cancel_event = cancel_event
         # 判断是否为定时任务执行
         self.is_scheduled_task = execution_type == "scheduled"
         # 生成唯一的requestId
@@ -36,19 +44,18 @@ class FeatureExecutionContext:
         db.session.add(self.db_log)
         db.session.commit()
 
+        # 本次执行独立的日志通道，不注册到logging全局注册表，执行结束后释放
+        self.logger = logging.Logger(f"feature-{self.request_id}", logging.INFO)
+        self._closed = False
+        # 执行是否已结束（done/fail/terminate），进程模式下子进程代理的done和外层的结束处理只生效一次
+        self._finalized = False
+
         # ws handler: 只发纯消息
-        self.logger = logging.getLogger(f"feature-{client_id}")
-        self.logger.setLevel(logging.INFO)
-        if not any(isinstance(h, WebSocketLogHandler) and getattr(h, "client_id", None) == client_id for h in self.logger.handlers):
-            ws_handler = WebSocketLogHandler(client_id, namespace)
-            self.logger.addHandler(ws_handler)
-
-        # file handler: 带时间，按feature_name分文件
-        log_file = os.path.join(LOG_DIR, f"{self.feature_name}.log")
-        if not any(isinstance(h, logging.FileHandler) and getattr(h, "baseFilename", None) == os.path.abspath(log_file) for h in self.logger.handlers):
-            file_handler = logging.FileHandler(log_file, encoding="utf-8")
-            file_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
-            self.logger.addHandler(file_handler)
+        self.logger.addHandler(WebSocketLogHandler(client_id, namespace))
+
+        # file handler: 带时间，按feature_name分文件，句柄由句柄池统一管理
+        self._log_file = os.path.join(LOG_DIR, f"{self.feature_name}.log")
+        self.logger.addHandler(log_file_pool.acquire(self._log_file))
 
         
         self.log(f"初始化完成，本次请求ID：{self.request_id}", "info")
@@ -63,50 +70,102 @@ class FeatureExecutionContext:
         else:
             self.logger.info(message)
         
-        # 同时写入数据库明细表
-        log_detail = FeatureExecutionLogDetail(
-            log_id=self.db_log.id,
-            level=level.upper(),
-            message=message,
-            request_id=self.request_id
-        )
-        db.session.add(log_detail)
-        db.session.commit()
+        # 同时写入数据库明细表，由后台写入器批量提交
+        log_sink.write(self.db_log.id, self.request_id, level.upper(), message)
         
         # 恢复handler为默认（下次log不影响）
         for handler in self.logger.handlers:
             if isinstance(handler, WebSocketLogHandler):
                 handler.set_send_ws(True)
 
+    @property
+    def cancelled(self):
+        """执行是否已被请求取消，耗时较长的功能应定期检查并尽快退出"""
+        return self._cancel_event is not None and self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """执行已被请求取消时抛出 FeatureCancelled，执行记录为终止"""
+        if self.cancelled:
+            raise FeatureCancelled()
+
+    def close(self):
+        """释放本次执行的日志通道，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        log_file_pool.release(self._log_file)
+
+    def record_phase(self, phase, started_at):
+        """
+        记录执行阶段耗时
+        :param phase: 阶段名称 queue_wait/load/config/run/finalize
+        :param started_at: 阶段开始时的 time.perf_counter() 值
+        """
+        setattr(self.db_log, f"{phase}_ms", int((time.perf_counter() - started_at) * 1000))
+
+    def _begin_finalize(self):
+        """标记执行结束，已结束时返回False"""
+        if self._finalized:
+            return False
+        self._finalized = True
+        return True
+
+    def _record_stats(self):
+        """累加执行统计，与执行日志的最终状态在同一事务中提交"""
+        record_execution(self.feature_id, self.customer_id, self.db_log.status,
+                         self.db_log.start_time, self.db_log.end_time)
+
     def done(self, msg="功能执行已完成", data=None):
+        if not self._begin_finalize():
+            return
+        finalize_start = time.perf_counter()
+        # 确保本次执行的日志明细全部写入
+        log_sink.flush()
         # 更新数据库日志记录
         self.db_log.end_time = datetime.now()
         self.db_log.status = "成功"
-        db.session.commit()
         
         # 如果是定时任务执行，不发送WebSocket消息
         if not self.is_scheduled_task:
+            # 先推送缓冲中的日志，保证日志在结束事件之前到达
+            ws_log_buffer.flush(self.client_id)
             emit('feature_done', {
                 'client_id': self.client_id,
                 'status': 'success',
                 'msg': msg,
                 'data': data or {}
             }, room=client_sid_map.get(self.client_id), namespace=self.namespace)
+        self.record_phase("finalize", finalize_start)
+        self._record_stats()
+        db.session.commit()
+        self.close()
 
     def fail(self, msg="功能执行失败", data=None):
+        if not self._begin_finalize():
+            return
+        finalize_start = time.perf_counter()
+        # 确保本次执行的日志明细全部写入
+        log_sink.flush()
         # 更新数据库日志记录
         self.db_log.end_time = datetime.now()
         self.db_log.status = "失败"
-        db.session.commit()
         
         # 如果是定时任务执行，不发送WebSocket消息
         if not self.is_scheduled_task:
+            # 先推送缓冲中的日志，保证日志在结束事件之前到达
+            ws_log_buffer.flush(self.client_id)
             emit('feature_done', {
                 'client_id': self.client_id,
                 'status': 'error',
                 'msg': msg,
                 'data': data or {}
             }, room=client_sid_map.get(self.client_id), namespace=self.namespace)
+        self.record_phase("finalize", finalize_start)
+        self._record_stats()
+        db.session.commit()
+        self.close()
 
     def error(self, msg="功能执行失败", data=None, exception=None):
         # 记录错误日志
@@ -120,6 +179,8 @@ class FeatureExecutionContext:
             
         # 如果是定时任务执行，不发送WebSocket消息
         if not self.is_scheduled_task:
+            # 先推送缓冲中的日志，保证日志在结束事件之前到达
+            ws_log_buffer.flush(self.client_id)
             emit('feature_error', {
                 'client_id': self.client_id,
                 'status': 'error',
@@ -128,18 +189,28 @@ class FeatureExecutionContext:
             }, room=client_sid_map.get(self.client_id), namespace=self.namespace)
 
     def terminate(self, reason="任务被终止"):
+        if not self._begin_finalize():
+            return
+        finalize_start = time.perf_counter()
+        # 确保本次执行的日志明细全部写入
+        log_sink.flush()
         # 更新数据库日志记录
         self.db_log.end_time = datetime.now()
         self.db_log.status = "终止"
-        db.session.commit()
         
         # 如果是定时任务执行，不发送WebSocket消息
         if not self.is_scheduled_task:
+            # 先推送缓冲中的日志，保证日志在结束事件之前到达
+            ws_log_buffer.flush(self.client_id)
             emit('feature_done', {
                 'client_id': self.client_id,
                 'status': 'terminated',
                 'msg': reason
             }, room=client_sid_map.get(self.client_id), namespace=self.namespace)
+        self.record_phase("finalize", finalize_start)
+        self._record_stats()
+        db.session.commit()
+        self.close()
 
 
 class WebSocketLogHandler(logging.Handler):
@@ -155,6 +226,5 @@ class WebSocketLogHandler(logging.Handler):
     def emit(self, record):
         if not self._send_ws:
             return
-        sid = client_sid_map.get(self.client_id)
-        if sid:
-            socketio.emit('log', {'message': record.getMessage()}, room=sid, namespace=self.namespace)
\ No newline at end of file
+        # 放入客户端发送缓冲区，合并为 log_batch 事件推送
+        ws_log_buffer.append(self.client_id, self.namespace, record.getMessage())
\ No newline at end of file
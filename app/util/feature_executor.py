@@ -0,0 +1,112 @@
+"""
+功能执行引擎
+使用固定数量的工作线程和有界的准入队列执行功能，避免突发的手动/定时执行创建大量线程
+"""
+
+import queue
+import threading
+import time
+from app.util.log_utils import logger
+
+
+class FeatureExecutor:
+    """有界工作线程池"""
+
+    def __init__(self, name="feature", max_workers=4, queue_size=32):
+        """
+        :param name: 线程池名称，用于线程命名和指标展示
+        :param max_workers: 工作线程数量
+        :param queue_size: 准入队列容量，队列已满时拒绝新的执行
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._queue = None
+        self._workers = []
+        self._lock = threading.Lock()
+        # 指标
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+
+    def init_app(self, app):
+        """从应用配置中读取线程池参数"""
+        self.max_workers = app.config.get('FEATURE_EXECUTOR_MAX_WORKERS', self.max_workers)
+        self.queue_size = app.config.get('FEATURE_EXECUTOR_QUEUE_SIZE', self.queue_size)
+
+    def _ensure_started(self):
+        """按需启动工作线程"""
+        if self._queue is not None:
+            return
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        for i in range(self.max_workers):
+            t = threading.Thread(target=self._worker, name=f"{self.name}-worker-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+        logger.info(f"执行线程池[{self.name}]已启动，工作线程: {self.max_workers}，队列容量: {self.queue_size}")
+
+    def submit(self, func, *args, **kwargs):
+        """
+        提交任务到线程池
+        :return: (bool, str, dict) 是否被接收，提示信息，排队信息
+        """
+        with self._lock:
+            self._ensure_started()
+            try:
+                self._queue.put_nowait((time.perf_counter(), func, args, kwargs))
+            except queue.Full:
+                self._rejected += 1
+                logger.warning(f"执行线程池[{self.name}]队列已满，拒绝执行")
+                return False, f"执行队列已满（{self.queue_size}），请稍后重试", self._admission_info()
+            self._submitted += 1
+            return True, "已加入执行队列", self._admission_info()
+
+    def _admission_info(self):
+        return {
+            "pool": self.name,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "active": self._active,
+            "max_workers": self.max_workers
+        }
+
+    def _worker(self):
+        while True:
+            enqueued_at, func, args, kwargs = self._queue.get()
+            with self._lock:
+                self._active += 1
+                self._total_wait += time.perf_counter() - enqueued_at
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"执行线程池[{self.name}]任务异常: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+                self._queue.task_done()
+
+    def stats(self):
+        """
+        获取线程池指标
+        :return: dict 活跃数、排队数、拒绝数、平均等待时间（毫秒）等
+        """
+        with self._lock:
+            started = self._completed + self._active
+            return {
+                "pool": self.name,
+                "max_workers": self.max_workers,
+                "queue_size": self.queue_size,
+                "active": self._active,
+                "queued": self._queue.qsize() if self._queue else 0,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "mean_wait_ms": round(self._total_wait / started * 1000, 2) if started else 0
+            }
+
+
+# 全局功能执行线程池
+feature_executor = FeatureExecutor()
@@ -0,0 +1,188 @@
+"""
+功能模块缓存
+执行功能和扫描功能元数据共用的已加载模块缓存。
+以脚本路径为键，记录模块内容哈希；文件发生变化时卸载整个包（含子模块）并重新加载。
+另外提供不导入模块、直接解析源码读取 __meta__ 的方法，进程模式的功能无需在Web进程中执行模块代码。
+"""
+
+import ast
+import hashlib
+import importlib.util
+import os
+import sys
+import threading
+
+
+def _literal_meta(tree):
+    """
+    模块顶层以字面量赋值的 __meta__
+    :return: dict，没有 __meta__ 时返回空字典，除顶层字面量赋值外还有其他绑定方式时返回None
+    """
+    meta = {}
+    literal_nodes = set()
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and \
+                isinstance(node.targets[0], ast.Name) and node.targets[0].id == "__meta__":
+            meta = ast.literal_eval(node.value)
+            literal_nodes.add(node.targets[0])
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id == "__meta__" and isinstance(node.ctx, ast.Store) \
+                and node not in literal_nodes:
+            return None
+        if isinstance(node, ast.alias) and (node.asname or node.name) == "__meta__":
+            return None
+    return meta if isinstance(meta, dict) else None
+
+
+class _CacheEntry:
+    def __init__(self, module_name, module, signature, digest):
+        self.module_name = module_name
+        self.module = module
+        self.signature = signature  # 文件mtime/大小快照，用于快速判断是否需要重新计算哈希
+        self.digest = digest  # 文件内容哈希
+
+
+class FeatureModuleCache:
+    """功能模块缓存"""
+
+    def __init__(self):
+        self._entries = {}
+        self._meta = {}  # 脚本路径 -> (文件签名, 静态解析的__meta__)
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+
+    @staticmethod
+    def resolve_path(script_path):
+        """将功能目录转换为其__init__.py路径"""
+        path = os.path.abspath(script_path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "__init__.py")
+        return path
+
+    @staticmethod
+    def module_name_for(path):
+        """根据脚本路径生成稳定的模块名（父子进程一致）"""
+        return f"feature_module_{hashlib.md5(path.encode('utf-8')).hexdigest()[:12]}"
+
+    @staticmethod
+    def _source_files(path):
+        """模块涉及的源文件：单文件功能为其本身，包功能为目录下的所有.py文件"""
+        if os.path.basename(path) != "__init__.py":
+            return [path]
+        files = []
+        for root, dirs, names in os.walk(os.path.dirname(path)):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(".py"))
+        return files
+
+    @staticmethod
+    def _signature(files):
+        signature = []
+        for f in files:
+            st = os.stat(f)
+            signature.append((f, st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    @staticmethod
+    def _digest(files):
+        h = hashlib.sha1()
+        for f in files:
+            h.update(f.encode("utf-8"))
+            with open(f, "rb") as fp:
+                h.update(fp.read())
+        return h.hexdigest()
+
+    @staticmethod
+    def _unload(module_name):
+        """从sys.modules中移除模块及其子模块"""
+        for key in [k for k in list(sys.modules.keys()) if k == module_name or k.startswith(module_name + ".")]:
+            sys.modules.pop(key, None)
+
+    def load(self, script_path):
+        """
+        加载功能模块，命中缓存且文件未变化时直接返回已加载模块
+        :param script_path: 功能脚本文件或功能目录
+        :return: 模块对象
+        """
+        path = self.resolve_path(script_path)
+        with self._lock:
+            files = self._source_files(path)
+            signature = self._signature(files)
+            entry = self._entries.get(path)
+            if entry and entry.signature == signature:
+                self._hits += 1
+                return entry.module
+
+            digest = self._digest(files)
+            if entry and entry.digest == digest:
+                # 仅修改时间变化，内容未变
+                entry.signature = signature
+                self._hits += 1
+                return entry.module
+
+            module_name = self.module_name_for(path)
+            if entry:
+                self._reloads += 1
+            else:
+                self._misses += 1
+            self._entries.pop(path, None)
+            self._unload(module_name)
+
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            # 将模块添加到sys.modules中，以支持相对导入
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                self._unload(module_name)
+                raise
+            self._entries[path] = _CacheEntry(module_name, module, signature, digest)
+            return module
+
+    def read_meta(self, script_path):
+        """
+        解析源码读取模块的 __meta__，不执行模块代码
+        :param script_path: 功能脚本文件或功能目录
+        :return: dict，没有 __meta__ 时返回空字典；其值不是字面量（计算得到、从其他模块导入等）时返回None，
+                 需导入模块读取
+        """
+        path = self.resolve_path(script_path)
+        signature = self._signature([path])
+        with self._lock:
+            cached = self._meta.get(path)
+            if cached and cached[0] == signature:
+                return cached[1]
+        try:
+            with open(path, "rb") as fp:
+                meta = _literal_meta(ast.parse(fp.read(), filename=path))
+        except (SyntaxError, ValueError):
+            meta = None
+        with self._lock:
+            self._meta[path] = (signature, meta)
+        return meta
+
+    def invalidate(self, script_path):
+        """移除指定功能的缓存"""
+        path = self.resolve_path(script_path)
+        with self._lock:
+            self._meta.pop(path, None)
+            entry = self._entries.pop(path, None)
+            if entry:
+                self._unload(entry.module_name)
+
+    def stats(self):
+        """获取缓存指标"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads
+            }
+
+
+# 全局功能模块缓存
+feature_module_cache = FeatureModuleCache()
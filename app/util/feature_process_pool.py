@@ -0,0 +1,234 @@
+"""
+功能进程池
+为CPU密集型功能提供进程隔离的执行模式，避免其占用Flask进程的GIL。
+功能通过 __meta__ 中的 "execution_mode": "process" 选择该模式。
+子进程中的 ctx.log/done/fail/error 调用通过管道代理回父进程的执行上下文。
+父进程等待结果时定期检查取消信号和执行超时，取消或超时时结束并替换工作进程。
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from app.util.feature_dispatcher import FeatureCancelled
+from app.util.log_utils import logger
+from app.util.feature_module_cache import feature_module_cache
+
+# 子进程可以代理回父进程的执行上下文方法
+PROXY_METHODS = ("log", "done", "fail", "error")
+# 等待子进程消息时检查取消信号和超时的间隔（秒）
+POLL_INTERVAL = 0.2
+
+
+class FeatureProcessError(Exception):
+    """子进程执行功能时出现的异常"""
+    pass
+
+
+class _ContextProxy:
+    """子进程中的执行上下文代理，将调用通过管道发送回父进程"""
+
+    def __init__(self, conn, ctx_info):
+        self._conn = conn
+        for key, value in ctx_info.items():
+            setattr(self, key, value)
+
+    def _call(self, method, *args, **kwargs):
+        self._conn.send(("call", (method, args, kwargs)))
+
+    def log(self, message, level="info", send_ws=True):
+        self._call("log", str(message), level, send_ws)
+
+    def done(self, msg="功能执行已完成", data=None):
+        self._call("done", msg, data)
+
+    def fail(self, msg="功能执行失败", data=None):
+        self._call("fail", msg, data)
+
+    def error(self, msg="功能执行失败", data=None, exception=None):
+        # 异常对象不一定可序列化，转为文本记录
+        if exception is not None:
+            self._call("log", f"异常信息: {str(exception)}", "error")
+            self._call("log", f"异常堆栈: {traceback.format_exc()}", "error")
+        self._call("error", msg, data)
+
+
+def _worker_main(conn):
+    """子进程主循环：接收任务，执行功能模块的run()，返回结果"""
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        script_path, config, ctx_info = job
+        try:
+            # 已加载的模块常驻子进程，后续执行无需重复导入，文件变化时自动重新加载
+            module = feature_module_cache.load(script_path)
+            ctx = _ContextProxy(conn, ctx_info)
+            status, msg, data = module.run(config, ctx)
+            conn.send(("result", (status, msg, data)))
+        except Exception as e:
+            try:
+                conn.send(("exception", (f"{type(e).__name__}: {e}", traceback.format_exc())))
+            except Exception:
+                break
+
+
+class _Worker:
+    def __init__(self, mp_context):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+    def kill(self):
+        """立即结束工作进程，用于取消或超时的执行"""
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class FeatureProcessPool:
+    """预先创建的功能执行进程池"""
+
+    def __init__(self, size=2, start_method=None, timeout=None):
+        """
+        :param size: 工作进程数量
+        :param start_method: 进程启动方式，默认优先使用fork
+        :param timeout: 单次执行的最长秒数，为空表示不限制
+        """
+        self.size = size
+        self.start_method = start_method
+        self.timeout = timeout
+        self._idle = None
+        self._lock = threading.Lock()
+        self._mp_context = None
+        self._runs = 0
+        self._restarts = 0
+        self._cancelled = 0
+        self._timeouts = 0
+
+    def init_app(self, app):
+        """从应用配置中读取进程池参数"""
+        self.size = app.config.get('FEATURE_PROCESS_POOL_SIZE', self.size)
+        self.start_method = app.config.get('FEATURE_PROCESS_START_METHOD', self.start_method)
+        self.timeout = app.config.get('FEATURE_PROCESS_TIMEOUT', self.timeout)
+
+    def start(self):
+        """创建工作进程，应在启动其他后台线程之前调用"""
+        with self._lock:
+            if self._idle is not None or self.size <= 0:
+                return
+            method = self.start_method
+            if not method:
+                method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+            self._mp_context = multiprocessing.get_context(method)
+            self._idle = queue.Queue()
+            for _ in range(self.size):
+                self._idle.put(_Worker(self._mp_context))
+            logger.info(f"功能进程池已启动，工作进程: {self.size}，启动方式: {method}")
+
+    def shutdown(self):
+        """停止所有工作进程"""
+        with self._lock:
+            if self._idle is None:
+                return
+            while not self._idle.empty():
+                self._idle.get_nowait().stop()
+            self._idle = None
+
+    def run(self, script_path, config, ctx):
+        """
+        在工作进程中执行功能模块的run()
+        :param script_path: 功能脚本路径
+        :param config: 配置字典
+        :param ctx: 父进程中的FeatureExecutionContext
+        :return: (status, msg, data) 功能run()的返回值
+        :raises FeatureCancelled: 执行被取消，工作进程已结束
+        :raises FeatureProcessError: 子进程异常、异常退出或执行超时
+        """
+        self.start()
+        if self._idle is None:
+            raise FeatureProcessError("功能进程池未启用")
+        worker = self._idle.get()
+        broken = False
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        try:
+            ctx_info = {
+                "client_id": ctx.client_id,
+                "request_id": ctx.request_id,
+                "feature_id": ctx.feature_id,
+                "feature_name": ctx.feature_name,
+                "execution_type": ctx.execution_type,
+                "is_scheduled_task": ctx.is_scheduled_task
+            }
+            worker.conn.send((os.path.abspath(script_path), config, ctx_info))
+            while True:
+                if getattr(ctx, "cancelled", False):
+                    broken = True
+                    self._cancelled += 1
+                    raise FeatureCancelled()
+                if deadline is not None and time.monotonic() >= deadline:
+                    broken = True
+                    self._timeouts += 1
+                    raise FeatureProcessError(f"功能执行超时（{self.timeout}秒），工作进程已结束")
+                if not worker.conn.poll(POLL_INTERVAL):
+                    if not worker.is_alive():
+                        raise EOFError("工作进程已退出")
+                    continue
+                kind, payload = worker.conn.recv()
+                if kind == "call":
+                    method, args, kwargs = payload
+                    if method in PROXY_METHODS:
+                        getattr(ctx, method)(*args, **kwargs)
+                elif kind == "result":
+                    self._runs += 1
+                    return payload
+                elif kind == "exception":
+                    message, stack = payload
+                    ctx.log(f"异常堆栈: {stack}", "error", False)
+                    raise FeatureProcessError(message)
+        except (EOFError, OSError) as e:
+            broken = True
+            raise FeatureProcessError(f"功能工作进程异常退出: {e}")
+        finally:
+            if broken or not worker.is_alive():
+                # 替换异常退出、被取消或超时的工作进程
+                worker.kill()
+                worker = _Worker(self._mp_context)
+                self._restarts += 1
+            self._idle.put(worker)
+
+    def stats(self):
+        """获取进程池指标"""
+        return {
+            "size": self.size,
+            "started": self._idle is not None,
+            "idle": self._idle.qsize() if self._idle else 0,
+            "timeout": self.timeout,
+            "runs": self._runs,
+            "restarts": self._restarts,
+            "cancelled": self._cancelled,
+            "timeouts": self._timeouts
+        }
+
+
+# 全局功能进程池
+feature_process_pool = FeatureProcessPool()
@@ -0,0 +1,78 @@
+"""
+JSON序列化
+Flask的JSON提供者，序列化函数可通过配置 JSON_ENCODER 切换，默认在安装了orjson时使用orjson，
+否则回退到标准库json。日期时间等类型的输出格式与Flask默认保持一致。
+"""
+
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时使用标准库
+    orjson = None
+
+# 已注册的序列化函数：名称 -> dumps(obj, default) 返回bytes
+_ENCODERS = {}
+
+
+def register_encoder(name, dumps):
+    """
+    注册序列化函数
+    :param name: 名称，对应配置 JSON_ENCODER
+    :param dumps: 函数 dumps(obj, default)，default为无法序列化的对象的转换函数，返回bytes
+    """
+    _ENCODERS[name] = dumps
+
+
+def _json_dumps(obj, default):
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+register_encoder("json", _json_dumps)
+
+if orjson is not None:
+    # 日期时间交给default处理，与Flask默认的HTTP日期格式保持一致
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _orjson_dumps(obj, default):
+        try:
+            return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # 超出64位的整数等orjson不支持的值
+            return _json_dumps(obj, default)
+
+    register_encoder("orjson", _orjson_dumps)
+
+
+def available_encoders():
+    """已注册的序列化函数名称"""
+    return sorted(_ENCODERS)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """使用可替换序列化函数的JSON提供者，解析仍使用标准库"""
+
+    # 保持字典原有顺序，避免每次序列化都排序键
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        name = app.config.get('JSON_ENCODER') or ("orjson" if "orjson" in _ENCODERS else "json")
+        if name not in _ENCODERS:
+            raise ValueError(f"未知的JSON_ENCODER: {name}，可选值: {', '.join(available_encoders())}")
+        self.encoder_name = name
+        self._dumps = _ENCODERS[name]
+
+    def dumps_bytes(self, obj):
+        """序列化为bytes，直接作为响应体"""
+        return self._dumps(obj, self.default)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,213 @@
+"""
+调度器选主
+多个实例共用一个数据库时，通过 scheduler_lease 表中的租约选出唯一的leader调度定时任务。
+leader每隔 heartbeat_interval 秒续约一次，租约有效期为 ttl 秒；leader异常退出后，
+其他实例最迟在 ttl + heartbeat_interval 秒内接管。leader连续续约失败时在租约到期前主动放弃，
+避免与接管的实例同时调度。正常退出时释放租约，其他实例在下一次心跳时即可接管。
+"""
+
+import atexit
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.base_models import SchedulerLease
+from app.util.log_utils import logger
+
+
+class LeaderElection:
+    """基于数据库租约的选主"""
+
+    def __init__(self, name="scheduler", ttl=30, heartbeat_interval=10):
+        """
+        :param name: 租约名称
+        :param ttl: 租约有效期（秒）
+        :param heartbeat_interval: 续约间隔（秒），应明显小于ttl
+        """
+        self.name = name
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.app = None
+        self._is_leader = False
+        self._deadline = 0.0  # 本实例持有的租约在本地单调时钟上的到期时间
+        self._on_elected = None
+        self._on_revoked = None
+        self._on_renewed = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        # 指标
+        self._elections = 0
+        self._step_downs = 0
+        self._renew_failures = 0
+        self._last_error = None
+
+    def init_app(self, app):
+        """从应用配置中读取租约参数"""
+        self.app = app
+        self.ttl = app.config.get('SCHEDULER_LEASE_TTL', self.ttl)
+        self.heartbeat_interval = app.config.get('SCHEDULER_LEASE_HEARTBEAT', self.heartbeat_interval)
+        self.owner_id = app.config.get('SCHEDULER_NODE_ID') or self.owner_id
+
+    @property
+    def is_leader(self):
+        return self._is_leader
+
+    def start(self, on_elected, on_revoked, on_renewed=None):
+        """
+        启动心跳线程
+        :param on_elected: 当选leader时调用
+        :param on_revoked: 失去leader身份时调用
+        :param on_renewed: leader每次续约成功后调用
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._on_elected = on_elected
+            self._on_revoked = on_revoked
+            self._on_renewed = on_renewed
+            self._thread = threading.Thread(target=self._loop, name="scheduler-leader-election", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+        logger.info(f"调度器选主已启动，实例: {self.owner_id}，租约有效期: {self.ttl}秒，续约间隔: {self.heartbeat_interval}秒")
+
+    def stop(self):
+        """停止心跳并释放租约"""
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        if self._is_leader:
+            try:
+                with self.app.app_context():
+                    self._release()
+            except Exception as e:
+                logger.warning(f"释放调度器租约失败: {e}")
+            self._set_leader(False)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._tick()
+            self._stop.wait(self.heartbeat_interval)
+
+    def _tick(self):
+        started = time.monotonic()
+        try:
+            with self.app.app_context():
+                acquired = self._try_acquire()
+        except Exception as e:
+            self._renew_failures += 1
+            self._last_error = str(e)
+            logger.warning(f"调度器租约续约失败: {e}")
+            # 无法续约时，在租约到期前主动放弃
+            if self._is_leader and time.monotonic() >= self._deadline - self.heartbeat_interval:
+                logger.warning("调度器租约即将到期且无法续约，暂停调度")
+                self._set_leader(False)
+            return
+        if acquired:
+            self._deadline = started + self.ttl
+        self._set_leader(acquired)
+        if acquired and self._on_renewed:
+            self._call(self._on_renewed)
+
+    def _try_acquire(self):
+        """
+        获取或续约租约，租约属于本实例或已过期时获取成功
+        :return: bool 本实例是否持有租约
+        """
+        table = SchedulerLease.__table__
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(and_(
+                    table.c.name == self.name,
+                    or_(table.c.owner_id == self.owner_id, table.c.expires_at.is_(None), table.c.expires_at < now)
+                ))
+                .values(
+                    acquired_at=case((table.c.owner_id == self.owner_id, table.c.acquired_at), else_=now),
+                    owner_id=self.owner_id,
+                    expires_at=expires_at,
+                    updated_date=datetime.now()
+                )
+            )
+            if result.rowcount:
+                return True
+            if conn.execute(select(table.c.id).where(table.c.name == self.name)).first() is not None:
+                return False
+        # 首次运行，租约行不存在
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(table).values(
+                    name=self.name, owner_id=self.owner_id, acquired_at=now, expires_at=expires_at,
+                    created_date=datetime.now(), updated_date=datetime.now()
+                ))
+            return True
+        except IntegrityError:
+            # 其他实例同时插入了租约行
+            return False
+
+    def _release(self):
+        table = SchedulerLease.__table__
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(and_(table.c.name == self.name, table.c.owner_id == self.owner_id))
+                .values(expires_at=datetime.utcnow(), updated_date=datetime.now())
+            )
+
+    def _set_leader(self, is_leader):
+        if is_leader == self._is_leader:
+            return
+        self._is_leader = is_leader
+        if is_leader:
+            self._elections += 1
+            logger.info(f"实例 {self.owner_id} 成为调度器leader")
+            self._call(self._on_elected)
+        else:
+            self._step_downs += 1
+            logger.info(f"实例 {self.owner_id} 不再是调度器leader")
+            self._call(self._on_revoked)
+
+    def _call(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"调度器选主回调执行失败: {e}", exc_info=True)
+
+    def stats(self):
+        """获取选主状态和当前租约"""
+        lease = None
+        try:
+            row = db.session.query(SchedulerLease.owner_id, SchedulerLease.acquired_at, SchedulerLease.expires_at) \
+                .filter(SchedulerLease.name == self.name).first()
+            if row:
+                lease = {
+                    "owner_id": row.owner_id,
+                    "acquired_at": row.acquired_at.strftime('%Y-%m-%d %H:%M:%S') if row.acquired_at else None,
+                    "expires_at": row.expires_at.strftime('%Y-%m-%d %H:%M:%S') if row.expires_at else None
+                }
+        except Exception as e:
+            lease = {"error": str(e)}
+        return {
+            "enabled": self._thread is not None,
+            "owner_id": self.owner_id,
+            "is_leader": self._is_leader,
+            "ttl": self.ttl,
+            "heartbeat_interval": self.heartbeat_interval,
+            "elections": self._elections,
+            "step_downs": self._step_downs,
+            "renew_failures": self._renew_failures,
+            "last_error": self._last_error,
+            "lease": lease
+        }
+
+
+# 全局调度器选主
+leader_election = LeaderElection()
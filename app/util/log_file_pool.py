@@ -0,0 +1,105 @@
+"""
+功能日志文件句柄池
+同一功能文件的多次执行共用一个FileHandler，空闲句柄按LRU淘汰，限制打开的文件描述符数量。
+"""
+
+import io
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+FORMATTER = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+
+
+class _PooledHandler:
+    def __init__(self, handler):
+        self.handler = handler
+        self.refs = 0
+
+
+class LogFilePool:
+    """LRU限制的日志文件句柄池"""
+
+    def __init__(self, max_open=32):
+        """
+        :param max_open: 最多保持打开的空闲日志文件数量，正在使用的句柄不会被淘汰
+        """
+        self.max_open = max_open
+        self._handlers = OrderedDict()  # 日志文件路径 -> _PooledHandler，按最近使用排序
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._evicted = 0
+
+    def init_app(self, app):
+        """从应用配置中读取句柄池参数"""
+        self.max_open = app.config.get('FEATURE_LOG_MAX_OPEN_FILES', self.max_open)
+
+    def acquire(self, log_file):
+        """
+        获取日志文件的FileHandler，使用完毕后必须调用release
+        :param log_file: 日志文件路径
+        :return: logging.FileHandler
+        """
+        path = os.path.abspath(log_file)
+        with self._lock:
+            entry = self._handlers.get(path)
+            if entry is None:
+                handler = logging.FileHandler(path, encoding="utf-8")
+                handler.setFormatter(FORMATTER)
+                entry = self._handlers[path] = _PooledHandler(handler)
+                self._opened += 1
+            entry.refs += 1
+            self._handlers.move_to_end(path)
+            self._evict()
+            return entry.handler
+
+    def release(self, log_file):
+        """归还日志文件的FileHandler"""
+        path = os.path.abspath(log_file)
+        with self._lock:
+            entry = self._handlers.get(path)
+            if entry is None:
+                return
+            entry.refs = max(entry.refs - 1, 0)
+            self._evict()
+
+    def _evict(self):
+        """关闭最久未使用的空闲句柄，直到数量不超过上限"""
+        excess = len(self._handlers) - self.max_open
+        if excess <= 0:
+            return
+        for path in list(self._handlers.keys()):
+            if excess <= 0:
+                break
+            entry = self._handlers[path]
+            if entry.refs > 0:
+                continue
+            entry.handler.close()
+            del self._handlers[path]
+            self._evicted += 1
+            excess -= 1
+
+    def stats(self):
+        """获取句柄池的文件描述符和内存占用"""
+        with self._lock:
+            open_files = sum(1 for e in self._handlers.values() if e.handler.stream is not None)
+            memory = sum(sys.getsizeof(e.handler) + io.DEFAULT_BUFFER_SIZE for e in self._handlers.values())
+            in_use = sum(1 for e in self._handlers.values() if e.refs > 0)
+        process_fds = None
+        if os.path.isdir("/proc/self/fd"):
+            process_fds = len(os.listdir("/proc/self/fd"))
+        return {
+            "max_open": self.max_open,
+            "open_files": open_files,
+            "in_use": in_use,
+            "opened": self._opened,
+            "evicted": self._evicted,
+            "estimated_memory_bytes": memory,
+            "process_fds": process_fds
+        }
+
+
+# 全局日志文件句柄池
+log_file_pool = LogFilePool()
@@ -0,0 +1,154 @@
+"""
+日志明细全文索引
+基于SQLite FTS5的外部内容表，索引 feature_execution_log_detail.message。
+索引由日志写入路径（批量写入器）和日志删除路径同步维护。外部内容表的rowid查询读取的是明细表，
+无法据此判断哪些明细已建立索引，已索引的最大明细ID单独记录在 STATE_TABLE 中。
+数据库不支持FTS5时 fts_enabled() 返回False，搜索退化为LIKE匹配。
+"""
+
+from sqlalchemy import text
+from app import db
+from app.util.log_utils import logger
+
+FTS_TABLE = "feature_execution_log_detail_fts"
+DETAIL_TABLE = "feature_execution_log_detail"
+STATE_TABLE = "feature_execution_log_detail_fts_state"
+
+# 最短可检索词长度，trigram分词下少于3个字符的词无法通过索引匹配
+TRIGRAM_MIN_LENGTH = 3
+
+_state = {"enabled": False, "tokenizer": None}
+
+
+def fts_enabled():
+    """全文索引是否可用"""
+    return _state["enabled"]
+
+
+def fts_supports(keyword):
+    """全文索引能否检索该关键字"""
+    if not fts_enabled():
+        return False
+    if _state["tokenizer"] == "trigram":
+        return all(len(t) >= TRIGRAM_MIN_LENGTH for t in keyword.split())
+    return True
+
+
+def _create_table(conn, tokenizer):
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"message, content='{DETAIL_TABLE}', content_rowid='id', tokenize='{tokenizer}')"
+    ))
+
+
+def _create_state_table(conn):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+        f"id INTEGER PRIMARY KEY CHECK (id = 1), last_id INTEGER NOT NULL DEFAULT 0)"
+    ))
+
+
+def rebuild_index(session):
+    """
+    根据日志明细表重建全文索引，并记录已索引的最大明细ID
+    :param session: 数据库会话或连接
+    """
+    session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')"))
+    session.execute(text(
+        f"INSERT OR REPLACE INTO {STATE_TABLE}(id, last_id) "
+        f"SELECT 1, COALESCE(MAX(id), 0) FROM {DETAIL_TABLE}"
+    ))
+
+
+def ensure_fts_index():
+    """
+    创建全文索引表（可重复执行），首次创建时为已有日志明细建立索引
+    :return: 全文索引是否可用
+    """
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        _state["enabled"] = False
+        return False
+    try:
+        with engine.begin() as conn:
+            row = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+            ).first()
+            if row is None:
+                try:
+                    # trigram分词支持中文和SKU等子串匹配
+                    _create_table(conn, "trigram")
+                    tokenizer = "trigram"
+                except Exception:
+                    _create_table(conn, "unicode61")
+                    tokenizer = "unicode61"
+                _create_state_table(conn)
+                rebuild_index(conn)
+                logger.info(f"日志明细全文索引已创建，分词器: {tokenizer}")
+            else:
+                tokenizer = "trigram" if "trigram" in (row[0] or "") else "unicode61"
+                _create_state_table(conn)
+                if conn.execute(text(f"SELECT 1 FROM {STATE_TABLE} WHERE id = 1")).first() is None:
+                    # 没有记录已索引位置的旧版本索引，无法确认与明细表一致，重建一次
+                    rebuild_index(conn)
+                    logger.info("日志明细全文索引已重建")
+        _state["tokenizer"] = tokenizer
+        _state["enabled"] = True
+    except Exception as e:
+        logger.warning(f"当前数据库不支持FTS5全文索引，日志搜索将使用LIKE匹配: {e}")
+        _state["enabled"] = False
+    return _state["enabled"]
+
+
+def index_new_details(session):
+    """
+    为尚未建立索引的日志明细建立索引，与明细插入在同一事务中执行
+    :param session: 数据库会话或连接
+    日志明细只由批量写入器插入，明细表使用AUTOINCREMENT主键、id不复用，新明细的id总是大于已索引的最大明细ID
+    """
+    if not fts_enabled():
+        return
+    session.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, message) "
+        f"SELECT id, message FROM {DETAIL_TABLE} "
+        f"WHERE id > (SELECT last_id FROM {STATE_TABLE} WHERE id = 1)"
+    ))
+    session.execute(text(
+        f"UPDATE {STATE_TABLE} SET last_id = (SELECT COALESCE(MAX(id), last_id) FROM {DETAIL_TABLE}) WHERE id = 1"
+    ))
+
+
+def delete_details_index(session, log_ids):
+    """
+    删除指定日志的明细索引，必须在删除明细行之前调用，只删除已建立索引的明细
+    :param log_ids: 日志ID列表
+    :return: bool 是否删除成功；失败时索引可能与明细表不一致，需在删除明细后调用 rebuild_index
+    """
+    if not fts_enabled() or not log_ids:
+        return True
+    params = {f"id{i}": log_id for i, log_id in enumerate(log_ids)}
+    placeholders = ", ".join(f":{k}" for k in params)
+    try:
+        session.execute(text(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, message) "
+            f"SELECT 'delete', id, message FROM {DETAIL_TABLE} WHERE log_id IN ({placeholders}) "
+            f"AND id <= (SELECT last_id FROM {STATE_TABLE} WHERE id = 1)"
+        ), params)
+        return True
+    except Exception as e:
+        logger.warning(f"删除日志明细全文索引失败，将在删除明细后重建索引: {e}")
+        return False
+
+
+def build_match_query(keyword):
+    """将用户输入转换为FTS5查询：按空白拆分，每个词作为短语，词之间为AND"""
+    terms = [t for t in keyword.split() if t]
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def optimize_index():
+    """合并全文索引的段，大批量删除后调用以回收索引空间"""
+    if not fts_enabled():
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('optimize')"))
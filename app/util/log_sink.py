@@ -0,0 +1,178 @@
+"""
+功能执行日志明细的异步写入器
+ctx.log() 只将日志放入有界缓冲队列，由后台线程按数量或时间间隔批量插入数据库，
+避免每条日志都单独提交一次事务。
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from app.models.base_models import FeatureExecutionLogDetail
+from app.util.log_fts import index_new_details
+from app.util.sqlite_tuning import get_write_engine
+from app.util.log_utils import logger
+
+# 缓冲区已满时的处理策略
+OVERFLOW_BLOCK = "block"  # 阻塞写入方，超时后丢弃
+OVERFLOW_DROP = "drop"  # 直接丢弃新日志
+
+
+class _FlushMarker:
+    """刷新标记，后台线程写完标记之前的所有日志后通知等待方"""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+class FeatureLogSink:
+    """日志明细批量写入器"""
+
+    def __init__(self, buffer_size=10000, batch_size=200, flush_interval=0.5,
+                 overflow_policy=OVERFLOW_BLOCK, block_timeout=1.0):
+        """
+        :param buffer_size: 缓冲队列容量
+        :param batch_size: 单次批量插入的最大行数
+        :param flush_interval: 最长刷新间隔（秒）
+        :param overflow_policy: 缓冲区已满时的策略 block/drop
+        :param block_timeout: block策略下写入方最长等待秒数
+        """
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        # 指标
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+
+    def init_app(self, app):
+        """从应用配置中读取写入器参数"""
+        self.app = app
+        self.buffer_size = app.config.get('LOG_SINK_BUFFER_SIZE', self.buffer_size)
+        self.batch_size = app.config.get('LOG_SINK_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('LOG_SINK_FLUSH_INTERVAL', self.flush_interval)
+        self.overflow_policy = app.config.get('LOG_SINK_OVERFLOW_POLICY', self.overflow_policy)
+        self.block_timeout = app.config.get('LOG_SINK_BLOCK_TIMEOUT', self.block_timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            if self.app is None:
+                self.app = current_app._get_current_object()
+            self._queue = queue.Queue(maxsize=self.buffer_size)
+            self._thread = threading.Thread(target=self._run, name="feature-log-sink", daemon=True)
+            self._thread.start()
+            # 进程退出前写完缓冲区中的日志
+            atexit.register(self.flush, 5)
+
+    def write(self, log_id, request_id, level, message):
+        """
+        写入一条日志明细
+        :return: 是否成功放入缓冲区
+        """
+        self._ensure_started()
+        now = datetime.now()
+        row = {
+            "log_id": log_id,
+            "request_id": request_id,
+            "level": level,
+            "message": message,
+            "timestamp": now,
+            "created_date": now,
+            "updated_date": now
+        }
+        try:
+            if self.overflow_policy == OVERFLOW_DROP:
+                self._queue.put_nowait(row)
+            else:
+                self._queue.put(row, timeout=self.block_timeout)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        with self._lock:
+            self._enqueued += 1
+        return True
+
+    def flush(self, timeout=None):
+        """
+        等待缓冲区中当前所有日志写入数据库
+        :param timeout: 最长等待秒数，None表示一直等待
+        :return: 是否在超时前完成
+        """
+        if self._thread is None:
+            return True
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.event.wait(timeout)
+
+    def _run(self):
+        with self.app.app_context():
+            rows = []
+            markers = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                    if isinstance(item, _FlushMarker):
+                        markers.append(item)
+                    else:
+                        rows.append(item)
+                except queue.Empty:
+                    pass
+                if markers or len(rows) >= self.batch_size or time.monotonic() >= deadline:
+                    if rows:
+                        self._write_batch(rows)
+                        rows = []
+                    for marker in markers:
+                        marker.event.set()
+                    markers = []
+                    deadline = time.monotonic() + self.flush_interval
+
+    def _write_batch(self, rows):
+        """批量插入日志明细"""
+        try:
+            # 使用写入专用连接，SQLite下事务开始时即获取写锁
+            with get_write_engine().begin() as conn:
+                conn.execute(insert(FeatureExecutionLogDetail.__table__), rows)
+                # 全文索引与明细在同一事务中写入
+                index_new_details(conn)
+            with self._lock:
+                self._written += len(rows)
+                self._batches += 1
+        except Exception as e:
+            with self._lock:
+                self._failed += len(rows)
+            logger.error(f"批量写入日志明细失败，丢弃 {len(rows)} 条: {e}")
+
+    def stats(self):
+        """获取写入器指标"""
+        with self._lock:
+            return {
+                "buffer_size": self.buffer_size,
+                "buffered": self._queue.qsize() if self._queue else 0,
+                "overflow_policy": self.overflow_policy,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "batches": self._batches
+            }
+
+
+# 全局日志明细写入器
+log_sink = FeatureLogSink()
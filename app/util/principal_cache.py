@@ -0,0 +1,116 @@
+"""
+已认证用户缓存
+按(用户ID, 令牌jti)缓存用户的启用状态、角色和关联客户ID集合，JWT中间件和权限装饰器
+在缓存有效期内无需查询数据库。用户信息变更时由 user_service 主动失效。
+"""
+
+import threading
+import time
+
+
+class Principal:
+    """请求上下文中的当前用户，只包含鉴权所需的字段"""
+
+    __slots__ = ("id", "username", "role", "is_active", "customer_ids")
+
+    def __init__(self, id, username, role, is_active, customer_ids):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.is_active = is_active
+        self.customer_ids = frozenset(customer_ids)
+
+    def can_access_customer(self, customer_id):
+        """是否关联指定客户"""
+        try:
+            return int(customer_id) in self.customer_ids
+        except (TypeError, ValueError):
+            return False
+
+
+class PrincipalCache:
+    """带有效期的已认证用户缓存"""
+
+    def __init__(self, ttl=30, max_size=10000):
+        """
+        :param ttl: 缓存有效期（秒），0表示不缓存
+        :param max_size: 最多缓存的条目数，超过时清理过期条目，仍超过则全部清空
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = {}  # (user_id, jti) -> (过期时间, Principal)
+        self._lock = threading.Lock()
+        self._generation = 0  # 每次失效加1，加载期间发生失效时不写入缓存
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def init_app(self, app):
+        """从应用配置中读取缓存参数"""
+        self.ttl = app.config.get('PRINCIPAL_CACHE_TTL', self.ttl)
+        self.max_size = app.config.get('PRINCIPAL_CACHE_MAX_SIZE', self.max_size)
+
+    def get(self, user_id, jti, loader):
+        """
+        获取用户，缓存未命中或已过期时调用loader加载
+        :param user_id: 用户ID
+        :param jti: 令牌ID
+        :param loader: 加载函数，参数为用户ID，返回Principal或None
+        :return: Principal或None
+        """
+        key = (user_id, jti)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            generation = self._generation
+        principal = loader(user_id)
+        # 用户不存在时不缓存
+        if principal is not None and self.ttl > 0:
+            with self._lock:
+                if generation != self._generation:
+                    return principal
+                if len(self._entries) >= self.max_size:
+                    self._evict(now)
+                self._entries[key] = (now + self.ttl, principal)
+        return principal
+
+    def _evict(self, now):
+        expired = [k for k, (expires, _) in self._entries.items() if expires <= now]
+        for k in expired:
+            del self._entries[k]
+        if len(self._entries) >= self.max_size:
+            self._entries.clear()
+
+    def invalidate_user(self, user_id):
+        """使指定用户的所有缓存失效（用户信息、角色或关联客户变更时调用）"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+            self._generation += 1
+            self._invalidations += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidations += 1
+
+    def stats(self):
+        """获取缓存指标"""
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations
+            }
+
+
+# 全局已认证用户缓存
+principal_cache = PrincipalCache()
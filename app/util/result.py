@@ -3,7 +3,7 @@
 用于统一控制器的返回值格式
 """
 
-from flask import jsonify
+from flask import current_app
 from typing import Any, Optional, Dict, Union
 import traceback
 
@@ -44,7 +44,11 @@ class Result:
         
         :return: Flask JSON响应
         """
-        return jsonify(self.to_dict()), 200  # 总是返回200，让前端根据status字段判断业务状态
+        response = current_app.json.response(self.to_dict())
+        # 标记为已包装，global_result_format 不再解析和重新序列化响应体
+        response.result_wrapped = True
+        response.result_status = self.status
+        return response, 200  # 总是返回200，让前端根据status字段判断业务状态
 
     @staticmethod
     def success(data: Any = None, message: str = "操作成功", code: int = 200) -> 'Result':
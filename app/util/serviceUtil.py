@@ -1,11 +1,37 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def _checked_keys(clazz, keys):
+    """
+    校验查询结果的列名都是模型的属性，结果按(模型, 列名元组)缓存，每种查询只校验一次
+    与原先通过模型构造函数转换时的行为一致：未知列名抛出TypeError
+    """
+    if clazz is not None:
+        for key in keys:
+            if not hasattr(clazz, key):
+                raise TypeError(f"{key!r} is an invalid keyword argument for {clazz.__name__}")
+    return keys
+
+
+def rows_to_dicts(result, clazz=None):
+    """
+    将SQL查询结果直接转换为字典列表，不构造模型实例
+    :param result: SQLAlchemy查询结果（Row列表或Result）
+    :param clazz: 结果对应的模型类，用于校验列名，可为空
+    :return: list[dict]
+    """
+    rows = result if isinstance(result, list) else list(result)
+    if not rows:
+        return []
+    # 同一结果集的所有行共用一个列名元组
+    keys = _checked_keys(clazz, tuple(rows[0]._fields))
+    return [dict(zip(keys, row)) for row in rows]
+
 
 def model_to_dict(result, clazz):
     """
     将SQLAlchemy查询结果转换为字典列表
     :param result: SQLAlchemy查询结果
     """
-    data_list = [clazz(**row._asdict()) for row in result]
-    data_list_dict = [data.__dict__ for data in data_list]
-    for data in data_list_dict:
-        data.pop('_sa_instance_state', None)
-    return data_list_dict
\ No newline at end of file
+    return rows_to_dicts(result, clazz)
@@ -0,0 +1,136 @@
+"""
+SQLite性能配置
+通过引擎的connect事件为每个连接设置WAL、synchronous、busy_timeout、mmap和缓存大小，
+并为日志明细批量写入器提供独立的单连接写引擎（BEGIN IMMEDIATE），减少"database is locked"。
+非SQLite数据库时这里的函数都不做任何处理。
+"""
+
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+from app import db
+
+_write_engine = {"engine": None}
+_lock = threading.Lock()
+
+
+def is_sqlite_uri(uri):
+    return (uri or "").startswith("sqlite")
+
+
+def _is_memory_uri(uri):
+    return uri in ("sqlite://", "sqlite:///:memory:") or ":memory:" in uri or "mode=memory" in uri
+
+
+def sqlite_engine_options(config):
+    """
+    生成SQLite的引擎参数，在 db.init_app 之前写入 SQLALCHEMY_ENGINE_OPTIONS
+    :param config: 应用配置
+    :return: dict 引擎参数，非文件SQLite返回空字典
+    """
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if not is_sqlite_uri(uri) or _is_memory_uri(uri):
+        return {}
+    return {
+        # 显式使用连接池，SQLAlchemy 1.4 对文件数据库默认使用NullPool，每次请求都重新打开文件
+        "poolclass": QueuePool,
+        "pool_size": config.get('SQLITE_POOL_SIZE', 10),
+        "max_overflow": config.get('SQLITE_POOL_MAX_OVERFLOW', 10),
+        "pool_timeout": config.get('SQLITE_POOL_TIMEOUT', 30),
+        "connect_args": {
+            # pysqlite的锁等待时间（秒），与busy_timeout保持一致
+            "timeout": config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000,
+            # 连接由连接池在线程之间复用
+            "check_same_thread": False
+        }
+    }
+
+
+def _pragmas(config):
+    return (
+        ("journal_mode", config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ("synchronous", config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ("busy_timeout", int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+        ("mmap_size", int(config.get('SQLITE_MMAP_SIZE', 0))),
+        # 负数表示以KiB为单位
+        ("cache_size", -int(config.get('SQLITE_CACHE_SIZE_KB', 2000))),
+        ("temp_store", config.get('SQLITE_TEMP_STORE', 'MEMORY')),
+    )
+
+
+def _register_pragmas(engine, config):
+    pragmas = _pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def apply_sqlite_profile(app):
+    """
+    为应用的数据库引擎注册SQLite连接参数，需在 db.init_app 之后、首次使用连接之前调用
+    :param app: Flask应用
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if not is_sqlite_uri(uri) or _is_memory_uri(uri):
+        return
+    with app.app_context():
+        _register_pragmas(db.engine, app.config)
+
+
+def get_write_engine():
+    """
+    获取写入专用引擎
+    SQLite下为独立的单连接引擎，事务以 BEGIN IMMEDIATE 开始，写入方在事务开始时就排队获取写锁，
+    避免读事务升级为写事务时因锁冲突直接失败；其他数据库直接返回 db.engine
+    """
+    engine = db.engine
+    uri = str(engine.url)
+    if engine.dialect.name != "sqlite" or _is_memory_uri(uri):
+        return engine
+    if _write_engine["engine"] is not None:
+        return _write_engine["engine"]
+    with _lock:
+        if _write_engine["engine"] is None:
+            from flask import current_app
+            config = current_app.config
+            write_engine = create_engine(
+                engine.url,
+                poolclass=QueuePool,
+                pool_size=1,
+                max_overflow=0,
+                connect_args={"timeout": config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000,
+                              "check_same_thread": False}
+            )
+            _register_pragmas(write_engine, config)
+
+            @event.listens_for(write_engine, "connect")
+            def _disable_pysqlite_begin(dbapi_connection, connection_record):
+                # 由下面的begin事件控制事务开始方式
+                dbapi_connection.isolation_level = None
+
+            @event.listens_for(write_engine, "begin")
+            def _begin_immediate(conn):
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+            _write_engine["engine"] = write_engine
+    return _write_engine["engine"]
+
+
+def stats():
+    """获取数据库连接池和SQLite参数"""
+    engine = db.engine
+    result = {"dialect": engine.dialect.name, "pool": engine.pool.status()}
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            result["journal_mode"] = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            result["synchronous"] = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            result["busy_timeout"] = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        if _write_engine["engine"] is not None:
+            result["write_pool"] = _write_engine["engine"].pool.status()
+    return result
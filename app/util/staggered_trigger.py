@@ -0,0 +1,94 @@
+"""
+错峰cron触发器
+在cron触发时间上加一个固定偏移，使相同cron表达式的任务分散在一个时间窗口内触发，
+避免所有任务在整点（如 */5 的 :00 秒）同时执行。偏移按任务ID确定，重启后不变。
+随机延迟（jitter）由任务ID和触发时间确定，同一次触发重复计算得到相同的时间，
+调度器据此推算的应触发时间和未来派发分布是稳定的。
+"""
+
+import hashlib
+from datetime import timedelta
+from apscheduler.triggers.cron import CronTrigger
+
+# 黄金分割比，连续的任务ID在窗口内得到分布均匀的偏移
+_GOLDEN_RATIO = 0.6180339887498949
+
+
+def stagger_offset(task_id, window):
+    """
+    计算任务在错峰窗口内的偏移秒数
+    :param task_id: 任务ID
+    :param window: 窗口大小（秒）
+    :return: int 0 ~ window-1
+    """
+    if not window or window <= 0:
+        return 0
+    return int((task_id * _GOLDEN_RATIO) % 1 * window)
+
+
+class StaggeredCronTrigger(CronTrigger):
+    """触发时间固定偏移 offset 秒的cron触发器"""
+
+    __slots__ = ('offset', 'seed')
+
+    def __init__(self, *args, offset=0, seed=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.offset = offset
+        self.seed = seed
+
+    @classmethod
+    def from_crontab(cls, expr, timezone=None, offset=0, jitter=None, seed=0):
+        """
+        根据crontab表达式创建触发器
+        :param expr: 5段crontab表达式
+        :param offset: 偏移秒数
+        :param jitter: 随机延迟的最大秒数，为空时不加随机延迟
+        :param seed: 随机延迟的种子，一般为任务ID
+        """
+        trigger = super().from_crontab(expr, timezone)
+        trigger.offset = offset
+        trigger.jitter = jitter or None
+        trigger.seed = seed
+        return trigger
+
+    def _apply_jitter(self, next_fire_time, jitter, now):
+        """随机延迟由(seed, 触发时间)确定，不使用全局随机数"""
+        if next_fire_time is None or not jitter:
+            return next_fire_time
+        digest = hashlib.blake2b(f"{self.seed}:{next_fire_time.timestamp()}".encode(), digest_size=8).digest()
+        return next_fire_time + timedelta(seconds=int.from_bytes(digest, "big") / 2 ** 64 * jitter)
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        if not self.offset:
+            return super().get_next_fire_time(previous_fire_time, now)
+        delta = timedelta(seconds=self.offset)
+        next_fire_time = super().get_next_fire_time(
+            previous_fire_time - delta if previous_fire_time else None, now - delta)
+        return next_fire_time + delta if next_fire_time else None
+
+    def period_seconds(self, now):
+        """相邻两次触发的间隔秒数，用于限制错峰窗口不超过执行周期，应在设置jitter之前调用"""
+        first = CronTrigger.get_next_fire_time(self, None, now)
+        second = CronTrigger.get_next_fire_time(self, first, first) if first else None
+        return (second - first).total_seconds() if second else None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['offset'] = self.offset
+        state['seed'] = self.seed
+        return state
+
+    def __setstate__(self, state):
+        offset = state.pop('offset', 0)
+        seed = state.pop('seed', 0)
+        super().__setstate__(state)
+        self.offset = offset
+        self.seed = seed
+
+    def __str__(self):
+        # 任务同步时通过字符串判断触发时间是否变化，需要包含偏移和随机延迟
+        options = [f"offset='{self.offset}'"]
+        if self.jitter:
+            options.append(f"jitter='{self.jitter}'")
+        fields = super().__str__()[len('cron['):-1]
+        return f"cron[{', '.join(([fields] if fields else []) + options)}]"
@@ -0,0 +1,129 @@
+"""
+WebSocket实时日志合并推送
+每个客户端一个发送缓冲区，按时间间隔或行数将多条日志合并为一个 log_batch 事件推送，
+客户端处理不过来导致积压超过上限时丢弃最早的日志并计数。
+"""
+
+import threading
+from collections import deque
+from app.ws_server import socketio, client_sid_map
+
+
+class _ClientBuffer:
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.messages = deque()
+        self.dropped = 0  # 自上次推送以来丢弃的条数
+
+
+class WsLogBuffer:
+    """按客户端合并推送日志"""
+
+    def __init__(self, interval_ms=200, max_lines=100, max_pending=2000):
+        """
+        :param interval_ms: 推送间隔（毫秒）
+        :param max_lines: 单个 log_batch 事件的最大行数，缓冲达到该行数时立即推送
+        :param max_pending: 单个客户端最多积压的行数，超过时丢弃最早的日志
+        """
+        self.interval_ms = interval_ms
+        self.max_lines = max_lines
+        self.max_pending = max_pending
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        # 指标
+        self._batches = 0
+        self._sent = 0
+        self._dropped = 0
+
+    def init_app(self, app):
+        """从应用配置中读取推送参数"""
+        self.interval_ms = app.config.get('WS_LOG_BATCH_INTERVAL_MS', self.interval_ms)
+        self.max_lines = app.config.get('WS_LOG_BATCH_MAX_LINES', self.max_lines)
+        self.max_pending = app.config.get('WS_LOG_MAX_PENDING', self.max_pending)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ws-log-buffer", daemon=True)
+                self._thread.start()
+
+    def append(self, client_id, namespace, message):
+        """将一条日志放入客户端的发送缓冲区"""
+        self._ensure_started()
+        with self._lock:
+            buffer = self._buffers.get(client_id)
+            if buffer is None:
+                buffer = self._buffers[client_id] = _ClientBuffer(namespace)
+            if len(buffer.messages) >= self.max_pending:
+                buffer.messages.popleft()
+                buffer.dropped += 1
+                self._dropped += 1
+            buffer.messages.append(message)
+            if len(buffer.messages) >= self.max_lines:
+                self._wakeup.set()
+
+    def flush(self, client_id):
+        """立即推送客户端缓冲区中的全部日志，用于在结束事件之前保证日志先到达"""
+        with self._send_lock:
+            with self._lock:
+                buffer = self._buffers.pop(client_id, None)
+            if not buffer:
+                return
+            messages = list(buffer.messages)
+            dropped = buffer.dropped
+            for start in range(0, max(len(messages), 1), self.max_lines):
+                batch = messages[start:start + self.max_lines]
+                if batch or dropped:
+                    self._emit(client_id, buffer.namespace, batch, dropped)
+                dropped = 0
+
+    def _take_batches(self):
+        """取出每个客户端待推送的一批日志"""
+        batches = []
+        with self._lock:
+            for client_id, buffer in list(self._buffers.items()):
+                if not buffer.messages and not buffer.dropped:
+                    del self._buffers[client_id]
+                    continue
+                messages = [buffer.messages.popleft() for _ in range(min(self.max_lines, len(buffer.messages)))]
+                batches.append((client_id, buffer.namespace, messages, buffer.dropped))
+                buffer.dropped = 0
+        return batches
+
+    def _emit(self, client_id, namespace, messages, dropped):
+        sid = client_sid_map.get(client_id)
+        if not sid:
+            return
+        socketio.emit('log_batch', {'messages': messages, 'dropped': dropped}, room=sid, namespace=namespace)
+        with self._lock:
+            self._batches += 1
+            self._sent += len(messages)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval_ms / 1000)
+            self._wakeup.clear()
+            # 推送锁保证后台推送与flush之间的日志顺序
+            with self._send_lock:
+                for client_id, namespace, messages, dropped in self._take_batches():
+                    self._emit(client_id, namespace, messages, dropped)
+
+    def stats(self):
+        """获取推送指标"""
+        with self._lock:
+            return {
+                "clients": len(self._buffers),
+                "pending": sum(len(b.messages) for b in self._buffers.values()),
+                "batches": self._batches,
+                "sent": self._sent,
+                "dropped": self._dropped
+            }
+
+
+# 全局WebSocket日志推送缓冲
+ws_log_buffer = WsLogBuffer()
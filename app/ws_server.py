@@ -1,15 +1,48 @@
 from flask_socketio import SocketIO, emit, Namespace
 from flask import request
+import threading
 
 socketio = SocketIO(cors_allowed_origins="*")  # 支持跨域
 
 client_sid_map = {}  # client_id -> sid
 sid_client_map = {}  # sid -> client_id
+client_ready_events = {}  # client_id -> 注册完成事件
+_ready_lock = threading.Lock()
+
+def _get_ready_event(client_id):
+    with _ready_lock:
+        event = client_ready_events.get(client_id)
+        if event is None:
+            event = client_ready_events[client_id] = threading.Event()
+        return event
+
+def wait_for_client(client_id, timeout):
+    """
+    等待客户端完成WebSocket注册
+    :param client_id: 客户端ID
+    :param timeout: 最长等待秒数
+    :return: 是否已注册
+    """
+    if client_id in client_sid_map:
+        return True
+    event = _get_ready_event(client_id)
+    if event.wait(timeout):
+        return True
+    # 客户端未注册时不会断开连接，由这里移除事件，避免每次执行的新client_id留下事件
+    with _ready_lock:
+        if client_ready_events.get(client_id) is event and not event.is_set():
+            client_ready_events.pop(client_id, None)
+    return event.is_set()
 
 class FeatureNamespace(Namespace):
     def on_connect(self, sid=None, environ=None, auth=None):
         print("WebSocket 已连接")
     def on_disconnect(self, sid=None):
+        client_id = sid_client_map.pop(request.sid, None)
+        if client_id and client_sid_map.get(client_id) == request.sid:
+            client_sid_map.pop(client_id, None)
+            with _ready_lock:
+                client_ready_events.pop(client_id, None)
         print("WebSocket 已断开")
     def on_register(self, sid, data):
         client_id = data.get("client_id")
@@ -17,6 +50,8 @@ class FeatureNamespace(Namespace):
         if client_id:
             client_sid_map[client_id] = sid
             sid_client_map[sid] = client_id
+            # 通知等待该客户端的功能执行
+            _get_ready_event(client_id).set()
             print(f"客户端注册: {client_id} <-> {sid}")
 
-socketio.on_namespace(FeatureNamespace('/feature'))
\ No newline at end of file
+socketio.on_namespace(FeatureNamespace('/feature'))
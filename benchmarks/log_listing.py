@@ -0,0 +1,169 @@
+"""
+日志列表接口的响应序列化基准
+对比原有的结果包装流程（jsonify序列化，global_result_format 解析响应体后重新序列化）
+和当前流程（Result响应标记为已包装直接返回，FastJSONProvider序列化）。
+两种流程调用同一个 /api/log/get_logs 接口、读取同一个数据库，只有结果包装和序列化方式不同。
+
+运行：python -m benchmarks.log_listing [--logs 5000] [--page-size 200] [--requests 300]
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from flask import Flask, jsonify, request
+from flask_jwt_extended import JWTManager
+from app import db
+from app.config import Test_config
+from app.controllers.log_controller import log_bp
+from app.middlewares import global_result_format, jwt_middleware
+from app.services.log_service import query_logs
+from app.models.base_models import Feature, FeatureExecutionLog
+from app.models.user_models import User
+from app.services.user_service import generate_access_token
+from app.util.json_provider import FastJSONProvider
+from app.util.result import Result
+
+
+def _baseline_result_format(app):
+    """原有的 global_result_format：解析每个API响应体，未包装的响应重新序列化"""
+    @app.after_request
+    def result_format(response):
+        if request.path.startswith("/api"):
+            response_data = response.get_json()
+            if response_data and isinstance(response_data, dict) and \
+                    "status" in response_data and "code" in response_data and "data" in response_data:
+                return response
+            status = response.status_code < 400
+            wrapped_response = {
+                "status": status,
+                "code": response.status_code,
+                "data": response_data if response_data else response.get_data().decode(),
+                "message": "请求成功" if status else "请求失败"
+            }
+            response.status_code = 200
+            response.set_data(jsonify(wrapped_response).data)
+        return response
+
+
+@contextlib.contextmanager
+def _baseline_result():
+    """原有的 Result.to_json：使用jsonify序列化"""
+    to_json = Result.to_json
+    Result.to_json = lambda self: (jsonify(self.to_dict()), 200)
+    try:
+        yield
+    finally:
+        Result.to_json = to_json
+
+
+def build_app(database_uri, baseline):
+    app = Flask(__name__)
+    app.config.from_object(Test_config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['PRINCIPAL_CACHE_TTL'] = 300
+    if not baseline:
+        app.json = FastJSONProvider(app)
+    JWTManager(app)
+    app.register_blueprint(log_bp, url_prefix='/api/log')
+    jwt_middleware(app)
+    if baseline:
+        _baseline_result_format(app)
+    else:
+        global_result_format(app)
+    db.init_app(app)
+    return app
+
+
+def seed(app, log_count):
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(Feature(id=i, name=f"功能{i}", customer_id=1, category_id=1) for i in range(1, 21))
+        start = datetime(2026, 1, 1)
+        db.session.add_all(
+            FeatureExecutionLog(feature_id=i % 20 + 1, request_id=f"{i:010d}", status="成功",
+                                start_time=start + timedelta(seconds=i * 7), end_time=start + timedelta(seconds=i * 7 + 3),
+                                client_id=f"client-{i % 50}", execution_type="scheduled" if i % 3 else "manual",
+                                queue_wait_ms=5, load_ms=1, config_ms=2, run_ms=3000, finalize_ms=4)
+            for i in range(log_count))
+        admin = User(username="bench", password_hash="x", role="admin", token_version=0)
+        db.session.add(admin)
+        db.session.commit()
+
+
+def measure(app, page_size, requests):
+    with app.app_context():
+        token = generate_access_token(User.query.filter_by(username="bench").one())
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    body = {"page_size": page_size}
+    # 预热：建立连接、加载用户缓存
+    for _ in range(10):
+        client.post("/api/log/get_logs", json=body, headers=headers)
+    timings = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.post("/api/log/get_logs", json=body, headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+        size = len(response.data)
+    assert response.get_json()["status"] is True
+    assert len(response.get_json()["data"]["items"]) == page_size
+    return statistics.median(timings), statistics.mean(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        baseline_app = build_app(database_uri, baseline=True)
+        current_app = build_app(database_uri, baseline=False)
+        seed(current_app, args.logs)
+
+        with _baseline_result():
+            baseline = measure(baseline_app, args.page_size, args.requests)
+        current = measure(current_app, args.page_size, args.requests)
+        # 去掉数据库查询等公共开销后，单独对比结果包装和序列化
+        with current_app.test_request_context("/api/log/get_logs"):
+            payload = query_logs(page_size=args.page_size)[2]
+
+    print(f"POST /api/log/get_logs，{args.logs} 条日志，每页 {args.page_size} 条，{args.requests} 次请求")
+    print(f"{'流程':<10}{'中位数(ms)':>12}{'平均(ms)':>12}{'响应字节':>12}")
+    for name, (median, mean, size) in (("原有", baseline), ("当前", current)):
+        print(f"{name:<10}{median:>12.2f}{mean:>12.2f}{size:>12}")
+    print(f"中位数加速: {baseline[0] / current[0]:.2f}x")
+    serialize_only(baseline_app, current_app, payload)
+
+
+def serialize_only(baseline_app, current_app, payload, rounds=200):
+    """只对比结果包装和序列化：原有流程序列化、解析、再序列化，当前流程序列化一次"""
+    def baseline_pipeline():
+        response = jsonify(Result(True, 200, payload, "操作成功").to_dict())
+        data = response.get_json()
+        return jsonify(data).data
+
+    def current_pipeline():
+        return current_app.json.dumps_bytes(Result(True, 200, payload, "操作成功").to_dict())
+
+    results = []
+    for app, pipeline in ((baseline_app, baseline_pipeline), (current_app, current_pipeline)):
+        with app.app_context():
+            pipeline()
+            started = time.perf_counter()
+            for _ in range(rounds):
+                pipeline()
+            results.append((time.perf_counter() - started) / rounds * 1000)
+    print(f"仅结果包装和序列化（{len(payload['items'])} 条）: 原有 {results[0]:.3f} ms，当前 {results[1]:.3f} ms，"
+          f"加速 {results[0] / results[1]:.2f}x，序列化函数: {current_app.json.encoder_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+原生SQL结果行转字典的基准
+对比原有的 model_to_dict（每行构造一个模型实例再取 __dict__）和当前的 rows_to_dicts（直接按列名组装字典）。
+数据来自内存SQLite中的 base_feature，查询与 feature_service.get_all_feature 相同。
+
+运行：python -m benchmarks.row_mapping [--rows 10000] [--rounds 20]
+"""
+
+import argparse
+import statistics
+import time
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from app import db
+from app.config import Test_config
+from app.models.base_models import Customer, Feature
+from app.util.serviceUtil import rows_to_dicts
+
+SQL = text('''
+           select ft.id, ft.name, ft.description, ft.customer_id,
+                ft.priority, ft.max_concurrency, ft.concurrency_policy,
+                ct.name customer_name from base_feature ft
+            left join base_customer ct on ft.customer_id = ct.id
+            order by ft.id
+           ''')
+
+
+def model_to_dict(result, clazz):
+    """原有实现：每行构造一个ORM实例"""
+    data_list = [clazz(**row._asdict()) for row in result]
+    data_list_dict = [data.__dict__ for data in data_list]
+    for data in data_list_dict:
+        data.pop('_sa_instance_state', None)
+    return data_list_dict
+
+
+def build_app(rows):
+    app = Flask(__name__)
+    app.config.from_object(Test_config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(Customer(id=i, name=f"客户{i}") for i in range(1, 11))
+        db.session.add_all(Feature(id=i, name=f"功能{i}", description=f"功能{i}的说明", customer_id=i % 10 + 1,
+                                   category_id=1, priority=i % 5, max_concurrency=1, concurrency_policy="queue")
+                           for i in range(1, rows + 1))
+        db.session.commit()
+    return app
+
+
+def timed(convert, rounds):
+    """返回 (查询+转换中位数ms, 仅转换中位数ms, 结果)"""
+    totals, converts = [], []
+    data = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        rows = db.session.execute(SQL).fetchall()
+        fetched = time.perf_counter()
+        data = convert(rows)
+        finished = time.perf_counter()
+        totals.append((finished - started) * 1000)
+        converts.append((finished - fetched) * 1000)
+    return statistics.median(totals), statistics.median(converts), data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    app = build_app(args.rows)
+    with app.app_context():
+        baseline = timed(lambda rows: model_to_dict(rows, Feature), args.rounds)
+        current = timed(lambda rows: rows_to_dicts(rows, Feature), args.rounds)
+    assert baseline[2] == current[2], "两种实现的结果不一致"
+
+    print(f"get_all_feature 查询，{args.rows} 行，{args.rounds} 轮")
+    print(f"{'实现':<16}{'查询+转换(ms)':>14}{'仅转换(ms)':>12}")
+    for name, (total, convert, _) in (("model_to_dict", baseline), ("rows_to_dicts", current)):
+        print(f"{name:<16}{total:>14.2f}{convert:>12.2f}")
+    print(f"转换加速: {baseline[1] / current[1]:.1f}x，整体加速: {baseline[0] / current[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
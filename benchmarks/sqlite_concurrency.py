@@ -0,0 +1,141 @@
+"""
+SQLite并发写入基准
+对比默认引擎（回滚日志、延迟事务）和 sqlite_tuning 中的配置（WAL、busy_timeout、BEGIN IMMEDIATE写引擎）。
+写线程执行“先读后写”的事务（与日志写入、统计更新的模式相同），读线程持续查询，
+统计每秒提交的写事务数和"database is locked"错误率。
+默认引擎分两组：pysqlite默认的事务方式（读不在事务内），以及读写都在同一个延迟事务内。
+
+运行：python -m benchmarks.sqlite_concurrency [--writers 8] [--readers 4] [--seconds 5]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from flask import Flask
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.config import Config
+from app.util.db_engine import engine_options
+from app.util.sqlite_tuning import apply_sqlite_profile, get_write_engine, _write_engine
+
+CREATE = "create table if not exists bench_log (id integer primary key, feature_id integer, value integer)"
+SELECT = text("select count(*) from bench_log where feature_id = :feature_id")
+INSERT = text("insert into bench_log (feature_id, value) values (:feature_id, :value)")
+
+
+def _writer(engine, feature_id, stop, counters):
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                count = conn.execute(SELECT, {"feature_id": feature_id}).scalar()
+                conn.execute(INSERT, {"feature_id": feature_id, "value": count})
+            counters["commits"] += 1
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            counters["locked"] += 1
+
+
+def _reader(engine, stop, counters):
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(SELECT, {"feature_id": 1}).scalar()
+            counters["reads"] += 1
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            counters["read_locked"] += 1
+
+
+def run(write_engine, read_engine, writers, readers, seconds):
+    with write_engine.begin() as conn:
+        conn.exec_driver_sql(CREATE)
+    stop = threading.Event()
+    counters = [dict(commits=0, locked=0, reads=0, read_locked=0) for _ in range(writers + readers)]
+    threads = [threading.Thread(target=_writer, args=(write_engine, i % 4 + 1, stop, counters[i]))
+               for i in range(writers)]
+    threads += [threading.Thread(target=_reader, args=(read_engine, stop, counters[writers + i]))
+                for i in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {key: sum(c[key] for c in counters) for key in counters[0]}, elapsed
+
+
+def bare(path, args):
+    """默认引擎：create_engine 的默认参数，回滚日志，pysqlite的延迟事务"""
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        return run(engine, engine, args.writers, args.readers, args.seconds)
+    finally:
+        engine.dispose()
+
+
+def bare_deferred(path, args):
+    """
+    默认引擎，但读操作也在事务内（显式 BEGIN，即延迟事务）
+    pysqlite默认只在写语句前开始事务，先读后写的读不受事务保护；读写都放进同一事务后，
+    两个写线程同时从读锁升级为写锁会直接返回"database is locked"，不等待busy_timeout
+    """
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_deferred(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    try:
+        return run(engine, engine, args.writers, args.readers, args.seconds)
+    finally:
+        engine.dispose()
+
+
+def profiled(path, args):
+    """应用的配置：engine_options + apply_sqlite_profile，写线程使用 get_write_engine"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{path}"
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    db.init_app(app)
+    apply_sqlite_profile(app)
+    with app.app_context():
+        try:
+            return run(get_write_engine(), db.engine, args.writers, args.readers, args.seconds)
+        finally:
+            get_write_engine().dispose()
+            _write_engine["engine"] = None
+            db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.writers} 个写线程（先读后写），{args.readers} 个读线程，每组 {args.seconds:g} 秒")
+    print(f"{'配置':<10}{'提交/秒':>10}{'锁错误':>10}{'锁错误率':>10}{'读/秒':>10}{'读锁错误':>10}")
+    for name, runner in (("默认引擎", bare), ("默认+BEGIN", bare_deferred), ("调优配置", profiled)):
+        with tempfile.TemporaryDirectory() as tmp:
+            counts, elapsed = runner(os.path.join(tmp, "bench.db"), args)
+        attempts = counts["commits"] + counts["locked"]
+        rate = counts["locked"] / attempts if attempts else 0
+        print(f"{name:<10}{counts['commits'] / elapsed:>10.0f}{counts['locked']:>10}{rate:>10.1%}"
+              f"{counts['reads'] / elapsed:>10.0f}{counts['read_locked']:>10}")
+
+
+if __name__ == "__main__":
+    main()
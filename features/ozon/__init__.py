@@ -2,6 +2,7 @@ __meta__ = {
     "name": "OZON库存同步",
     "description": "执行OZON库存同步",
     "customer": "GREY.ECHO.UNIT",
+    "execution_mode": "process",  # 数据处理占用CPU，在独立进程中执行
     "configs": {
         "ME3_url": (None, "ME3网店库存获取地址"),
         "ME3_app_key": (None, "ME3分配的授权key"),
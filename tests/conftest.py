@@ -0,0 +1,56 @@
+"""
+测试公共夹具
+只初始化数据库，不启动调度器、进程池等后台线程。默认使用内存SQLite，
+设置 TEST_DATABASE_URL 可在其他数据库（如PostgreSQL）上运行同一组测试。
+"""
+
+import os
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from app import db
+from app.config import Test_config
+from app.models import base_models, user_models  # noqa: F401 注册模型
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.from_object(Test_config)
+    if TEST_DATABASE_URL:
+        app.config['SQLALCHEMY_DATABASE_URI'] = TEST_DATABASE_URL
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+    else:
+        # 所有连接共用同一个内存数据库
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False}
+        }
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def sqlite_only(app):
+    if db.engine.dialect.name != "sqlite":
+        pytest.skip("仅适用于SQLite")
+
+
+@pytest.fixture
+def fts(app, sqlite_only):
+    """启用日志明细全文索引"""
+    from app.util import log_fts
+    assert log_fts.ensure_fts_index()
+    yield
+    log_fts._state.update(enabled=False, tokenizer=None)
+    with db.engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {log_fts.FTS_TABLE}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {log_fts.STATE_TABLE}"))
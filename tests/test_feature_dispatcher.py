@@ -0,0 +1,98 @@
+import threading
+import pytest
+from app.util.feature_dispatcher import FeatureDispatcher
+from app.util.feature_executor import FeatureExecutor
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = FeatureDispatcher()
+    dispatcher.pools = {
+        "high": FeatureExecutor("test-high", max_workers=2, queue_size=4),
+        "normal": FeatureExecutor("test-normal", max_workers=2, queue_size=4),
+        "low": FeatureExecutor("test-low", max_workers=2, queue_size=4),
+    }
+    return dispatcher
+
+
+def _blocking(release, started=None):
+    def run(feature_run):
+        if started is not None:
+            started.set()
+        release.wait(5)
+    return run
+
+
+def test_queue_policy_is_bounded_by_pool_queue_size(dispatcher):
+    release = threading.Event()
+    started = threading.Event()
+    accepted, _, data = dispatcher.submit(1, _blocking(release, started), max_concurrency=1, policy="queue")
+    assert accepted
+    assert started.wait(5)
+
+    queued = []
+    for _ in range(4):
+        accepted, _, queued_data = dispatcher.submit(1, _blocking(release), max_concurrency=1, policy="queue")
+        assert accepted
+        queued.append(queued_data["run"])
+
+    accepted, msg, rejected = dispatcher.submit(1, _blocking(release), max_concurrency=1, policy="queue")
+    assert not accepted
+    assert "队列已满" in msg
+    assert rejected["waiting"] == 4
+    assert dispatcher.stats()["rejected"] == 1
+
+    release.set()
+    for run in [data["run"]] + queued:
+        assert run.wait(5)
+        assert run.state == "finished"
+    assert dispatcher.stats()["waiting"] == 0
+    assert dispatcher.stats()["running_features"] == {}
+
+
+def test_queued_runs_respect_max_concurrency(dispatcher):
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def run(feature_run):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+
+    runs = [dispatcher.submit(2, run, max_concurrency=1, policy="queue")[2]["run"] for _ in range(5)]
+    for feature_run in runs:
+        assert feature_run.wait(5)
+    assert peak[0] == 1
+
+
+def test_cancel_previous_drops_waiting_runs(dispatcher):
+    release = threading.Event()
+    started = threading.Event()
+    first = dispatcher.submit(3, _blocking(release, started), max_concurrency=1, policy="queue")[2]["run"]
+    assert started.wait(5)
+    waiting = dispatcher.submit(3, _blocking(release), max_concurrency=1, policy="queue")[2]["run"]
+
+    accepted, _, data = dispatcher.submit(3, _blocking(release), max_concurrency=1, policy="cancel_previous")
+
+    assert accepted
+    assert first.cancelled
+    assert waiting.state == "cancelled"
+    release.set()
+    assert data["run"].wait(5)
+    assert data["run"].state == "finished"
+
+
+def test_skip_policy(dispatcher):
+    release = threading.Event()
+    started = threading.Event()
+    dispatcher.submit(4, _blocking(release, started), max_concurrency=1, policy="skip")
+    assert started.wait(5)
+
+    accepted, _, _ = dispatcher.submit(4, _blocking(release), max_concurrency=1, policy="skip")
+
+    assert not accepted
+    release.set()
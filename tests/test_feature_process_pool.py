@@ -0,0 +1,151 @@
+import threading
+import time
+import pytest
+from app.util.feature_dispatcher import FeatureCancelled
+from app.util.feature_module_cache import FeatureModuleCache
+from app.util.feature_process_pool import FeatureProcessError, FeatureProcessPool
+
+FEATURE_SOURCE = '''
+import some_heavy_dependency_that_is_not_installed
+
+__meta__ = {
+    "name": "heavy",
+    "execution_mode": "process",
+    "configs": {"days": ("3", "天数")}
+}
+'''
+
+HANGING_SOURCE = '''
+import time
+
+def run(config, ctx):
+    ctx.log("started")
+    time.sleep(60)
+    return True, "done", None
+'''
+
+QUICK_SOURCE = '''
+def run(config, ctx):
+    ctx.log("hello " + config["name"])
+    return True, "ok", {"pid_is_child": True}
+'''
+
+
+class FakeContext:
+    client_id = "client-1"
+    request_id = "req-1"
+    feature_id = 1
+    feature_name = "test"
+    execution_type = "scheduled"
+    is_scheduled_task = True
+
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.logs = []
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def log(self, message, level="info", send_ws=True):
+        self.logs.append(message)
+
+
+@pytest.fixture
+def pool():
+    pool = FeatureProcessPool(size=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_read_meta_does_not_import_module(tmp_path):
+    script = tmp_path / "heavy.py"
+    script.write_text(FEATURE_SOURCE)
+
+    meta = FeatureModuleCache().read_meta(str(script))
+
+    assert meta["execution_mode"] == "process"
+    assert meta["configs"]["days"] == ("3", "天数")
+
+
+def test_read_meta_returns_none_for_computed_meta(tmp_path):
+    script = tmp_path / "computed.py"
+    script.write_text("__meta__ = dict(name='computed')\n")
+
+    assert FeatureModuleCache().read_meta(str(script)) is None
+
+
+def test_read_meta_returns_none_for_imported_meta(tmp_path):
+    script = tmp_path / "imported.py"
+    script.write_text("from meta_defs import __meta__\n")
+
+    assert FeatureModuleCache().read_meta(str(script)) is None
+
+
+def test_read_meta_returns_empty_without_meta(tmp_path):
+    script = tmp_path / "plain.py"
+    script.write_text("def run(config, ctx):\n    return True, 'ok', None\n")
+
+    assert FeatureModuleCache().read_meta(str(script)) == {}
+
+
+def test_scan_does_not_import_process_feature(tmp_path):
+    import sys
+    from app.services.feature_register_service import load_feature_meta
+    package = tmp_path / "heavy_feature"
+    package.mkdir()
+    (package / "__init__.py").write_text(FEATURE_SOURCE)
+
+    meta = load_feature_meta(str(package))
+
+    assert meta["name"] == "heavy"
+    assert FeatureModuleCache.module_name_for(FeatureModuleCache.resolve_path(str(package))) not in sys.modules
+    assert "some_heavy_dependency_that_is_not_installed" not in sys.modules
+
+
+def test_scan_imports_module_for_computed_meta(tmp_path):
+    from app.services.feature_register_service import load_feature_meta
+    script = tmp_path / "computed_feature.py"
+    script.write_text("__meta__ = dict(name='computed')\n")
+
+    assert load_feature_meta(str(script)) == {"name": "computed"}
+
+
+def test_run_returns_result(pool, tmp_path):
+    script = tmp_path / "quick.py"
+    script.write_text(QUICK_SOURCE)
+    ctx = FakeContext()
+
+    assert pool.run(str(script), {"name": "world"}, ctx) == (True, "ok", {"pid_is_child": True})
+    assert ctx.logs == ["hello world"]
+
+
+def test_cancel_kills_hung_worker(pool, tmp_path):
+    script = tmp_path / "hanging.py"
+    script.write_text(HANGING_SOURCE)
+    ctx = FakeContext()
+    threading.Timer(0.5, ctx.cancel_event.set).start()
+
+    started = time.monotonic()
+    with pytest.raises(FeatureCancelled):
+        pool.run(str(script), {}, ctx)
+
+    assert time.monotonic() - started < 5
+    assert pool.stats()["cancelled"] == 1
+    assert pool.stats()["restarts"] == 1
+    # 替换后的工作进程可以继续执行
+    quick = tmp_path / "quick.py"
+    quick.write_text(QUICK_SOURCE)
+    assert pool.run(str(quick), {"name": "again"}, FakeContext())[0] is True
+
+
+def test_timeout_kills_hung_worker(pool, tmp_path):
+    script = tmp_path / "hanging.py"
+    script.write_text(HANGING_SOURCE)
+    pool.timeout = 0.5
+
+    with pytest.raises(FeatureProcessError, match="超时"):
+        pool.run(str(script), {}, FakeContext())
+
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["idle"] == 1
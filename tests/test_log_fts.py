@@ -0,0 +1,126 @@
+from datetime import datetime
+from sqlalchemy import insert, text
+from app import db
+from app.models.base_models import FeatureExecutionLog, FeatureExecutionLogDetail
+from app.util.log_fts import FTS_TABLE, delete_details_index, index_new_details
+
+
+def write_details(log_id, messages):
+    """按批量写入器的方式插入明细并建立索引"""
+    rows = [{"log_id": log_id, "timestamp": datetime.now(), "level": "INFO", "message": m,
+             "request_id": f"req-{log_id}", "created_date": datetime.now(), "updated_date": datetime.now()}
+            for m in messages]
+    with db.engine.begin() as conn:
+        conn.execute(insert(FeatureExecutionLogDetail.__table__), rows)
+        index_new_details(conn)
+
+
+def match(keyword):
+    return db.session.execute(
+        text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q ORDER BY rowid"), {"q": keyword}
+    ).scalars().all()
+
+
+def integrity_check():
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES('integrity-check', 1)"))
+
+
+def test_details_written_after_rebuild_are_indexed(fts):
+    write_details(1, ["sku ABC123 synced"])
+    write_details(2, ["order XYZ789 failed", "sku ABC123 retried"])
+
+    assert len(match('"ABC123"')) == 2
+    assert len(match('"XYZ789"')) == 1
+    integrity_check()
+
+
+def test_index_new_details_does_not_reindex(fts):
+    write_details(1, ["sku ABC123 synced"])
+    with db.engine.begin() as conn:
+        index_new_details(conn)
+
+    assert len(match('"ABC123"')) == 1
+    integrity_check()
+
+
+def test_delete_details_index(fts):
+    write_details(1, ["sku ABC123 synced"])
+    write_details(2, ["sku ABC123 retried"])
+
+    assert delete_details_index(db.session, [1])
+    FeatureExecutionLogDetail.query.filter_by(log_id=1).delete()
+    db.session.commit()
+
+    remaining = FeatureExecutionLogDetail.query.filter_by(log_id=2).one()
+    assert match('"ABC123"') == [remaining.id]
+    integrity_check()
+
+
+def test_delete_skips_unindexed_details(fts):
+    # 绕过写入器插入、尚未建立索引的明细
+    db.session.add(FeatureExecutionLogDetail(log_id=3, message="sku ABC123 pending", request_id="req-3"))
+    db.session.commit()
+
+    assert delete_details_index(db.session, [3])
+    FeatureExecutionLogDetail.query.filter_by(log_id=3).delete()
+    db.session.commit()
+    integrity_check()
+
+
+def test_del_log_removes_index(fts):
+    from app.services.log_service import del_log
+    db.session.add(FeatureExecutionLog(id=1, feature_id=1, request_id="req-1", status="成功"))
+    db.session.commit()
+    write_details(1, ["sku ABC123 synced"])
+
+    status, msg = del_log(1)
+
+    assert status, msg
+    assert match('"ABC123"') == []
+    integrity_check()
+
+
+def test_details_written_after_deleting_newest_are_indexed(fts):
+    from app.services.log_service import del_log
+    db.session.add(FeatureExecutionLog(id=2, feature_id=1, request_id="req-2", status="成功"))
+    db.session.commit()
+    write_details(1, ["sku ABC123 synced"])
+    write_details(2, ["order XYZ789 failed", "order XYZ789 retried"])
+    newest = db.session.execute(text("SELECT MAX(id) FROM feature_execution_log_detail")).scalar()
+
+    status, msg = del_log(2)
+    assert status, msg
+    write_details(1, ["zzzunique appended"])
+
+    appended = match('"zzzunique"')
+    assert len(appended) == 1 and appended[0] > newest
+    assert delete_details_index(db.session, [1])
+    FeatureExecutionLogDetail.query.filter_by(log_id=1).delete()
+    db.session.commit()
+    assert match('"zzzunique"') == []
+    integrity_check()
+
+
+def test_upgrade_autoincrement_keeps_ids(fts):
+    from app.util.db_migration import upgrade_autoincrement
+    with db.engine.begin() as conn:
+        # 模拟旧版本创建的明细表
+        conn.execute(text("DROP TABLE feature_execution_log_detail"))
+        conn.execute(text(
+            "CREATE TABLE feature_execution_log_detail (id INTEGER NOT NULL PRIMARY KEY, created_date DATETIME, "
+            "updated_date DATETIME, log_id INTEGER NOT NULL, timestamp DATETIME NOT NULL, level VARCHAR(16), "
+            "message TEXT, request_id VARCHAR(64) NOT NULL)"))
+        conn.execute(text("CREATE INDEX ix_feature_execution_log_detail_log_time "
+                          "ON feature_execution_log_detail (log_id, timestamp)"))
+    write_details(1, ["sku ABC123 synced", "sku ABC123 retried"])
+    ids = match('"ABC123"')
+
+    assert upgrade_autoincrement() == ["feature_execution_log_detail"]
+    assert upgrade_autoincrement() == []
+
+    assert [d.id for d in FeatureExecutionLogDetail.query.order_by(FeatureExecutionLogDetail.id)] == ids
+    assert match('"ABC123"') == ids
+    sql = db.session.execute(text(
+        "SELECT sql FROM sqlite_master WHERE name = 'feature_execution_log_detail'")).scalar()
+    assert "AUTOINCREMENT" in sql.upper()
+    integrity_check()
@@ -0,0 +1,44 @@
+from sqlalchemy import text
+from app import db
+from app.models.base_models import FeatureExecutionLog, FeatureExecutionLogDetail
+from app.services.log_retention_service import _delete_runs
+from app.util.log_fts import STATE_TABLE
+from tests.test_log_fts import integrity_check, match, write_details
+
+
+def _add_log(log_id):
+    db.session.add(FeatureExecutionLog(id=log_id, feature_id=1, request_id=f"req-{log_id}", status="成功"))
+    db.session.commit()
+
+
+def test_delete_runs_removes_details_and_index(fts):
+    _add_log(1)
+    _add_log(2)
+    write_details(1, ["sku ABC123 synced"])
+    write_details(2, ["sku ABC123 retried"])
+
+    _delete_runs([1])
+
+    assert FeatureExecutionLog.query.count() == 1
+    assert FeatureExecutionLogDetail.query.filter_by(log_id=1).count() == 0
+    assert len(match('"ABC123"')) == 1
+    integrity_check()
+
+
+def test_delete_runs_rebuilds_inconsistent_index(fts):
+    _add_log(1)
+    _add_log(2)
+    # 未建立索引却被记录为已索引的明细，删除索引时SQLite报告索引损坏
+    for log_id in (1, 2):
+        db.session.add(FeatureExecutionLogDetail(log_id=log_id, message="sku ABC123 pending",
+                                                 request_id=f"req-{log_id}"))
+    db.session.commit()
+    db.session.execute(text(f"UPDATE {STATE_TABLE} SET last_id = (SELECT MAX(id) FROM feature_execution_log_detail)"))
+    db.session.commit()
+
+    _delete_runs([1])
+
+    assert FeatureExecutionLog.query.count() == 1
+    remaining = FeatureExecutionLogDetail.query.one()
+    assert match('"ABC123"') == [remaining.id]
+    integrity_check()
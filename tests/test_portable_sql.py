@@ -0,0 +1,82 @@
+"""
+服务层原生SQL的可移植性测试
+默认在内存SQLite上运行；设置 TEST_DATABASE_URL 后在PostgreSQL上运行同一组测试，例如：
+    TEST_DATABASE_URL=postgresql+psycopg2://postgres@127.0.0.1:5432/fcc_test python -m pytest tests
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models.base_models import Category, Config, Customer, Feature, FeatureExecutionLog, FeatureExecutionStat
+from app.services import category_service, config_service, feature_service, log_service, stats_service
+
+
+@pytest.fixture
+def data(app):
+    customers = [Customer(id=1, name="天能"), Customer(id=2, name="其他客户")]
+    categories = [Category(id=1, name="订单", parent_id=0, customer_id=1, depth_level=0),
+                  Category(id=2, name="同步", parent_id=1, customer_id=1, depth_level=1)]
+    features = [Feature(id=1, name="同步订单", customer_id=1, category_id=2, priority="high", max_concurrency=1),
+                Feature(id=2, name="导出报表", customer_id=2, category_id=2)]
+    configs = [Config(name="appid", value="", default_value="114514", description="应用ID", feature_id=1),
+               Config(name="log_retention_days", value="30", description="系统配置", feature_id=0)]
+    db.session.add_all(customers + categories + features + configs)
+    db.session.commit()
+
+
+def test_feature_queries(data):
+    _, _, features = feature_service.get_all_feature()
+    assert [(f["id"], f["customer_name"], f["priority"]) for f in features] == [(1, "天能", "high"), (2, "其他客户", None)]
+
+    _, _, features = feature_service.get_feature_by_customer_id(1)
+    assert [f["name"] for f in features] == ["同步订单"]
+
+    _, _, features = feature_service.get_feature_by_category_id(2, 2)
+    assert [f["name"] for f in features] == ["导出报表"]
+
+
+def test_config_queries(data):
+    _, _, configs = config_service.get_all_config()
+    assert {(c["name"], c["feature_name"]) for c in configs} == {("appid", "同步订单"), ("log_retention_days", None)}
+
+    _, _, configs = config_service.get_filtered_config(feature_name="订单", config_name="APP")
+    assert [c["name"] for c in configs] == ["appid"]
+
+    _, _, configs = config_service.get_filtered_config(feature_id=0)
+    assert [c["name"] for c in configs] == ["log_retention_days"]
+
+    _, _, configs = config_service.get_config_by_feature_id(1)
+    assert configs[0]["default_value"] == "114514"
+
+
+def test_category_tree(data):
+    _, _, tree = category_service.get_category_by_customer_id()
+
+    assert [c["name"] for c in tree] == ["订单"]
+    assert [c["name"] for c in tree[0]["child"]] == ["同步"]
+
+
+def test_log_listing_with_cursor(data):
+    start = datetime(2026, 1, 1, 8, 0)
+    db.session.add_all([FeatureExecutionLog(feature_id=1 + i % 2, request_id=f"req-{i}", status="成功",
+                                            start_time=start + timedelta(minutes=i), execution_type="manual")
+                        for i in range(5)])
+    db.session.commit()
+
+    _, _, first = log_service.query_logs(page_size=2, total_mode="exact")
+    _, _, second = log_service.query_logs(page_size=2, cursor=first["next_cursor"])
+    _, _, by_customer = log_service.query_logs_by_customer_id(1, keyword="REQ")
+
+    assert first["total"] == 5
+    assert [log["request_id"] for log in first["items"] + second["items"]] == ["req-4", "req-3", "req-2", "req-1"]
+    assert [log["request_id"] for log in by_customer["items"]] == ["req-4", "req-2", "req-0"]
+
+
+def test_stats_upsert(data):
+    start = datetime(2026, 1, 1, 8, 30)
+    for status, seconds in (("成功", 1), ("失败", 3)):
+        stats_service.record_execution(1, 1, status, start, start + timedelta(seconds=seconds))
+    db.session.commit()
+
+    hour = FeatureExecutionStat.query.filter_by(granularity="hour").one()
+    assert (hour.run_count, hour.success_count, hour.failure_count, hour.max_duration_ms) == (2, 1, 1, 3000)
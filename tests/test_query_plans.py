@@ -0,0 +1,145 @@
+"""
+热点查询的执行计划回归测试
+在SQLite上捕获服务层实际执行的SQL，通过 EXPLAIN QUERY PLAN 确认使用了为其建立的索引
+"""
+
+import contextlib
+import re
+from datetime import datetime
+import pytest
+from sqlalchemy import event, text
+from app import db
+from app.models.base_models import FeatureExecutionLog
+
+# 全表扫描：SCAN <表或别名> 之后没有 USING INDEX / USING COVERING INDEX
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(?!.* USING (COVERING )?INDEX )")
+from app.services import config_service, feature_service, log_service, scheduled_task_service, user_service
+
+
+@pytest.fixture(autouse=True)
+def _sqlite(sqlite_only):
+    pass
+
+
+@contextlib.contextmanager
+def captured_queries(table):
+    """捕获执行的、涉及指定表的SELECT语句"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and table in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plans(statements):
+    with db.engine.connect() as conn:
+        return [" | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+                for statement, parameters in statements]
+
+
+def assert_uses_index(call, table, index):
+    """所有捕获的语句中至少一条使用了指定索引，且没有任何语句全表扫描"""
+    with captured_queries(table) as statements:
+        call()
+    assert statements, f"没有捕获到查询 {table} 的语句"
+    plans = query_plans(statements)
+    assert any(index in plan for plan in plans), plans
+    full_scans = [line for plan in plans for line in plan.split(" | ") if FULL_SCAN.match(line)]
+    assert not full_scans, plans
+    return plans
+
+
+def test_log_list_uses_start_time_index(app):
+    plans = assert_uses_index(lambda: log_service.query_logs(), "feature_execution_log",
+                              "ix_feature_execution_log_start_time_id")
+    assert all("TEMP B-TREE" not in plan for plan in plans), plans
+
+
+def test_log_list_next_page_uses_start_time_index(app):
+    cursor = log_service._encode_cursor(datetime(2026, 1, 1), 100)
+    assert_uses_index(lambda: log_service.query_logs(cursor=cursor), "feature_execution_log",
+                      "ix_feature_execution_log_start_time_id")
+
+
+def test_log_list_by_feature_uses_feature_index(app):
+    plans = assert_uses_index(lambda: log_service.query_logs(feature_id=1), "feature_execution_log",
+                              "ix_feature_execution_log_feature_start")
+    assert all("TEMP B-TREE" not in plan for plan in plans), plans
+
+
+def test_log_list_by_type_uses_type_index(app):
+    assert_uses_index(lambda: log_service.query_logs(execution_type="scheduled"), "feature_execution_log",
+                      "ix_feature_execution_log_type_start")
+
+
+def test_log_details_use_log_time_index(app):
+    db.session.add(FeatureExecutionLog(id=1, feature_id=1, request_id="req-1"))
+    db.session.commit()
+    plans = assert_uses_index(lambda: log_service.get_log_details(1), "feature_execution_log_detail",
+                              "ix_feature_execution_log_detail_log_time")
+    assert all("TEMP B-TREE" not in plan for plan in plans), plans
+
+
+def test_config_by_feature_uses_feature_index(app):
+    assert_uses_index(lambda: config_service.get_config_by_feature_id(1), "base_config", "ix_base_config_feature_id")
+
+
+def test_features_by_category_use_category_customer_index(app):
+    assert_uses_index(lambda: feature_service.get_feature_by_category_id(1, 2), "base_feature",
+                      "ix_base_feature_category_customer")
+
+
+def test_features_by_customer_use_customer_index(app):
+    assert_uses_index(lambda: feature_service.get_feature_by_customer_id(1), "base_feature",
+                      "ix_base_feature_customer_id")
+
+
+def test_user_customer_check_uses_association_index(app):
+    assert_uses_index(lambda: user_service.is_user_associated_with_customer(1, 2), "base_user_customer",
+                      "ix_base_user_customer_user_customer")
+
+
+def test_active_scheduled_tasks_use_active_index(app):
+    assert_uses_index(scheduled_task_service.get_active_scheduled_tasks, "scheduled_task",
+                      "ix_scheduled_task_is_active")
+
+
+def test_log_list_by_customer_uses_feature_customer_index(app):
+    # 客户条件在功能表上，没有同时覆盖客户和开始时间的索引，只排序该客户的日志
+    assert_uses_index(lambda: log_service.query_logs(customer_id=1), "feature_execution_log",
+                      "ix_base_feature_customer_id")
+
+
+def test_log_list_by_customer_with_total_uses_indexes(app):
+    assert_uses_index(lambda: log_service.query_logs(customer_id=1, total_mode='exact'), "feature_execution_log",
+                      "ix_base_feature_customer_id")
+
+
+def test_scheduled_tasks_by_customer_use_feature_index(app):
+    assert_uses_index(lambda: scheduled_task_service.get_scheduled_tasks_by_customer_id(1), "scheduled_task",
+                      "ix_scheduled_task_feature_id")
+
+
+def test_full_scan_pattern():
+    assert FULL_SCAN.match("SCAN feature_execution_log")
+    assert FULL_SCAN.match("SCAN ft")
+    assert FULL_SCAN.match("SCAN feature_execution_log USING INTEGER PRIMARY KEY")
+    assert not FULL_SCAN.match("SCAN feature_execution_log USING INDEX ix_feature_execution_log_start_time_id")
+    assert not FULL_SCAN.match("SCAN base_feature USING COVERING INDEX ix_base_feature_customer_id")
+    assert not FULL_SCAN.match("SEARCH base_feature USING INTEGER PRIMARY KEY (rowid=?)")
+    assert not FULL_SCAN.match("SCAN CONSTANT ROW")
+
+
+def test_full_scan_in_any_statement_fails(app):
+    def call():
+        log_service.query_logs(feature_id=1)
+        db.session.execute(text("SELECT count(*) FROM feature_execution_log WHERE status = 'x'")).scalar()
+
+    with pytest.raises(AssertionError):
+        assert_uses_index(call, "feature_execution_log", "ix_feature_execution_log_feature_start")
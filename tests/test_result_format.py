@@ -0,0 +1,54 @@
+import json
+import pytest
+from flask import Flask, jsonify
+from app.middlewares import global_result_format
+from app.util.json_provider import FastJSONProvider
+from app.util.result import Result
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    global_result_format(app)
+
+    @app.route("/api/raw")
+    def raw():
+        return jsonify({"message": 'log line "data":null here', "data": None, "items": [1, 2]})
+
+    @app.route("/api/text")
+    def plain_text():
+        return '"data":null', 404
+
+    @app.route("/api/result")
+    def result():
+        return Result.success({"message": '"data":null'})
+
+    return app.test_client()
+
+
+def test_wraps_json_body_structurally(client):
+    response = client.get("/api/raw")
+
+    assert response.status_code == 200
+    assert json.loads(response.data) == {
+        "status": True,
+        "code": 200,
+        "data": {"message": 'log line "data":null here', "data": None, "items": [1, 2]},
+        "message": "请求成功"
+    }
+
+
+def test_wraps_text_body(client):
+    body = json.loads(client.get("/api/text").data)
+
+    assert body["status"] is False
+    assert body["code"] == 404
+    assert body["data"] == '"data":null'
+
+
+def test_result_response_is_not_rewrapped(client):
+    body = json.loads(client.get("/api/result").data)
+
+    assert body["data"] == {"message": '"data":null'}
+    assert body["status"] is True
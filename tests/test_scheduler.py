@@ -0,0 +1,86 @@
+import time
+from datetime import datetime
+import pytest
+from app.scheduler import SCHEDULED_TASK_JOB_PREFIX, TaskScheduler
+
+JOB_ID = f"{SCHEDULED_TASK_JOB_PREFIX}1"
+
+
+@pytest.fixture
+def schedulers(app):
+    """共用同一个任务存储的多个调度实例，启动后处于暂停状态"""
+    created = []
+
+    def make():
+        scheduler = TaskScheduler()
+        scheduler.init_app(app)
+        scheduler.scheduler.start(paused=True)
+        created.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in created:
+        scheduler.scheduler.shutdown(wait=False)
+
+
+def task(cron_expression):
+    return {"id": 1, "feature_id": 1, "name": "同步", "cron_expression": cron_expression, "is_active": True}
+
+
+def fire_now(scheduler):
+    """将任务的下次执行时间改为当前时间，由调度实例立即触发"""
+    scheduler.scheduler.modify_job(JOB_ID, next_run_time=datetime.now().astimezone())
+
+
+def wait_next_run_time(scheduler, previous=None, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        next_run_time = scheduler.get_run_times().get(1, {}).get("next_run_time")
+        if next_run_time is not None and next_run_time != previous:
+            return next_run_time
+        time.sleep(0.05)
+    raise AssertionError("调度实例未更新下次执行时间")
+
+
+def test_next_run_time_comes_from_jobstore(schedulers):
+    leader, follower = schedulers(), schedulers()
+    # 任务由其他实例添加，调度实例没有记录它的触发器
+    follower.add_job(task("0 0 1 1 *"))
+    fire_now(follower)
+    leader.resume()
+
+    next_run_time = wait_next_run_time(leader)
+    assert next_run_time.month == 1 and next_run_time.day == 1 and next_run_time > datetime.now()
+
+    # 其他实例修改了cron表达式
+    follower.update_job(task("0 0 1 6 *"))
+    fire_now(follower)
+    leader.wakeup()
+
+    next_run_time = wait_next_run_time(leader, previous=next_run_time)
+    assert next_run_time.month == 6 and next_run_time.day == 1
+
+
+def test_leader_tracks_jobs_changed_by_other_instance(schedulers):
+    leader, follower = schedulers(), schedulers()
+    leader.resume()
+
+    # 调度实例运行期间，其他实例添加任务
+    follower.add_job(task("* * * * *"))
+    assert leader.stats()["job_count"] == 0
+    leader.wakeup()
+
+    assert leader.stats()["job_count"] == 1
+    assert leader._expected_run_times[JOB_ID] == leader.scheduler.get_job(JOB_ID).next_run_time
+    assert leader.dispatch_histogram(minutes=10)["planned"]["total"] >= 9
+
+    # 其他实例修改cron表达式
+    follower.update_job(task("0 0 1 6 *"))
+    leader.wakeup()
+    assert leader.dispatch_histogram(minutes=10)["planned"]["total"] == 0
+    assert leader._expected_run_times[JOB_ID].month == 6
+
+    # 其他实例禁用任务
+    follower.update_job({**task("0 0 1 6 *"), "is_active": False})
+    leader.wakeup()
+    assert leader.stats()["job_count"] == 0
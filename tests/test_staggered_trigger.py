@@ -0,0 +1,74 @@
+import pickle
+from datetime import datetime, timedelta
+from app.scheduler import SCHEDULED_TASK_JOB_PREFIX, TaskScheduler
+from app.util.staggered_trigger import StaggeredCronTrigger, stagger_offset
+
+NOW = datetime(2026, 1, 1, 12, 0, 0).astimezone()
+
+
+def _trigger(task_id=7, offset=0, jitter=30):
+    return StaggeredCronTrigger.from_crontab('*/5 * * * *', offset=offset, jitter=jitter, seed=task_id)
+
+
+def test_jitter_is_stable_for_the_same_fire_time():
+    trigger = _trigger()
+    first = trigger.get_next_fire_time(None, NOW)
+
+    assert all(trigger.get_next_fire_time(None, NOW) == first for _ in range(20))
+    assert NOW <= first < NOW + timedelta(seconds=30)
+
+
+def test_jitter_differs_between_tasks():
+    fire_times = {_trigger(task_id).get_next_fire_time(None, NOW) for task_id in range(1, 21)}
+
+    assert len(fire_times) > 1
+
+
+def test_offset_and_jitter():
+    trigger = _trigger(offset=stagger_offset(7, 120))
+    fire_time = trigger.get_next_fire_time(None, NOW)
+    offset = timedelta(seconds=trigger.offset)
+
+    assert NOW + offset <= fire_time < NOW + offset + timedelta(seconds=30)
+    following = trigger.get_next_fire_time(fire_time, fire_time)
+    assert timedelta(minutes=5) - timedelta(seconds=30) < following - fire_time < timedelta(minutes=5, seconds=30)
+
+
+def test_pickle_round_trip():
+    trigger = _trigger(offset=42)
+    restored = pickle.loads(pickle.dumps(trigger))
+
+    assert (restored.offset, restored.seed, restored.jitter) == (42, 7, 30)
+    assert str(restored) == str(trigger)
+    assert restored.get_next_fire_time(None, NOW) == trigger.get_next_fire_time(None, NOW)
+
+
+def test_coalesced_count_with_jitter():
+    scheduler = TaskScheduler()
+    job_id = f"{SCHEDULED_TASK_JOB_PREFIX}7"
+    trigger = _trigger(offset=stagger_offset(7, 120))
+    fire_times = [trigger.get_next_fire_time(None, NOW)]
+    for _ in range(3):
+        fire_times.append(trigger.get_next_fire_time(fire_times[-1], fire_times[-1]))
+    scheduler._triggers[job_id] = trigger
+    scheduler._expected_run_times[job_id] = fire_times[0]
+
+    # 前三次触发被合并到第四次执行
+    assert all(scheduler._skipped_run_times(job_id, fire_times[3]) == 3 for _ in range(10))
+
+
+def test_planned_histogram_is_stable(monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return NOW.replace(tzinfo=None)
+
+    monkeypatch.setattr("app.scheduler.datetime", FrozenDatetime)
+    scheduler = TaskScheduler()
+    for task_id in range(1, 11):
+        scheduler._triggers[f"{SCHEDULED_TASK_JOB_PREFIX}{task_id}"] = _trigger(task_id, jitter=60)
+
+    histograms = [scheduler.dispatch_histogram(60)["planned"] for _ in range(3)]
+
+    assert histograms[0]["total"] == 120
+    assert histograms[0] == histograms[1] == histograms[2]
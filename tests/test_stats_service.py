@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.base_models import FeatureExecutionLog, FeatureExecutionStat
+from app.services import stats_service
+from app.services.stats_service import record_execution
+
+START = datetime(2026, 1, 1, 10, 30)
+
+
+def _add_log(status="运行中"):
+    log = FeatureExecutionLog(feature_id=1, request_id="req-1", start_time=START, status=status)
+    db.session.add(log)
+    db.session.commit()
+    return log
+
+
+def test_record_execution_commits_with_log(app):
+    log = _add_log()
+    log.status = "成功"
+    log.end_time = START + timedelta(seconds=2)
+
+    record_execution(1, 5, "成功", START, log.end_time)
+    record_execution(1, 5, "失败", START, log.end_time)
+    db.session.commit()
+
+    stats = {s.granularity: s for s in FeatureExecutionStat.query.all()}
+    assert set(stats) == {"hour", "day"}
+    assert stats["hour"].run_count == 2
+    assert stats["hour"].success_count == 1
+    assert stats["hour"].failure_count == 1
+    assert stats["day"].bucket_start == datetime(2026, 1, 1)
+
+
+def test_stats_failure_does_not_lose_log_status(app, monkeypatch):
+    log = _add_log()
+    log.status = "成功"
+    log.end_time = START + timedelta(seconds=2)
+    apply = stats_service._apply
+    calls = []
+
+    def failing_apply(*args):
+        # 第一个粒度写入成功，第二个粒度失败，整个统计更新都应回滚
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("stats unavailable")
+        apply(*args)
+
+    monkeypatch.setattr(stats_service, "_apply", failing_apply)
+    record_execution(1, 5, "成功", START, log.end_time)
+    db.session.commit()
+    db.session.expire_all()
+
+    assert FeatureExecutionLog.query.one().status == "成功"
+    assert FeatureExecutionStat.query.count() == 0
+
+
+def test_context_finalizes_once(app, monkeypatch, tmp_path):
+    from app.util import feature_execution_context
+    from app.util.feature_execution_context import FeatureExecutionContext
+    monkeypatch.setattr(feature_execution_context, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(feature_execution_context.log_sink, "write", lambda *args: True)
+    monkeypatch.setattr(feature_execution_context.log_sink, "flush", lambda *args: True)
+
+    ctx = FeatureExecutionContext("client-1", feature_name="test", feature_id=1, execution_type="scheduled",
+                                  customer_id=5)
+    # 进程模式下子进程代理的done之后，外层再次结束处理
+    ctx.done("子进程完成")
+    ctx.done("外层完成")
+    ctx.fail("外层失败")
+
+    assert FeatureExecutionLog.query.one().status == "成功"
+    assert FeatureExecutionStat.query.filter_by(granularity="hour").one().run_count == 1
@@ -0,0 +1,49 @@
+from app import db
+from app.models.base_models import Customer
+from app.models.user_models import User, UserCustomer
+from app.services import customer_service, user_service
+
+
+def _user(username, customers=()):
+    user = User(username=username, password_hash="x", role="operator", token_version=0)
+    db.session.add(user)
+    for customer in customers:
+        db.session.add(UserCustomer(user=user, customer=customer))
+    db.session.commit()
+    return user
+
+
+def test_update_user_ignores_token_version(app):
+    user = _user("alice")
+
+    status, msg, _ = user_service.update_user(user.id, token_version=99, password_hash="forged", email="a@example.com")
+
+    assert status, msg
+    db.session.refresh(user)
+    assert user.token_version == 0
+    assert user.password_hash == "x"
+    assert user.email == "a@example.com"
+
+
+def test_update_user_bumps_token_version_on_role_change(app):
+    user = _user("bob")
+
+    user_service.update_user(user.id, role="admin", token_version=0)
+
+    db.session.refresh(user)
+    assert user.token_version == 1
+
+
+def test_del_customer_revokes_linked_users(app):
+    kept, deleted = Customer(name="kept"), Customer(name="deleted")
+    db.session.add_all([kept, deleted])
+    db.session.commit()
+    linked = _user("carol", [deleted])
+    other = _user("dave", [kept])
+
+    status, msg = customer_service.del_customer(deleted.id)
+
+    assert status, msg
+    assert db.session.get(User, linked.id).token_version == 1
+    assert db.session.get(User, other.id).token_version == 0
+    assert UserCustomer.query.filter_by(customer_id=deleted.id).count() == 0
@@ -0,0 +1,17 @@
+import threading
+from app import ws_server
+
+
+def test_wait_timeout_removes_ready_event():
+    assert not ws_server.wait_for_client("client-timeout", 0.01)
+    assert "client-timeout" not in ws_server.client_ready_events
+
+
+def test_wait_returns_when_client_registers():
+    timer = threading.Timer(0.05, lambda: ws_server._get_ready_event("client-ready").set())
+    timer.start()
+    try:
+        assert ws_server.wait_for_client("client-ready", 5)
+    finally:
+        timer.join()
+        ws_server.client_ready_events.pop("client-ready", None)